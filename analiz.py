@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from constants import DOVIZ_TIPLERI
+from hesaplama import tl_kurlari
+from vade_endeksi import VadeMerdiveni
+
+# Kalan güne göre vade grupları (üst sınırlar dahil)
+VADE_SINIRLARI = [30, 90, 180, 365]
+VADE_GRUPLARI = ["1 aya kadar", "1-3 ay", "3-6 ay", "6-12 ay", "12+ ay"]
+
+PortfoyAnalizi = namedtuple(
+    'PortfoyAnalizi',
+    ['aktif_df', 'metrikler', 'doviz_ozet', 'banka_ozet', 'vade_ozet']
+)
+
+
+def hesapla_tl_tutarlar(df, guncel_kur, kurlar=None):
+    """Döviz mevduatlarını kendi para birimlerinin güncel kuruyla TL'ye çevirme işlemi
+
+    Kuru alınamayan para birimlerinin TL karşılıkları NaN olur.
+    """
+    df_copy = df.copy()
+    doviz = df_copy['mevduat_tipi'].isin(DOVIZ_TIPLERI).to_numpy()
+    kur = tl_kurlari(df_copy['mevduat_tipi'], guncel_kur, kurlar)
+
+    df_copy['tutar_tl'] = df_copy['tutar'].to_numpy(dtype=float) * kur
+    df_copy['net_faiz_tl'] = np.where(
+        doviz,
+        df_copy.get('net_faiz_usd', pd.Series(np.nan, index=df_copy.index)).to_numpy(dtype=float) * kur,
+        df_copy['net_faiz']
+    )
+    return df_copy
+
+
+def vade_grubu_ata(kalan_gun):
+    """Kalan gün dizisini sıralı vade gruplarına ayır"""
+    kodlar = np.searchsorted(VADE_SINIRLARI, np.asarray(kalan_gun), side='left')
+    return pd.Categorical.from_codes(kodlar, categories=VADE_GRUPLARI, ordered=True)
+
+
+def hesapla_ortalama_vade(df):
+    """Ağırlıklı ortalama vade hesaplama"""
+    if df.empty:
+        return 0
+
+    # Farklı para birimlerindeki mevduatlar TL karşılıklarıyla ağırlıklandırılır
+    tutar = df['tutar_tl'] if 'tutar_tl' in df else df['tutar']
+    toplam_tutar = tutar.sum()
+    if toplam_tutar == 0:
+        return 0
+
+    # Ağırlıklı ortalama vade hesaplama
+    agirlikli_vade = (tutar * df['kalan_gun']).sum() / toplam_tutar
+    return round(agirlikli_vade, 0)
+
+
+def _pay_ekle(ozet, kolon, hedef='Portföy Payı (%)'):
+    """Özet tabloya toplam içindeki pay kolonunu ekle"""
+    toplam = ozet[kolon].sum()
+    ozet[hedef] = (ozet[kolon] / toplam * 100).round(2) if toplam else 0.0
+    return ozet
+
+
+def portfoy_analizi_hesapla(df, guncel_kur, bugun, merdiven=None, kurlar=None):
+    """Aktif portföyün TL karşılıklarını ve tüm dağılım özetlerini tek geçişte hesapla"""
+    if merdiven is None:
+        merdiven = VadeMerdiveni(df)
+    aktif_df = df.loc[merdiven.aktif_idler(bugun)]
+    aktif_df = hesapla_tl_tutarlar(aktif_df, guncel_kur, kurlar)
+    aktif_df['vade_grubu'] = vade_grubu_ata(aktif_df['kalan_gun'])
+
+    toplam_anapara_tl = aktif_df['tutar_tl'].sum()
+    toplam_net_faiz_tl = aktif_df['net_faiz_tl'].sum()
+    metrikler = {
+        'adet': len(aktif_df),
+        'toplam_anapara_tl': toplam_anapara_tl,
+        'toplam_net_faiz_tl': toplam_net_faiz_tl,
+        'toplam_getiri_orani': (toplam_net_faiz_tl / toplam_anapara_tl * 100) if toplam_anapara_tl > 0 else 0,
+        'ortalama_vade': hesapla_ortalama_vade(aktif_df)
+    }
+
+    # Satırlar yalnızca bir kez gruplanır, diğer özetler bu küçük tablodan türetilir
+    temel = aktif_df.groupby(['mevduat_tipi', 'banka', 'vade_grubu'], observed=True).agg(
+        adet=('tutar_tl', 'size'),
+        tutar_tl=('tutar_tl', 'sum'),
+        net_faiz_tl=('net_faiz_tl', 'sum')
+    )
+
+    doviz_ozet = temel.groupby(level='mevduat_tipi')[['tutar_tl', 'net_faiz_tl']].sum().round(2)
+    doviz_ozet.columns = ['Toplam Anapara (TL)', 'Toplam Net Faiz (TL)']
+    _pay_ekle(doviz_ozet, 'Toplam Anapara (TL)')
+
+    banka_ozet = temel.groupby(level='banka')[['adet', 'tutar_tl', 'net_faiz_tl']].sum().round(2)
+    banka_ozet.columns = ['Adet', 'Toplam Anapara (TL)', 'Toplam Net Faiz (TL)']
+    _pay_ekle(banka_ozet, 'Toplam Anapara (TL)')
+
+    vade_ozet = (
+        temel.groupby(level='vade_grubu', observed=False)[['tutar_tl', 'net_faiz_tl']].sum()
+        .reindex(VADE_GRUPLARI, fill_value=0)
+        .rename_axis('vade_grubu')
+        .reset_index()
+    )
+    vade_ozet['vade_grubu'] = vade_ozet['vade_grubu'].astype(str)
+    _pay_ekle(vade_ozet, 'tutar_tl', 'pay')
+
+    return PortfoyAnalizi(aktif_df, metrikler, doviz_ozet, banka_ozet, vade_ozet)
@@ -1,10 +1,31 @@
+import time
+_calisma_baslangici = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
-import plotly.express as px
+from datetime import datetime, date, timedelta
 import locale
-from mevduat import get_guncel_kur, veri_giris_formu, mevduat_listesi_tab, hesapla_ortalama_vade, export_to_excel, guncelle_mevcut_kayitlar
-from constants import TL_KOLONLAR, USD_KOLONLAR, PORTFOY_KOLONLAR
+from mevduat import (
+    get_guncel_kur, get_guncel_kurlar, veri_giris_formu, mevduat_listesi_tab, guncelle_mevcut_kayitlar,
+    oturum_defteri, oturum_deposu, oturum_okuyucusu
+)
+from analiz import hesapla_tl_tutarlar, portfoy_analizi_hesapla
+from constants import DOVIZ_TIPLERI, MEVDUAT_KOLONLARI, MEVDUAT_TIPLERI, PARA_BIRIMLERI
+from dagilim import dagilim_optimize_et
+from grafik_onbellegi import grafik_anahtari, grafik_onbellegi
+from disa_aktar import ARROW_MIME, EXCEL_MIME, PARQUET_MIME, arrow_olustur, excel_olustur_arka_planda
+from ice_aktar import GIRDI_KOLONLARI, arrow_ice_aktar, toplu_ice_aktar
+from karsilastirma import (
+    OLCUTLER, VADE_SECENEKLERI, VARSAYILAN_VADELER,
+    en_iyi_hucre, karsilastirma_izgarasi, oran_tablosu_olustur, urun_tablosu
+)
+from kur import kur_saglayici
+from kur_gecmisi import varsayilan_kur_gecmisi
+import olcum
+from senaryo import SENARYO_KOLONLARI, basabas_analizi, kur_modeli_kalibre_et
+from tahakkuk import TAHAKKUK_KOLONLARI, portfoy_degerleme
+from vade_endeksi import MERDIVEN_KOLONLARI, VadeMerdiveni
+from yenileme import YENILEME_KOLONLARI, yenileme_projeksiyonu
 
 # Türkçe tarih formatı
 try:
@@ -22,96 +43,60 @@ except:
 # Para birimi sembolü için sabit tanımlama
 CURRENCY_SYMBOL = "\u20BA"  # ₺ sembolü için Unicode karşılığı
 
+# Açık oturumların zamanlayıcının yayımladığı yeni kurları kontrol etme aralığı (saniye)
+KUR_KONTROL_ARALIGI = 15
+
 st.set_page_config(
     page_title="Portföy Takip",
     page_icon="💸",
     layout="wide"
 )
 
-def hesapla_tl_tutarlar(df, guncel_kur):
-    """USD mevduatları TL'ye çevirme işlemi"""
-    # DataFrame'in bir kopyasını oluştur
-    df_copy = df.copy()
-    
-    # Hesaplamaları kopyada yap
-    df_copy.loc[:, 'tutar_tl'] = df_copy.apply(
-        lambda x: x['tutar'] if x['mevduat_tipi'] == 'TL Mevduat' 
-        else x['tutar'] * guncel_kur, 
-        axis=1
-    )
-    
-    df_copy.loc[:, 'net_faiz_tl'] = df_copy.apply(
-        lambda x: x['net_faiz'] if x['mevduat_tipi'] == 'TL Mevduat'
-        else x['net_faiz_usd'] * guncel_kur,
-        axis=1
-    )
-    return df_copy
-
-def goster_metrikler(df, prefix=""):
+def goster_metrikler(metrikler, prefix=""):
     """Metrik gösterimi"""
-    toplam_anapara_tl = df['tutar_tl'].sum()
-    toplam_net_faiz_tl = df['net_faiz_tl'].sum()
-    toplam_getiri_orani = (toplam_net_faiz_tl / toplam_anapara_tl * 100) if toplam_anapara_tl > 0 else 0
-    
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric(f"{prefix}Mevduat", f"{len(df)} Adet")
+        st.metric(f"{prefix}Mevduat", f"{metrikler['adet']} Adet")
     with col2:
-        st.metric(f"{prefix}Anapara (TL)", f"{toplam_anapara_tl:,.0f} {CURRENCY_SYMBOL}")
+        st.metric(f"{prefix}Anapara (TL)", f"{metrikler['toplam_anapara_tl']:,.0f} {CURRENCY_SYMBOL}")
     with col3:
-        st.metric(f"{prefix}Net Faiz (TL)", f"{toplam_net_faiz_tl:,.0f} {CURRENCY_SYMBOL}")
+        st.metric(f"{prefix}Net Faiz (TL)", f"{metrikler['toplam_net_faiz_tl']:,.0f} {CURRENCY_SYMBOL}")
     with col4:
         if prefix:
-            ort_vade = hesapla_ortalama_vade(df)
-            st.metric("Ortalama Vade", f"{ort_vade:.0f} gün")
+            st.metric("Ortalama Vade", f"{metrikler['ortalama_vade']:.0f} gün")
         else:
-            st.metric("Toplam Getiri Oranı", f"%{toplam_getiri_orani:.2f}")
+            st.metric("Toplam Getiri Oranı", f"%{metrikler['toplam_getiri_orani']:.2f}")
 
 def olustur_dagilim_grafigi(df, values, names, title, hole=0.4):
-    """Pasta grafiği oluşturma"""
-    fig = px.pie(
-        df,
-        values=values,
-        names=names,
-        title=title,
-        hole=hole
-    )
-    return fig
-
-def olustur_vade_ozeti(aktif_df):
-    """Vade dağılımı özeti"""
-    def vade_grubu(gun):
-        if gun <= 30: return "1 aya kadar"
-        elif gun <= 90: return "1-3 ay"
-        elif gun <= 180: return "3-6 ay"
-        elif gun <= 365: return "6-12 ay"
-        else: return "12+ ay"
-    
-    vade_sirasi = ["1 aya kadar", "1-3 ay", "3-6 ay", "6-12 ay", "12+ ay"]
-    
-    # DataFrame'in bir kopyasını oluştur
-    df_copy = aktif_df.copy()
-    df_copy.loc[:, 'vade_grubu'] = df_copy['kalan_gun'].apply(vade_grubu)
-    
-    vade_ozet = df_copy.groupby('vade_grubu').agg({
-        'tutar_tl': 'sum',
-        'net_faiz_tl': 'sum'
-    }).reindex(vade_sirasi).reset_index()
-    
-    # NaN değerleri 0 ile doldur
-    vade_ozet = vade_ozet.fillna(0)
+    """Pasta grafiği oluşturma (aynı veri ve parametreler için ortak önbellekten)"""
+    def olustur():
+        import plotly.express as px
+        
+        return px.pie(
+            df,
+            values=values,
+            names=names,
+            title=title,
+            hole=hole
+        )
     
-    vade_ozet.loc[:, 'pay'] = (vade_ozet['tutar_tl'] / vade_ozet['tutar_tl'].sum() * 100).round(2)
-    return vade_ozet
+    anahtar = grafik_anahtari('pasta', df, values=values, names=list(names), title=title, hole=hole)
+    return grafik_onbellegi.getir(anahtar, olustur)
 
 def portfoy_ozeti(df):
     """Toplam portföy özeti"""
     st.write("### Portföy Özeti")
     
-    guncel_kur = st.session_state.get('guncel_kur', get_guncel_kur())
-    df = hesapla_tl_tutarlar(df, guncel_kur)
+    df = hesapla_tl_tutarlar(df, get_guncel_kur(), get_guncel_kurlar())
+    toplam_anapara_tl = df['tutar_tl'].sum()
+    toplam_net_faiz_tl = df['net_faiz_tl'].sum()
     
-    goster_metrikler(df)
+    goster_metrikler({
+        'adet': len(df),
+        'toplam_anapara_tl': toplam_anapara_tl,
+        'toplam_net_faiz_tl': toplam_net_faiz_tl,
+        'toplam_getiri_orani': (toplam_net_faiz_tl / toplam_anapara_tl * 100) if toplam_anapara_tl > 0 else 0
+    })
     
     st.write("### Döviz Bazlı Dağılım")
     doviz_dagilimi = df.groupby('mevduat_tipi').agg({
@@ -127,30 +112,35 @@ def portfoy_ozeti(df):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def portfoy_analizi(df):
+@st.cache_resource(max_entries=4, show_spinner=False)
+def vade_merdiveni_getir(surum):
+    """Depo sürümüne ait vade endeksini önbellekten getir"""
+    return VadeMerdiveni(oturum_okuyucusu().oku(kolonlar=MERDIVEN_KOLONLARI))
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def portfoy_analizi_getir(surum, guncel_kur, bugun, kurlar):
+    """Portföy analizini depo sürümü, kurlar ve tarih bazında önbellekten getir"""
+    return portfoy_analizi_hesapla(
+        oturum_okuyucusu().oku(), guncel_kur, bugun, merdiven=vade_merdiveni_getir(surum), kurlar=kurlar
+    )
+
+@st.fragment
+@olcum.olculen('portfoy_analizi')
+def portfoy_analizi():
     """Portföy analizi sekmesi"""
-    aktif_df = df[pd.to_datetime(df['vade_bitis']).dt.date >= date.today()]
+    analiz = portfoy_analizi_getir(oturum_deposu().durum(), get_guncel_kur(), date.today(), get_guncel_kurlar())
     
-    if aktif_df.empty:
+    if analiz.aktif_df.empty:
         st.warning("Aktif mevduat bulunmamaktadır!")
         return
         
     st.write("### Aktif Portföy Özeti")
     
-    guncel_kur = st.session_state.get('guncel_kur', get_guncel_kur())
-    aktif_df = hesapla_tl_tutarlar(aktif_df, guncel_kur)
-    
-    goster_metrikler(aktif_df, "Aktif ")
+    goster_metrikler(analiz.metrikler, "Aktif ")
     
     # Döviz dağılımı grafiği
     st.write("### Döviz Dağılımı")
-    doviz_ozet = aktif_df.groupby('mevduat_tipi').agg({
-        'tutar_tl': 'sum',
-        'net_faiz_tl': 'sum'
-    }).round(2)
-    
-    doviz_ozet.columns = ['Toplam Anapara (TL)', 'Toplam Net Faiz (TL)']
-    doviz_ozet['Portföy Payı (%)'] = (doviz_ozet['Toplam Anapara (TL)'] / doviz_ozet['Toplam Anapara (TL)'].sum() * 100).round(2)
+    doviz_ozet = analiz.doviz_ozet
     
     col1, col2 = st.columns(2)
     with col1:
@@ -179,26 +169,22 @@ def portfoy_analizi(df):
     
     with col1:
         st.write("#### Banka Dağılımı")
-        goster_banka_dagilimi(aktif_df)
+        goster_banka_dagilimi(analiz.banka_ozet)
     
     with col2:
         st.write("#### Vade Dağılımı")
-        goster_vade_dagilimi(aktif_df)
+        goster_vade_dagilimi(analiz.vade_ozet)
+    
+    goster_deger_gelisimi()
+    
+    goster_yenileme_projeksiyonu()
+    
+    goster_kur_senaryolari()
     
     goster_veri_aktarim_butonlari()
 
-def goster_banka_dagilimi(aktif_df):
+def goster_banka_dagilimi(banka_ozet):
     """Banka dağılımı gösterimi"""
-    # Sadece banka bazlı toplam hesaplama
-    banka_ozet = aktif_df.groupby('banka').agg({
-        'tutar_tl': ['count', 'sum'],
-        'net_faiz_tl': 'sum'
-    }).round(2)
-    
-    # Özet tablo
-    banka_ozet.columns = ['Adet', 'Toplam Anapara (TL)', 'Toplam Net Faiz (TL)']
-    banka_ozet['Portföy Payı (%)'] = (banka_ozet['Toplam Anapara (TL)'] / banka_ozet['Toplam Anapara (TL)'].sum() * 100).round(2)
-    
     # Banka dağılımı pasta grafiği
     fig_banka = olustur_dagilim_grafigi(
         banka_ozet,
@@ -220,21 +206,27 @@ def goster_banka_dagilimi(aktif_df):
         use_container_width=True
     )
 
-def goster_vade_dagilimi(aktif_df):
-    """Vade dağılımı gösterimi"""
-    vade_ozet = olustur_vade_ozeti(aktif_df)
+def olustur_vade_grafigi(vade_ozet):
+    """Vade dağılımı çubuk grafiği"""
+    import plotly.express as px
     
-    # NaN değerleri 0 ile doldur
-    vade_ozet = vade_ozet.fillna(0)
-    
-    fig_vade = px.bar(
+    fig = px.bar(
         vade_ozet,
         x='vade_grubu',
         y='tutar_tl',
         title='Vade Sürelerine Göre Aktif Mevduat Dağılımı',
         text=vade_ozet['tutar_tl'].apply(lambda x: f'{x:,.0f} ₺')
     )
-    fig_vade.update_traces(textposition='inside')
+    fig.update_traces(textposition='inside')
+    return fig
+
+def goster_vade_dagilimi(vade_ozet):
+    """Vade dağılımı gösterimi"""
+    grafik_verisi = vade_ozet[['vade_grubu', 'tutar_tl']]
+    fig_vade = grafik_onbellegi.getir(
+        grafik_anahtari('vade', grafik_verisi),
+        lambda: olustur_vade_grafigi(grafik_verisi)
+    )
     st.plotly_chart(fig_vade, use_container_width=True)
     
     vade_ozet_tablo = pd.DataFrame({
@@ -243,199 +235,730 @@ def goster_vade_dagilimi(aktif_df):
         'Toplam Net Faiz (TL)': vade_ozet['net_faiz_tl'].apply(lambda x: f'{x:,.0f} ₺'),
         'Portföy Payı (%)': vade_ozet['pay'].apply(lambda x: f'{x:.2f}%')
     })
-    # Tablodaki NaN değerleri 0 ile doldur
-    vade_ozet_tablo = vade_ozet_tablo.fillna('0 ₺')
     st.dataframe(vade_ozet_tablo, use_container_width=True)
 
+@st.cache_resource(max_entries=16, show_spinner=False)
+def portfoy_degerleme_getir(surum, guncel_kur, bugun, baslangic, bitis, doviz_kurlari, kur_gecmisi_surumu):
+    """Günlük portföy değer eğrisini önbellekten getir (eksik kur geçmişi arka planda getirilir)"""
+    df = oturum_okuyucusu().oku(kolonlar=TAHAKKUK_KOLONLARI)
+    tarihler = pd.date_range(baslangic, bitis, freq='D')
+    kurlar = varsayilan_kur_gecmisi().kur_yolu(tarihler, guncel_kur, arka_planda=True)
+    return portfoy_degerleme(df, tarihler, kurlar, doviz_kurlari=doviz_kurlari)
+
+@st.fragment
+@olcum.olculen('deger_gelisimi')
+def goster_deger_gelisimi():
+    """Günlük tahakkuk eden portföy değeri grafiği"""
+    import plotly.express as px
+    
+    st.write("### Günlük Değer Gelişimi")
+    bugun = date.today()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        aralik = st.date_input(
+            "Tarih Aralığı",
+            value=(bugun - timedelta(days=90), bugun + timedelta(days=365)),
+            key="degerleme_araligi"
+        )
+    with col2:
+        para_birimi = st.radio("Para Birimi", ["TL", "USD"], horizontal=True, key="degerleme_para_birimi")
+    
+    if len(aralik) != 2:
+        st.info("Lütfen başlangıç ve bitiş tarihini seçiniz.")
+        return
+    
+    kur_gecmisi = varsayilan_kur_gecmisi()
+    egri = portfoy_degerleme_getir(
+        oturum_deposu().durum(), get_guncel_kur(), bugun, aralik[0], aralik[1], get_guncel_kurlar(),
+        kur_gecmisi.surum
+    )
+    kolon = 'toplam_tl' if para_birimi == "TL" else 'toplam_usd'
+    
+    fig = px.line(
+        egri.reset_index(),
+        x='tarih',
+        y=kolon,
+        title=f'Tahakkuk Eden Portföy Değeri ({para_birimi})',
+        labels={'tarih': 'Tarih', kolon: f'Portföy Değeri ({para_birimi})'}
+    )
+    if aralik[0] <= bugun <= aralik[1]:
+        fig.add_vline(x=datetime.combine(bugun, datetime.min.time()), line_dash="dash")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        "Geçmiş günler için kapanış kuru, gelecek günler için güncel kur kullanılmıştır. "
+        "USD dışındaki döviz mevduatları tüm günlerde güncel kurla çevrilmiştir."
+    )
+    if kur_gecmisi.senkronize_ediliyor():
+        st.caption("Geçmiş kurlar arka planda yükleniyor; yüklenene kadar eksik günlerde güncel kur kullanılır.")
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def yenileme_projeksiyonu_getir(surum, guncel_kur, bugun, kurlar, dongu_sayisi, ay_sayisi, faiz_yolu):
+    """Yenileme projeksiyonunu önbellekten getir (faiz_yolu: (mevduat tipi, tarih, oran) demetleri)"""
+    df = oturum_okuyucusu().oku(vade_bitis_min=bugun, kolonlar=YENILEME_KOLONLARI)
+    yol = {}
+    for mevduat_tipi, tarih, oran in faiz_yolu:
+        yol.setdefault(mevduat_tipi, []).append((tarih, oran))
+    return yenileme_projeksiyonu(df, bugun, dongu_sayisi, ay_sayisi, guncel_kur, kurlar, yol)
+
+@st.fragment
+@olcum.olculen('yenileme_projeksiyonu')
+def goster_yenileme_projeksiyonu():
+    """Vade sonunda yenilenen aktif mevduatlarla aylık portföy değeri projeksiyonu"""
+    import plotly.express as px
+    
+    st.write("### Yenileme Projeksiyonu")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dongu_sayisi = st.number_input("Yenileme Sayısı", min_value=1, max_value=60, value=4, key="yenileme_dongu_sayisi")
+    with col2:
+        ay_sayisi = st.number_input("Projeksiyon Süresi (Ay)", min_value=1, max_value=120, value=24, key="yenileme_ay_sayisi")
+    with col3:
+        para_birimi = st.radio("Para Birimi", ["TL", "USD"], horizontal=True, key="yenileme_para_birimi")
+    
+    st.caption("Yenilemelerde geçerli olacak faiz oranlarını yürürlük tarihleriyle giriniz; "
+               "oran girilmeyen tiplerde mevduatın kendi faiz oranı kullanılır.")
+    faiz_yolu = st.data_editor(
+        pd.DataFrame({
+            'mevduat_tipi': pd.Series(dtype=object),
+            'tarih': pd.Series(dtype='datetime64[ns]'),
+            'faiz_orani': pd.Series(dtype=float)
+        }),
+        key="yenileme_faiz_yolu",
+        num_rows="dynamic",
+        column_config={
+            "mevduat_tipi": st.column_config.SelectboxColumn("Mevduat Tipi", options=MEVDUAT_TIPLERI, required=True),
+            "tarih": st.column_config.DateColumn("Yürürlük Tarihi", required=True),
+            "faiz_orani": st.column_config.NumberColumn("Faiz Oranı (%)", min_value=0.0, format="%.2f", required=True)
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    yol = tuple(
+        (satir.mevduat_tipi, pd.Timestamp(satir.tarih).date(), float(satir.faiz_orani))
+        for satir in faiz_yolu.dropna().itertuples()
+    )
+    
+    bugun = date.today()
+    projeksiyon = yenileme_projeksiyonu_getir(
+        oturum_deposu().durum(), get_guncel_kur(), bugun, get_guncel_kurlar(),
+        int(dongu_sayisi), int(ay_sayisi), yol
+    )
+    kolon = 'toplam_tl' if para_birimi == "TL" else 'toplam_usd'
+    
+    fig = px.line(
+        projeksiyon.reset_index(),
+        x='ay',
+        y=kolon,
+        markers=True,
+        title=f'Yenilemelerle Ay Sonu Portföy Değeri ({para_birimi})',
+        labels={'ay': 'Ay', kolon: f'Portföy Değeri ({para_birimi})'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        "Her mevduat vade sonunda dönüş tutarıyla aynı vadeye yenilenir; net faiz yenileme "
+        "tarihinde yürürlükteki stopaj oranıyla hesaplanır. Döviz mevduatları güncel kurlarla çevrilmiştir."
+    )
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def kur_senaryolari_getir(surum, guncel_kur, bugun, yontem, gecmis_yil, senaryo_sayisi):
+    """Kur senaryosu analizini önbellekten getir"""
+    kurlar = varsayilan_kur_gecmisi().kurlar(bugun - timedelta(days=365 * gecmis_yil), bugun - timedelta(days=1))
+    model = kur_modeli_kalibre_et(kurlar, yontem)
+    df = oturum_okuyucusu().oku(mevduat_tipi='TL Mevduat', vade_bitis_min=bugun, kolonlar=SENARYO_KOLONLARI)
+    return model, basabas_analizi(df, model, guncel_kur, bugun, senaryo_sayisi, tohum=0)
+
+@st.fragment
+@olcum.olculen('kur_senaryolari')
+def goster_kur_senaryolari():
+    """TL mevduatların USD karşısındaki başarısını kur senaryolarıyla göster"""
+    import plotly.express as px
+    
+    st.write("### Kur Senaryoları")
+    
+    with st.form("kur_senaryo_formu"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            yontem = st.selectbox("Yöntem", ["GBM", "Bootstrap"])
+        with col2:
+            gecmis_yil = st.number_input("Kalibrasyon Dönemi (Yıl)", min_value=1, max_value=10, value=2)
+        with col3:
+            senaryo_sayisi = st.number_input("Senaryo Sayısı", min_value=1000, max_value=100000, value=10000, step=1000)
+        
+        if st.form_submit_button("Simülasyonu Çalıştır"):
+            st.session_state.kur_senaryo_parametreleri = (yontem.lower(), int(gecmis_yil), int(senaryo_sayisi))
+    
+    if 'kur_senaryo_parametreleri' not in st.session_state:
+        return
+    
+    try:
+        with st.spinner("Senaryolar hesaplanıyor..."):
+            model, sonuc = kur_senaryolari_getir(
+                oturum_deposu().durum(), get_guncel_kur(), date.today(),
+                *st.session_state.kur_senaryo_parametreleri
+            )
+    except ValueError as e:
+        st.info(str(e))
+        return
+    
+    portfoy = sonuc.portfoy
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("USD'yi Geçme Olasılığı", f"%{portfoy['usd_gecme_olasiligi'] * 100:.1f}")
+    with col2:
+        st.metric("Beklenen Fark (USD)", f"{portfoy['beklenen_fark_usd']:,.0f} $")
+    with col3:
+        st.metric("Günlük Kur Oynaklığı", f"%{model.sigma * 100:.2f}")
+    
+    fig = px.histogram(
+        x=sonuc.portfoy_fark_usd,
+        nbins=50,
+        title='TL Portföyün USD\'ye Göre Vade Sonu Farkı',
+        labels={'x': 'Fark (USD)'}
+    )
+    fig.add_vline(x=0, line_dash="dash")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        pd.DataFrame({
+            'Yüzdelik': [f"%{p}" for p in portfoy['yuzdelikler']],
+            'Portföy USD Karşılığı': [f"{v:,.0f} $" for v in portfoy['yuzdelikler'].values()]
+        }),
+        hide_index=True
+    )
+    
+    st.write("##### Mevduat Bazlı Sonuçlar")
+    st.dataframe(
+        sonuc.mevduatlar,
+        column_config={
+            "banka": "Banka",
+            "tutar": st.column_config.NumberColumn("Anapara", format="%d ₺"),
+            "vade_bitis": st.column_config.DateColumn("Vade Bitiş"),
+            "basabas_kur": st.column_config.NumberColumn("Başabaş Kur", format="%.4f"),
+            "tutar_usd": st.column_config.NumberColumn("USD Karşılığı (Bugün)", format="%d $"),
+            "usd_gecme_olasiligi": st.column_config.ProgressColumn("USD'yi Geçme Olasılığı", min_value=0, max_value=1),
+            "usd_karsiligi_p5": st.column_config.NumberColumn("Vade Sonu USD (%5)", format="%d $"),
+            "usd_karsiligi_p25": st.column_config.NumberColumn("Vade Sonu USD (%25)", format="%d $"),
+            "usd_karsiligi_p50": st.column_config.NumberColumn("Vade Sonu USD (%50)", format="%d $"),
+            "usd_karsiligi_p75": st.column_config.NumberColumn("Vade Sonu USD (%75)", format="%d $"),
+            "usd_karsiligi_p95": st.column_config.NumberColumn("Vade Sonu USD (%95)", format="%d $")
+        },
+        use_container_width=True
+    )
+
 def goster_veri_aktarim_butonlari():
     """Veri aktarım butonlarını göster"""
     st.write("### Veri Aktarımı")
-    if st.button("Excel'e Aktar", type="primary"):
-        excel_data = export_to_excel()
-        if excel_data:
-            st.download_button(
-                label="Excel Dosyasını İndir",
-                data=excel_data,
-                file_name="mevduat_portfoy.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    excel_isi = st.session_state.get('excel_isi')
+    hazirlaniyor = excel_isi is not None and not excel_isi.done()
+    
+    # Dosya hazırlanırken yalnızca bu bölüm periyodik olarak yenilenir
+    st.fragment(run_every=1 if hazirlaniyor else None)(goster_excel_durumu)()
+    
+    # Parquet ve Arrow dosyaları hızlı oluştuğundan indirme anında hazırlanır
+    depo = oturum_deposu()
+    zaman = datetime.now().strftime('%Y%m%d_%H%M')
+    parquet_kolonu, arrow_kolonu = st.columns(2)
+    with parquet_kolonu:
+        st.download_button(
+            label="Parquet Olarak İndir",
+            data=lambda: arrow_olustur(depo, 'parquet'),
+            file_name=f"mevduat_portfoy_{zaman}.parquet",
+            mime=PARQUET_MIME,
+            on_click="ignore"
+        )
+    with arrow_kolonu:
+        st.download_button(
+            label="Arrow Olarak İndir",
+            data=lambda: arrow_olustur(depo, 'arrow'),
+            file_name=f"mevduat_portfoy_{zaman}.arrow",
+            mime=ARROW_MIME,
+            on_click="ignore"
+        )
+
+def goster_excel_durumu():
+    """Arka planda hazırlanan Excel dosyasının durumunu göster"""
+    excel_isi = st.session_state.get('excel_isi')
+    
+    if excel_isi is None:
+        if st.button("Excel'e Aktar", type="primary"):
+            st.session_state.excel_isi = excel_olustur_arka_planda(
+                oturum_deposu(), get_guncel_kur(), date.today(), get_guncel_kurlar()
             )
+            st.rerun()
+        return
+    
+    if not excel_isi.done():
+        st.info("Excel dosyası hazırlanıyor...")
+        return
+    
+    # İş bittiğinde periyodik yenilemeyi durdurmak için sayfayı bir kez yenile
+    if st.session_state.get('excel_isi_gosterilen') is not excel_isi:
+        st.session_state.excel_isi_gosterilen = excel_isi
+        st.rerun()
+    
+    try:
+        st.download_button(
+            label="Excel Dosyasını İndir",
+            data=excel_isi.result(),
+            file_name=f"mevduat_portfoy_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+            mime=EXCEL_MIME,
+            on_click="ignore"
+        )
+    except Exception as e:
+        st.error(f"Excel dosyası oluşturulamadı: {str(e)}")
+    
+    if st.button("Yeni Excel Oluştur"):
+        del st.session_state.excel_isi
+        st.rerun()
 
-def mevduat_listesi(df):
+@st.fragment
+@olcum.olculen('mevduat_listesi')
+def mevduat_listesi():
     """Mevduat listesi sekmesi"""
-    # TL ve USD mevduatları ayır
-    tl_df = df[df['mevduat_tipi'] == 'TL Mevduat']
-    usd_df = df[df['mevduat_tipi'] == 'USD Mevduat']
+    # Her sekme yalnızca gösterdiği sayfayı depodan okur
+    depo = oturum_deposu()
     
-    tab1, tab2 = st.tabs(["TL Mevduatlar", "USD Mevduatlar"])
+    sekmeler = st.tabs([f"{mevduat_tipi}lar" for mevduat_tipi in MEVDUAT_TIPLERI])
     
-    with tab1:
-        if not tl_df.empty:
-            mevduat_listesi_tab(tl_df, TL_KOLONLAR)
-        else:
-            st.info("TL mevduat bulunmamaktadır.")
-            
-    with tab2:
-        if not usd_df.empty:
-            mevduat_listesi_tab(usd_df, USD_KOLONLAR)
-        else:
-            st.info("USD mevduat bulunmamaktadır.")
+    for sekme, mevduat_tipi in zip(sekmeler, MEVDUAT_TIPLERI):
+        with sekme:
+            if depo.adet(mevduat_tipi):
+                mevduat_listesi_tab(mevduat_tipi, MEVDUAT_KOLONLARI[mevduat_tipi])
+            else:
+                st.info(f"{mevduat_tipi.split()[0]} mevduat bulunmamaktadır.")
+    
+    gecmis_durum()
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def tarihteki_durum_getir(surum, tarih):
+    """Portföyün verilen günün sonundaki halini önbellekten getir"""
+    return oturum_deposu().tarihteki_durum(tarih)
 
-def export_to_excel():
-    """Excel'e aktarım için veriyi hazırla"""
-    if 'mevduatlar' in st.session_state and st.session_state.mevduatlar:
-        df = pd.DataFrame(st.session_state.mevduatlar)
+@st.fragment
+@olcum.olculen('gecmis_durum')
+def gecmis_durum():
+    """Portföyün geçmiş bir tarihteki halini olay kaydından kurup göster"""
+    with st.expander("Geçmiş Tarihteki Portföy"):
+        tarih = st.date_input("Tarih", value=date.today(), max_value=date.today(), key="gecmis_durum_tarihi")
+        try:
+            df = tarihteki_durum_getir(oturum_deposu().durum(), tarih)
+        except ValueError as e:
+            st.warning(str(e))
+            return
         
-        # Temel hesaplamalar
-        aktif_df = df[pd.to_datetime(df['vade_bitis']).dt.date >= date.today()]
-        aktif_tl = aktif_df[aktif_df['mevduat_tipi'] == 'TL Mevduat']
-        aktif_usd = aktif_df[aktif_df['mevduat_tipi'] == 'USD Mevduat']
-        guncel_kur = st.session_state.get('guncel_kur', get_guncel_kur())
+        if df.empty:
+            st.info(f"{tarih.strftime('%d.%m.%Y')} tarihinde kayıtlı mevduat bulunmamaktadır.")
+            return
         
-        # Toplam portföy değerleri (TL cinsinden)
-        toplam_tl_portfoy = aktif_tl['tutar'].sum()
-        toplam_usd_portfoy_tl = aktif_usd['tutar'].sum() * guncel_kur
-        toplam_portfoy = toplam_tl_portfoy + toplam_usd_portfoy_tl
+        ozet = df.groupby('mevduat_tipi').agg(adet=('tutar', 'size'), tutar=('tutar', 'sum'), net_faiz=('net_faiz', 'sum'))
+        st.dataframe(
+            ozet,
+            column_config={
+                "mevduat_tipi": "Mevduat Tipi",
+                "adet": "Adet",
+                "tutar": st.column_config.NumberColumn("Toplam Tutar", format="%d"),
+                "net_faiz": st.column_config.NumberColumn("Toplam Net Faiz (TL)", format="%d ₺")
+            },
+            use_container_width=True
+        )
+        st.caption(
+            "Kayıtlar, o güne kadarki son ekleme veya güncellemedeki halleriyle gösterilir; "
+            "tutarlar mevduatların kendi para birimindedir."
+        )
+
+def toplu_ice_aktarim_formu():
+    """CSV/Excel/Parquet dosyasından toplu mevduat aktarımı"""
+    with st.expander("Toplu İçe Aktarım (CSV / Excel / Parquet)"):
+        st.caption(
+            f"Gerekli kolonlar: {', '.join(GIRDI_KOLONLARI)}. "
+            "USD mevduatlar için isteğe bağlı baslangic_kur kolonu kullanılabilir. "
+            "Dışa aktarılmış Parquet/Arrow dosyaları hesaplanmış alanlarıyla olduğu gibi eklenir."
+        )
+        dosya = st.file_uploader("Dosya Seçin", type=['csv', 'xlsx', 'parquet', 'arrow'])
+        
+        if dosya is None or not st.button("İçe Aktar", type="primary"):
+            return
         
-        # Getiri hesaplamaları
-        tl_getiri = (aktif_tl['net_faiz'].sum() / toplam_tl_portfoy) if toplam_tl_portfoy > 0 else 0
-        usd_getiri = (aktif_usd['net_faiz_usd'].sum() / aktif_usd['tutar'].sum()) if len(aktif_usd) > 0 else 0
-        toplam_getiri = ((aktif_tl['net_faiz'].sum() + aktif_usd['net_faiz_usd'].sum() * guncel_kur) / 
-                        toplam_portfoy) if toplam_portfoy > 0 else 0
+        if dosya.name.lower().endswith(('.parquet', '.arrow')):
+            try:
+                sonuc = arrow_ice_aktar(dosya, oturum_deposu())
+            except ValueError as e:
+                st.error(f"Dosya aktarılamadı: {str(e)}")
+                return
+            st.success(f"{sonuc.eklenen:,} mevduat aktarıldı!")
+            return
         
-        # Excel yazıcı oluştur
-        excel_writer = pd.ExcelWriter('mevduat_portfoy.xlsx', engine='xlsxwriter')
-        workbook = excel_writer.book
+        ilerleme_cubugu = st.progress(0.0, text="Aktarım başlıyor...")
         
-        # Formatlar
-        header_format = workbook.add_format({
-            'bold': True,
-            'font_size': 12,
-            'bg_color': '#D9D9D9'
-        })
-        money_tl = workbook.add_format({'num_format': '#,##0 ₺'})
-        money_usd = workbook.add_format({'num_format': '#,##0 $'})
-        percent = workbook.add_format({'num_format': '0.00%'})
-        number = workbook.add_format({'num_format': '0'})
-        kur = workbook.add_format({'num_format': '0.0000'})
+        def ilerleme(oran, adet):
+            ilerleme_cubugu.progress(oran, text=f"{adet:,} satır işlendi")
         
-        # Özet sayfası
-        ozet = excel_writer.book.add_worksheet('Portföy Özeti')
-        ozet.set_column('A:A', 40)
-        ozet.set_column('B:B', 20)
+        try:
+            sonuc = toplu_ice_aktar(
+                dosya, dosya.name, oturum_deposu(), get_guncel_kur(), ilerleme=ilerleme, kurlar=get_guncel_kurlar()
+            )
+        except ValueError as e:
+            st.error(f"Dosya aktarılamadı: {str(e)}")
+            return
         
-        # Veri listesi
-        data = [
-            ['1. GENEL PORTFÖY BİLGİLERİ', ''],
-            ['Toplam Mevduat Adedi', len(df)],
-            ['Aktif Mevduat Adedi', len(aktif_df)],
-            ['Kapanmış Mevduat Adedi', len(df) - len(aktif_df)],
-            ['Ortalama Vade (Gün)', hesapla_ortalama_vade(aktif_df)],
-            ['', ''],
-            ['2. TL MEVDUAT BİLGİLERİ', ''],
-            ['TL Mevduat Adedi', len(aktif_tl)],
-            ['Toplam TL Anapara', aktif_tl['tutar'].sum()],
-            ['Toplam TL Net Faiz', aktif_tl['net_faiz'].sum()],
-            ['TL Portföy Getiri Oranı', tl_getiri],
-            ['', ''],
-            ['3. USD MEVDUAT BİLGİLERİ', ''],
-            ['USD Mevduat Adedi', len(aktif_usd)],
-            ['Toplam USD Anapara', aktif_usd['tutar'].sum()],
-            ['Toplam USD Net Faiz', aktif_usd['net_faiz_usd'].sum()],
-            ['USD Portföy Getiri Oranı', usd_getiri],
-            ['', ''],
-            ['4. TOPLAM PORTFÖY (TL)', ''],
-            ['Toplam Portföy Değeri (TL)', toplam_portfoy],
-            ['Toplam Net Faiz (TL)', aktif_tl['net_faiz'].sum() + aktif_usd['net_faiz_usd'].sum() * guncel_kur],
-            ['Genel Portföy Getiri Oranı', toplam_getiri],
-            ['', ''],
-            ['5. DÖVİZ DAĞILIMI', ''],
-            ['TL Portföy Oranı', toplam_tl_portfoy / toplam_portfoy if toplam_portfoy > 0 else 0],
-            ['USD Portföy Oranı', toplam_usd_portfoy_tl / toplam_portfoy if toplam_portfoy > 0 else 0],
-            ['', ''],
-            ['6. GÜNCEL BİLGİLER', ''],
-            ['Güncel USD/TL Kuru', guncel_kur],
-            ['Rapor Tarihi', datetime.now().strftime('%d.%m.%Y %H:%M')]
-        ]
+        st.success(f"{sonuc.eklenen:,} mevduat aktarıldı!")
         
-        # Verileri yaz ve formatla
-        for row, (label, value) in enumerate(data):
-            ozet.write(row, 0, label)
-            
-            # Başlıklar
-            if label.startswith(('1.', '2.', '3.', '4.', '5.', '6.')):
-                ozet.write(row, 0, label, header_format)
-                ozet.write(row, 1, value, header_format)
-                continue
-                
-            # Boş satırlar
-            if label == '':
-                ozet.write(row, 1, value)
-                continue
-            
-            # Değer formatlamaları
-            if 'Adedi' in label or 'Gün' in label:
-                ozet.write(row, 1, value, number)
-            elif 'TL' in label and ('Anapara' in label or 'Faiz' in label or 'Değeri' in label):
-                ozet.write(row, 1, value, money_tl)
-            elif 'USD' in label and ('Anapara' in label or 'Faiz' in label):
-                ozet.write(row, 1, value, money_usd)
-            elif 'Oran' in label or 'Payı' in label:
-                ozet.write(row, 1, value, percent)
-            elif 'Kur' in label:
-                ozet.write(row, 1, value, kur)
-            else:
-                ozet.write(row, 1, value)
+        # Satır bazlı hata raporu
+        if sonuc.hatalar:
+            hata_df = pd.DataFrame(sonuc.hatalar)
+            st.warning(f"{len(hata_df):,} satır aktarılamadı.")
+            st.dataframe(hata_df, hide_index=True, use_container_width=True)
+            st.download_button(
+                label="Hata Raporunu İndir",
+                data=hata_df.to_csv(index=False).encode('utf-8'),
+                file_name="aktarim_hatalari.csv",
+                mime="text/csv"
+            )
+
+@st.fragment
+@olcum.olculen('faiz_karsilastirma')
+def faiz_karsilastirma():
+    """Banka, vade ve mevduat tipi kombinasyonlarını tek ekranda karşılaştır"""
+    import plotly.express as px
+    
+    with st.expander("Faiz Karşılaştırma"):
+        vadeler = st.multiselect("Vadeler (Gün)", VADE_SECENEKLERI, default=VARSAYILAN_VADELER)
+        if not vadeler:
+            st.info("Lütfen en az bir vade seçiniz.")
+            return
+        vadeler = sorted(vadeler)
+        
+        st.caption("Faiz oranlarını (%) bankaların güncel tekliflerine göre düzenleyiniz.")
+        oranlar = st.data_editor(
+            oran_tablosu_olustur(vadeler),
+            key=f"karsilastirma_oranlari_{'_'.join(map(str, vadeler))}",
+            disabled=['mevduat_tipi', 'banka'],
+            column_config={
+                "mevduat_tipi": "Mevduat Tipi",
+                "banka": "Banka",
+                **{str(vade): st.column_config.NumberColumn(f"{vade} Gün", min_value=0.0, format="%.2f") for vade in vadeler}
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            tutar = st.slider("Tutar (TL)", min_value=10000, max_value=10000000, value=1000000, step=10000)
+        with col2:
+            olcut = st.radio("Ölçüt", list(OLCUTLER), format_func=OLCUTLER.get, key="karsilastirma_olcutu")
         
-        # Diğer sayfaları yaz
-        if not df[df['mevduat_tipi'] == 'TL Mevduat'].empty:
-            df[df['mevduat_tipi'] == 'TL Mevduat'][TL_KOLONLAR].to_excel(
-                excel_writer, sheet_name='TL Mevduatlar', index=False
+        guncel_kur = get_guncel_kur()
+        kurlar = get_guncel_kurlar()
+        izgara = karsilastirma_izgarasi(oranlar, tutar, guncel_kur, kurlar)
+        en_iyi = en_iyi_hucre(izgara, olcut)
+        
+        if en_iyi is None:
+            st.info("Karşılaştırılabilecek faiz oranı bulunmamaktadır.")
+        else:
+            st.success(
+                f"En iyi seçenek: {en_iyi['banka']} - {en_iyi['mevduat_tipi']} - {en_iyi['vade']} gün "
+                f"(Net faiz: {en_iyi['net_faiz_tl']:,.0f} ₺, yıllık net getiri: %{en_iyi['yillik_net_getiri']:.2f})"
+            )
+        
+        tablo = izgara.pivot_table(index=['mevduat_tipi', 'banka'], columns='vade', values=olcut, sort=False)
+        fig = px.imshow(
+            tablo.to_numpy(),
+            x=[f"{v} gün" for v in tablo.columns],
+            y=[f"{banka} ({tip.split()[0]})" for tip, banka in tablo.index],
+            text_auto='.2f' if olcut == 'yillik_net_getiri' else ',.0f',
+            color_continuous_scale='Greens',
+            aspect='auto',
+            title=OLCUTLER[olcut]
+        )
+        # En iyi hücre çerçeve ile işaretlenir
+        if en_iyi is not None:
+            satir = tablo.index.get_loc((en_iyi['mevduat_tipi'], en_iyi['banka']))
+            kolon = tablo.columns.get_loc(en_iyi['vade'])
+            fig.add_shape(
+                type="rect",
+                x0=kolon - 0.5, x1=kolon + 0.5, y0=satir - 0.5, y1=satir + 0.5,
+                line=dict(color="red", width=3)
             )
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Döviz mevduatları güncel kurlarla TL'ye çevrilmiştir; kur değişimi dikkate alınmamıştır.")
         
-        if not df[df['mevduat_tipi'] == 'USD Mevduat'].empty:
-            df[df['mevduat_tipi'] == 'USD Mevduat'][USD_KOLONLAR].to_excel(
-                excel_writer, sheet_name='USD Mevduatlar', index=False
+        goster_optimum_dagilim(oranlar, tutar, guncel_kur, olcut, kurlar)
+
+def goster_optimum_dagilim(oranlar, tutar, guncel_kur, olcut, kurlar=None):
+    """Tutarı kısıtlar altında bankalara, vadelere ve döviz tiplerine en iyi şekilde dağıt"""
+    st.write("#### Optimum Dağılım")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        banka_limiti = st.number_input(
+            "Banka Başına Üst Sınır (TL, 0 = sınırsız)",
+            min_value=0, value=0, step=50000, key="dagilim_banka_limiti"
+        )
+        doviz_payi = st.slider("Döviz Mevduat Payı (%)", 0, 100, (0, 100), key="dagilim_doviz_payi")
+    with col2:
+        likidite_gun = st.number_input("Likidite Vadesi (Gün)", min_value=1, value=92, key="dagilim_likidite_gun")
+        likidite_payi = st.slider("Bu Vadede Dönecek En Az Pay (%)", 0, 100, 0, key="dagilim_likidite_payi")
+    
+    bankalar = oranlar['banka'].unique()
+    try:
+        sonuc = dagilim_optimize_et(
+            urun_tablosu(oranlar),
+            tutar,
+            guncel_kur,
+            banka_limitleri={banka: banka_limiti or None for banka in bankalar},
+            doviz_payi=(doviz_payi[0] / 100, doviz_payi[1] / 100),
+            likidite_hedefleri={likidite_gun: likidite_payi / 100},
+            olcut=olcut,
+            kurlar=kurlar
+        )
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Toplam Net Faiz", f"{sonuc.ozet['net_faiz_tl']:,.0f} ₺")
+    with col2:
+        st.metric("Yıllık Net Getiri", f"%{sonuc.ozet['yillik_net_getiri']:.2f}")
+    with col3:
+        st.metric("Ağırlıklı Vade", f"{sonuc.ozet['agirlikli_vade']:.0f} gün")
+    
+    st.dataframe(
+        sonuc.dagilim,
+        hide_index=True,
+        column_config={
+            "mevduat_tipi": "Mevduat Tipi",
+            "banka": "Banka",
+            "vade": st.column_config.NumberColumn("Vade (Gün)", format="%d"),
+            "tutar": st.column_config.NumberColumn("Tutar (TL)", format="%d ₺"),
+            "faiz_orani": st.column_config.NumberColumn("Faiz Oranı", format="%.2f%%"),
+            "stopaj_orani": st.column_config.NumberColumn("Stopaj Oranı", format="%.1f%%"),
+            "net_faiz_tl": st.column_config.NumberColumn("Net Faiz (TL)", format="%d ₺"),
+            "yillik_net_getiri": st.column_config.NumberColumn("Yıllık Net Getiri", format="%.2f%%")
+        },
+        use_container_width=True
+    )
+
+@st.fragment
+@olcum.olculen('vade_takvimi')
+def vade_takvimi():
+    """Vade takvimi sekmesi"""
+    import plotly.express as px
+    
+    merdiven = vade_merdiveni_getir(oturum_deposu().durum())
+    guncel_kur = get_guncel_kur()
+    bugun = date.today()
+    
+    st.write("### Yaklaşan Nakit Dönüşleri")
+    col1, col2, col3 = st.columns(3)
+    for col, gun in zip((col1, col2, col3), (7, 30, 90)):
+        akis = merdiven.nakit_akisi(bugun, bugun + timedelta(days=gun))
+        with col:
+            st.metric(
+                f"{gun} Gün İçinde",
+                f"{akis['donus_tl'] + akis['donus_usd'] * guncel_kur:,.0f} ₺",
+                f"{akis['adet_tl'] + akis['adet_usd']:.0f} mevduat",
+                delta_color="off"
             )
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        aralik = st.date_input(
+            "Tarih Aralığı",
+            value=(bugun, bugun + timedelta(days=365)),
+            key="takvim_araligi"
+        )
+    with col2:
+        frekans = st.radio("Dönem", ["Haftalık", "Aylık"], index=1, horizontal=True, key="takvim_frekans")
+    
+    if len(aralik) != 2:
+        st.info("Lütfen başlangıç ve bitiş tarihini seçiniz.")
+        return
+    
+    takvim = merdiven.takvim(aralik[0], aralik[1], 'W-MON' if frekans == "Haftalık" else 'MS')
+    takvim['Toplam Dönüş (TL)'] = takvim['donus_tl'] + takvim['donus_usd'] * guncel_kur
+    
+    fig = px.bar(
+        takvim.reset_index(),
+        x='donem',
+        y='Toplam Dönüş (TL)',
+        title='Dönemlere Göre Vadesi Dolan Tutarlar',
+        labels={'donem': 'Dönem'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.write("### Sıradaki Vadeler")
+    adet = st.number_input("Gösterilecek Mevduat Sayısı", min_value=1, max_value=500, value=10, key="takvim_adet")
+    sonraki = merdiven.sonraki_vadeler(int(adet), bugun)
+    # Anapara ve döviz dönüşü her mevduatın kendi para birimindedir
+    sonraki = sonraki.assign(para_birimi=sonraki['mevduat_tipi'].map(PARA_BIRIMLERI))
+    st.dataframe(
+        sonraki,
+        hide_index=True,
+        column_config={
+            "mevduat_tipi": "Mevduat Tipi",
+            "banka": "Banka",
+            "tutar": st.column_config.NumberColumn("Anapara", format="%d"),
+            "vade_bitis": st.column_config.DateColumn("Vade Bitiş"),
+            "donus_tutari_tl": st.column_config.NumberColumn("Toplam Dönüş (TL)", format="%d ₺"),
+            "donus_tutari_usd": st.column_config.NumberColumn("Toplam Dönüş (Döviz)", format="%.2f"),
+            "para_birimi": "Para Birimi"
+        },
+        use_container_width=True
+    )
+
+@st.fragment(run_every=0.5)
+def kur_bekleniyor():
+    """İlk kur gelene kadar yer tutucu göster, gelince uygulamayı yeniden çalıştır"""
+    if not kur_saglayici.bekleniyor_mu():
+        st.rerun()
+    st.info("Güncel USD/TL kuru alınıyor...")
+
+@st.fragment(run_every=KUR_KONTROL_ARALIGI)
+@olcum.olculen('kur_bandi')
+def kur_bandi():
+    """Güncel kur bilgisi ve kuru yenileme butonu"""
+    kur_col1, kur_col2 = st.columns([3, 1])
+    with kur_col2:
+        if st.button("Güncel Kuru Getir", type="primary"):
+            get_guncel_kur(zorla=True)
+    
+    # Kurlar (butonla ya da zamanlayıcıyla) değiştiyse onlara bağlı tüm bölümler yenilenir,
+    # değişmediyse sadece bu bölüm
+    kurlar = get_guncel_kurlar()
+    if st.session_state.setdefault('gorulen_kurlar', kurlar) != kurlar:
+        st.session_state.gorulen_kurlar = kurlar
+        st.rerun()
+    
+    with kur_col1:
+        guncelleme = kur_saglayici.zaman.strftime('%H:%M:%S') if kur_saglayici.zaman else '-'
+        diger_kurlar = " · ".join(
+            f"{mevduat_tipi.split()[0]}: {kurlar[para]:,.4f} ₺"
+            for mevduat_tipi, para in ((tip, PARA_BIRIMLERI[tip]) for tip in DOVIZ_TIPLERI)
+            if para != 'USD' and para in kurlar
+        )
+        st.info(
+            f"Güncel USD/TL Kuru: {get_guncel_kur():.4f} ₺ (Son güncelleme: {guncelleme})"
+            + (f"  \n{diger_kurlar}" if diger_kurlar else "")
+        )
+        if kur_saglayici.bayat_mi():
+            st.warning("Kur güncellenemedi, son bilinen kur kullanılıyor.")
+
+@st.fragment
+@olcum.olculen('veri_girisi')
+def veri_girisi():
+    """Veri giriş formu (kayıt sonrası tüm uygulama yenilenir)"""
+    veri_giris_formu()
+
+@st.fragment
+def performans_olcumleri():
+    """Bölüm bazında çizim sürelerini göster"""
+    with st.expander("Performans Ölçümleri"):
+        st.button("Yenile", key="performans_yenile")
+        ozet = olcum.etkilesim_ozeti()
+        if not ozet:
+            st.info("Henüz ölçüm bulunmamaktadır.")
+            return
+        st.dataframe(
+            pd.DataFrame(ozet),
+            hide_index=True,
+            column_config={
+                "bolum": "Bölüm",
+                "adet": "Çizim Sayısı",
+                "son_ms": st.column_config.NumberColumn("Son (ms)", format="%.1f"),
+                "medyan_ms": st.column_config.NumberColumn("Medyan (ms)", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("%95 (ms)", format="%.1f")
+            },
+            use_container_width=True
+        )
+        st.caption("Her bölüm yalnızca kendi girdileri değiştiğinde yeniden çizilir; sayfa satırı tam yenilemeleri gösterir.")
         
-        excel_writer.close()
+        onbellek = grafik_onbellegi.durum()
+        st.caption(
+            f"Grafik önbelleği: {onbellek.isabet:,} isabet, {onbellek.iska:,} ıska "
+            f"({onbellek.boyut}/{onbellek.kapasite} grafik)"
+        )
         
-        with open('mevduat_portfoy.xlsx', 'rb') as f:
-            return f.read()
-    return None
+        kur = kur_saglayici.metrikler()
+        sure = f"son {kur.son_sure_ms:,.0f} ms, medyan {kur.medyan_sure_ms:,.0f} ms" if kur.deneme else "-"
+        sonraki = f", sonraki deneme {kur.sonraki_deneme_sn:,.0f} sn sonra" if kur.sonraki_deneme_sn is not None else ""
+        st.caption(
+            f"Kur yenileme: {kur.deneme:,} deneme, {kur.hata:,} hata "
+            f"({kur.ardisik_hata} ardışık); getirme süresi {sure}{sonraki}"
+        )
+
+def defter_secimi():
+    """Oturumun portföy defterini göster, başka bir deftere geçmeyi sağla"""
+    defter = oturum_defteri()
+    with st.sidebar:
+        yeni = st.text_input("Portföy Anahtarı", value=defter).strip()
+        st.caption(
+            "Her anahtarın ayrı bir portföyü vardır. Bu sayfanın adresini saklayarak portföyünüze "
+            "geri dönebilirsiniz; anahtarı bilen herkes portföyü görebilir."
+        )
+    if yeni and yeni != defter:
+        st.query_params['defter'] = yeni
+        st.rerun()
+    
+    # Geçersiz anahtarlar depo açılırken reddedilir
+    try:
+        oturum_deposu()
+    except ValueError as e:
+        st.error(str(e))
+        return False
+    return True
 
 def main():
     """Ana uygulama"""
     st.title("Portföy Takip 💸")
     
-    if 'guncel_kur' not in st.session_state:
-        st.session_state.guncel_kur = get_guncel_kur()
+    if not defter_secimi():
+        return
+    
+    # Kurlar süreç genelinde tek bir zamanlayıcıyla yenilenir; ilk kur gelene kadar
+    # sayfa yer tutucuyla çizilir
+    kur_saglayici.baslat()
+    if kur_saglayici.bekleniyor_mu():
+        kur_bekleniyor()
+        return
     
     guncelle_mevcut_kayitlar()
     
-    kur_col1, kur_col2 = st.columns([3, 1])
-    with kur_col1:
-        st.info(f"Güncel USD/TL Kuru: {st.session_state.guncel_kur:.4f} ₺")
-    with kur_col2:
-        if st.button("Güncel Kuru Getir", type="primary"):
-            st.session_state.guncel_kur = get_guncel_kur()
-            st.rerun()
+    # Bölümler ayrı fragment'lardır; bir bölümdeki etkileşim yalnızca o bölümü yeniden çalıştırır
+    kur_bandi()
     
-    tab1, tab2, tab3 = st.tabs(["Veri Girişi", "Mevduat Listesi", "Portföy Analizi"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Veri Girişi", "Mevduat Listesi", "Portföy Analizi", "Vade Takvimi"])
     
     with tab1:
-        veri_giris_formu()
+        veri_girisi()
+        toplu_ice_aktarim_formu()
+        faiz_karsilastirma()
     
-    if 'mevduatlar' in st.session_state and st.session_state.mevduatlar:
-        df = pd.DataFrame(st.session_state.mevduatlar)
-        
+    if oturum_deposu().adet():
         with tab2:
-            mevduat_listesi(df)
+            mevduat_listesi()
         
         with tab3:
-            portfoy_analizi(df)
+            portfoy_analizi()
+        
+        with tab4:
+            vade_takvimi()
     else:
-        with tab2, tab3:
-            st.warning("Henüz kayıtlı mevduat bulunmamaktadır!")
+        for tab in (tab2, tab3, tab4):
+            with tab:
+                st.warning("Henüz kayıtlı mevduat bulunmamaktadır!")
+    
+    performans_olcumleri()
 
 if __name__ == "__main__":
+    olcum.baslangic_isaretle(_calisma_baslangici)
     main()
+    olcum.etkilesim_kaydet('sayfa', time.perf_counter() - _calisma_baslangici)
+    
+    # İlk çizim yer tutucuyla, tam çizim kur geldikten sonra gerçekleşir
+    olcum.kaydet('ilk_cizim', time.perf_counter() - _calisma_baslangici)
+    if not kur_saglayici.bekleniyor_mu():
+        olcum.kaydet('tam_cizim', time.perf_counter() - olcum.baslangic())
@@ -1,3 +1,5 @@
+from datetime import date
+
 # Banka listesi
 BANKALAR = [
     "Halkbank", 
@@ -7,27 +9,66 @@ BANKALAR = [
     "Yapı Kredi"
 ]
 
+# Mevduat tiplerinin para birimleri (altın gram cinsindendir)
+PARA_BIRIMLERI = {
+    'TL Mevduat': 'TRY',
+    'USD Mevduat': 'USD',
+    'EUR Mevduat': 'EUR',
+    'GBP Mevduat': 'GBP',
+    'Altın Mevduat': 'XAU'
+}
+
 # Mevduat tipleri
-MEVDUAT_TIPLERI = ["TL Mevduat", "USD Mevduat"]
+MEVDUAT_TIPLERI = list(PARA_BIRIMLERI)
+
+# Anapara ve faizi kendi para biriminde tutulup TL'ye güncel kurla çevrilen tipler
+DOVIZ_TIPLERI = [tip for tip, para in PARA_BIRIMLERI.items() if para != 'TRY']
+
+# Para birimi sembolleri
+PARA_SEMBOLLERI = {
+    'TRY': '₺',
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'XAU': 'gr'
+}
 
 # Varsayılan faiz oranları
 VARSAYILAN_FAIZ = {
     'TL Mevduat': 50.00,
-    'USD Mevduat': 4.75
+    'USD Mevduat': 4.75,
+    'EUR Mevduat': 3.00,
+    'GBP Mevduat': 3.50,
+    'Altın Mevduat': 0.50
 }
 
-# Stopaj oranları
-STOPAJ_ORANLARI = {
-    'TL Mevduat': {
-        '6_ay': 10.0,  # 6 aya kadar %10
-        '1_yil': 7.5,  # 1 yıla kadar %7.5
-        'uzun': 5.0    # 1 yıldan uzun %5
-    },
-    'USD Mevduat': {
-        '6_ay': 25.0,  # 6 aya kadar %15
-        '1_yil': 25.0, # 1 yıla kadar %12
-        'uzun': 25.0   # 1 yıldan uzun %10
-    }
+# Stopaj vade bantları ve bant üst sınırları (gün, sınır dahil)
+STOPAJ_BANTLARI = ['6_ay', '1_yil', 'uzun']
+STOPAJ_BANT_SINIRLARI = [180, 365]
+
+# Yürürlük tarihli stopaj kuralları: para birimi -> [(yürürlük başlangıcı, bant oranları)]
+# Mevduata açılış tarihinde yürürlükte olan en son kural uygulanır. Tablo şimdilik
+# yalnızca güncel oranları içerir; oran değişiklikleri yürürlük tarihiyle eklenmelidir.
+STOPAJ_KURALLARI = {
+    'TRY': [
+        (date.min, {
+            '6_ay': 10.0,  # 6 aya kadar %10
+            '1_yil': 7.5,  # 1 yıla kadar %7.5
+            'uzun': 5.0    # 1 yıldan uzun %5
+        })
+    ],
+    'USD': [
+        (date.min, {'6_ay': 25.0, '1_yil': 25.0, 'uzun': 25.0})
+    ],
+    'EUR': [
+        (date.min, {'6_ay': 25.0, '1_yil': 25.0, 'uzun': 25.0})
+    ],
+    'GBP': [
+        (date.min, {'6_ay': 25.0, '1_yil': 25.0, 'uzun': 25.0})
+    ],
+    'XAU': [
+        (date.min, {'6_ay': 25.0, '1_yil': 25.0, 'uzun': 25.0})
+    ]
 }
 
 # Kolon tanımları
@@ -68,15 +109,33 @@ USD_KOLONLAR = [
     'kalan_gun'
 ]
 
-# Portföy özeti için kolonlar
-PORTFOY_KOLONLAR = [
+# Mevduat tipine göre liste kolonları; döviz mevduatlarında *_usd kolonları
+# mevduatın kendi para birimindeki (EUR, GBP, gram altın) tutarları tutar
+MEVDUAT_KOLONLARI = {
+    tip: TL_KOLONLAR if tip == 'TL Mevduat' else USD_KOLONLAR
+    for tip in MEVDUAT_TIPLERI
+}
+
+# Kalıcı depoda tutulan tüm kolonlar (hesapla çıktısı sırasıyla)
+KAYIT_KOLONLAR = [
     'mevduat_tipi',
     'banka',
-    'vade_baslangic',
-    'vade_bitis',
     'tutar',
     'faiz_orani',
+    'vade_baslangic',
+    'vade_bitis',
+    'orijinal_vade',
+    'kalan_gun',
+    'baslangic_kur',
+    'stopaj_orani',
+    'brut_faiz',
+    'stopaj_tutari',
     'net_faiz',
     'donus_tutari_tl',
-    'kalan_gun'
+    'tutar_usd',
+    'basabas_kur',
+    'brut_faiz_usd',
+    'stopaj_tutari_usd',
+    'net_faiz_usd',
+    'donus_tutari_usd'
 ]
\ No newline at end of file
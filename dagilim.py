@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+import numpy as np
+
+from constants import DOVIZ_TIPLERI
+from karsilastirma import urunleri_hesapla
+from hesaplama import hesapla_stopaj_orani_toplu, tl_kurlari
+
+DagilimSonucu = namedtuple('DagilimSonucu', ['dagilim', 'ozet'])
+
+
+def _birim_getiriler(urunler, olcut):
+    """Ürün başına 1 TL'nin stopaj sonrası getirisi (hesapla'daki net getiri formülü)"""
+    vade = urunler['vade'].to_numpy(dtype=float)
+    faiz_orani = urunler['faiz_orani'].to_numpy(dtype=float)
+    stopaj_orani = hesapla_stopaj_orani_toplu(vade, urunler['mevduat_tipi'].to_numpy())
+
+    net_oran = (faiz_orani / 100) * (1 - stopaj_orani / 100)
+    if olcut == 'yillik_net_getiri':
+        return net_oran
+    return net_oran * vade / 365
+
+
+def dagilim_optimize_et(urunler, toplam_tutar, guncel_kur, banka_limitleri=None, doviz_payi=(0.0, 1.0),
+                        likidite_hedefleri=None, urun_limiti=None, olcut='net_faiz_tl', kurlar=None):
+    """Toplam tutarı kısıtlar altında stopaj sonrası getiriyi en büyükleyecek şekilde ürünlere dağıt
+
+    banka_limitleri: banka -> en fazla yatırılabilecek TL tutar (ör. mevduat sigortası sınırı)
+    doviz_payi: döviz mevduatlarının toplam içindeki (en az, en fazla) payı
+    likidite_hedefleri: gün -> o gün içinde vadesi dolması gereken en az pay
+    urun_limiti: tek bir ürüne yatırılabilecek en fazla TL tutar
+    """
+    from scipy.optimize import linprog
+
+    # Kuru alınamayan para birimlerindeki ürünler dağılıma katılmaz
+    urunler = urunler.dropna(subset=['faiz_orani'])
+    urunler = urunler[~np.isnan(tl_kurlari(urunler['mevduat_tipi'], guncel_kur, kurlar))].reset_index(drop=True)
+    if urunler.empty:
+        raise ValueError("Dağıtılacak ürün bulunmamaktadır")
+
+    getiri = _birim_getiriler(urunler, olcut)
+    doviz = urunler['mevduat_tipi'].isin(DOVIZ_TIPLERI).to_numpy(dtype=float)
+    vade = urunler['vade'].to_numpy()
+
+    # Eşitsizlikler A_ub @ x <= b_ub biçiminde toplanır
+    A_ub, b_ub = [], []
+    for banka, limit in (banka_limitleri or {}).items():
+        if limit is not None:
+            A_ub.append((urunler['banka'] == banka).to_numpy(dtype=float))
+            b_ub.append(limit)
+
+    doviz_min, doviz_max = doviz_payi
+    A_ub += [doviz, -doviz]
+    b_ub += [doviz_max * toplam_tutar, -doviz_min * toplam_tutar]
+
+    for gun, pay in (likidite_hedefleri or {}).items():
+        A_ub.append(-(vade <= gun).astype(float))
+        b_ub.append(-pay * toplam_tutar)
+
+    sonuc = linprog(
+        -getiri,
+        A_ub=np.vstack(A_ub),
+        b_ub=np.array(b_ub, dtype=float),
+        A_eq=np.ones((1, len(urunler))),
+        b_eq=[toplam_tutar],
+        bounds=(0, urun_limiti),
+        method='highs'
+    )
+    if sonuc.status != 0:
+        raise ValueError(f"Kısıtları sağlayan bir dağılım bulunamadı: {sonuc.message}")
+
+    # Tutarlar tam TL'ye yuvarlanır, yuvarlama farkı en büyük kaleme eklenir
+    tutarlar = np.round(sonuc.x)
+    secim = tutarlar > 0
+    tutarlar[np.argmax(tutarlar)] += toplam_tutar - tutarlar.sum()
+
+    dagilim = urunleri_hesapla(urunler[secim], tutarlar[secim], guncel_kur, kurlar)
+    dagilim.insert(3, 'tutar', tutarlar[secim].astype(np.int64))
+    dagilim = dagilim.sort_values('tutar', ascending=False).reset_index(drop=True)
+
+    net_faiz = dagilim['net_faiz_tl'].sum()
+    ozet = {
+        'toplam_tutar': toplam_tutar,
+        'net_faiz_tl': net_faiz,
+        'agirlikli_vade': (dagilim['tutar'] * dagilim['vade']).sum() / toplam_tutar,
+        'yillik_net_getiri': (dagilim['tutar'] * dagilim['yillik_net_getiri']).sum() / toplam_tutar,
+        'doviz_payi': dagilim.loc[dagilim['mevduat_tipi'].isin(DOVIZ_TIPLERI), 'tutar'].sum() / toplam_tutar
+    }
+    return DagilimSonucu(dagilim, ozet)
@@ -0,0 +1,555 @@
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import pandas as pd
+
+from constants import KAYIT_KOLONLAR
+
+# Varsayılan veritabanı dosyası (ortak defter)
+VARSAYILAN_YOL = os.environ.get('MEVDUAT_DB', 'mevduat.db')
+# Her portföy (defter) bu klasörde kendi veritabanı dosyasında tutulur
+DEFTER_KLASORU = os.environ.get('MEVDUAT_DEFTER_KLASORU', 'defterler')
+# VARSAYILAN_YOL'daki veritabanını açan defter adı
+ORTAK_DEFTER = 'ortak'
+# Süreçte aynı anda açık tutulan en fazla defter sayısı
+ACIK_DEFTER_SINIRI = 32
+# Artımlı okuyucunun sakladığı en fazla filtre sonucu
+OKUYUCU_KAPASITESI = 8
+
+TARIH_KOLONLARI = ['vade_baslangic', 'vade_bitis']
+TAMSAYI_KOLONLARI = [
+    'tutar',
+    'orijinal_vade',
+    'kalan_gun',
+    'brut_faiz',
+    'stopaj_tutari',
+    'net_faiz',
+    'donus_tutari_tl'
+]
+METIN_KOLONLARI = ['mevduat_tipi', 'banka']
+
+# Son anlık görüntüden bu kadar olay sonra yeni anlık görüntü alınır
+ANLIK_GORUNTU_ARALIGI = 5000
+# Taban görüntüye ek olarak saklanan en yeni anlık görüntü sayısı
+ANLIK_GORUNTU_SAKLAMA = 4
+
+# yol, farklı defterlerin aynı sürüm numaralarının önbellek anahtarlarında karışmasını önler
+DepoDurumu = namedtuple('DepoDurumu', ['surum', 'silme_surumu', 'yol'])
+
+_DEFTER_ADI = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+def _sql_tipi(kolon):
+    """Kolonun SQLite tipini belirle"""
+    if kolon in METIN_KOLONLARI or kolon in TARIH_KOLONLARI:
+        return 'TEXT'
+    if kolon in TAMSAYI_KOLONLARI:
+        return 'INTEGER'
+    return 'REAL'
+
+
+def _zaman_metni(zaman=None):
+    """Olay zamanını sıralanabilir ISO metnine çevir (tarih verilirse o günün sonu)"""
+    if zaman is None:
+        zaman = datetime.now()
+    elif not isinstance(zaman, datetime):
+        zaman = datetime.combine(pd.Timestamp(zaman).date(), time.max)
+    return zaman.isoformat(timespec='microseconds')
+
+
+def _satirlara_cevir(kayitlar):
+    """Kayıt listesini veya DataFrame'i SQLite satırlarına çevir"""
+    df = kayitlar if isinstance(kayitlar, pd.DataFrame) else pd.DataFrame(list(kayitlar))
+    df = df.reindex(columns=KAYIT_KOLONLAR)
+
+    kolonlar = []
+    for kolon in KAYIT_KOLONLAR:
+        seri = df[kolon]
+        if kolon in TARIH_KOLONLARI:
+            seri = pd.to_datetime(seri).dt.strftime('%Y-%m-%d')
+        elif kolon in TAMSAYI_KOLONLARI:
+            seri = pd.to_numeric(seri).round().astype('Int64')
+        # NaN değerler NULL olarak yazılır
+        kolonlar.append(seri.astype(object).where(seri.notna(), None).tolist())
+    return list(zip(*kolonlar))
+
+
+class MevduatDeposu:
+    """Mevduatları SQLite (WAL) üzerinde kalıcı olarak saklayan depo
+
+    mevduatlar tablosu portföyün güncel halidir. Her değişiklik aynı işlem içinde
+    yalnızca eklenen olay kaydına da yazılır ve belirli aralıklarla tablonun anlık
+    görüntüsü alınır; geçmiş bir andaki portföy en yakın anlık görüntü ile ondan
+    sonraki kısa olay kuyruğundan kurulur.
+    """
+
+    def __init__(self, yol=VARSAYILAN_YOL):
+        self.yol = yol
+        self._kilit = threading.RLock()
+        self._baglanti = sqlite3.connect(yol, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.execute("PRAGMA synchronous=NORMAL")
+        self._tablolari_olustur()
+
+    def _tablolari_olustur(self):
+        """Tablo ve indeksleri oluştur"""
+        kolonlar = ",\n".join(f"{kolon} {_sql_tipi(kolon)}" for kolon in KAYIT_KOLONLAR)
+        with self._kilit, self._baglanti:
+            self._baglanti.executescript(f"""
+                CREATE TABLE IF NOT EXISTS mevduatlar (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    surum INTEGER NOT NULL,
+                    {kolonlar}
+                );
+                CREATE INDEX IF NOT EXISTS idx_mevduat_banka ON mevduatlar(banka);
+                CREATE INDEX IF NOT EXISTS idx_mevduat_tipi ON mevduatlar(mevduat_tipi);
+                CREATE INDEX IF NOT EXISTS idx_mevduat_vade_bitis ON mevduatlar(vade_bitis);
+                CREATE INDEX IF NOT EXISTS idx_mevduat_surum ON mevduatlar(surum);
+                CREATE TABLE IF NOT EXISTS meta (
+                    anahtar TEXT PRIMARY KEY,
+                    deger
+                );
+                INSERT OR IGNORE INTO meta VALUES ('surum', 0), ('silme_surumu', 0);
+                CREATE TABLE IF NOT EXISTS olaylar (
+                    olay_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    zaman TEXT NOT NULL,
+                    tur TEXT NOT NULL,
+                    kayit_id INTEGER,
+                    veri TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_olay_zaman ON olaylar(zaman);
+                CREATE INDEX IF NOT EXISTS idx_olay_kayit ON olaylar(kayit_id);
+                CREATE TABLE IF NOT EXISTS anlik_goruntuler (
+                    olay_id INTEGER PRIMARY KEY,
+                    zaman TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS anlik_goruntu_kayitlari (
+                    olay_id INTEGER NOT NULL,
+                    id INTEGER NOT NULL,
+                    {kolonlar},
+                    PRIMARY KEY (olay_id, id)
+                );
+            """)
+            # Olay kaydından önceki kayıtlar taban görüntüde yer alır
+            if self._baglanti.execute("SELECT COUNT(*) FROM anlik_goruntuler").fetchone()[0] == 0:
+                self._anlik_goruntu_yaz()
+
+    def _surum_arttir(self, anahtar='surum'):
+        """Meta sayacını bir arttır ve yeni değeri döndür"""
+        self._baglanti.execute("UPDATE meta SET deger = deger + 1 WHERE anahtar = ?", (anahtar,))
+        return self._baglanti.execute("SELECT deger FROM meta WHERE anahtar = ?", (anahtar,)).fetchone()[0]
+
+    def _olay_yaz(self, tur, surum):
+        """Verilen sürümle yazılmış kayıtların tam halini olay olarak ekle"""
+        alanlar = ", ".join(f"'{kolon}', {kolon}" for kolon in KAYIT_KOLONLAR)
+        self._baglanti.execute(
+            f"INSERT INTO olaylar (zaman, tur, kayit_id, veri) "
+            f"SELECT ?, ?, id, json_object({alanlar}) FROM mevduatlar WHERE surum = ? ORDER BY id",
+            (_zaman_metni(), tur, surum)
+        )
+        self._anlik_goruntu_gerekirse_al()
+
+    def _isaret_yaz(self, tur, veri):
+        """Kayıt değeri taşımayan (türetilmiş alan yenileme gibi) bir olay ekle"""
+        self._baglanti.execute(
+            "INSERT INTO olaylar (zaman, tur, veri) VALUES (?, ?, ?)",
+            (_zaman_metni(), tur, json.dumps(veri, ensure_ascii=False))
+        )
+
+    def _anlik_goruntu_yaz(self):
+        """Tablonun son olaydaki halini anlık görüntü olarak kaydet, eski görüntüleri temizle"""
+        olay_id = self._baglanti.execute("SELECT COALESCE(MAX(olay_id), 0) FROM olaylar").fetchone()[0]
+        imlec = self._baglanti.execute(
+            "INSERT OR IGNORE INTO anlik_goruntuler VALUES (?, ?)", (olay_id, _zaman_metni())
+        )
+        if imlec.rowcount == 0:
+            return olay_id
+
+        kolonlar = ", ".join(KAYIT_KOLONLAR)
+        self._baglanti.execute(
+            f"INSERT INTO anlik_goruntu_kayitlari (olay_id, id, {kolonlar}) "
+            f"SELECT ?, id, {kolonlar} FROM mevduatlar",
+            (olay_id,)
+        )
+
+        # Taban görüntü ve en yeni görüntüler dışındakiler silinir; olaylar hiç silinmez
+        goruntuler = [s[0] for s in self._baglanti.execute("SELECT olay_id FROM anlik_goruntuler ORDER BY olay_id")]
+        silinecek = [(g,) for g in goruntuler[1:-ANLIK_GORUNTU_SAKLAMA]]
+        self._baglanti.executemany("DELETE FROM anlik_goruntuler WHERE olay_id = ?", silinecek)
+        self._baglanti.executemany("DELETE FROM anlik_goruntu_kayitlari WHERE olay_id = ?", silinecek)
+        return olay_id
+
+    def _anlik_goruntu_gerekirse_al(self):
+        """Son görüntüden bu yana ANLIK_GORUNTU_ARALIGI kadar olay biriktiyse görüntü al"""
+        son_olay, son_goruntu = self._baglanti.execute(
+            "SELECT (SELECT COALESCE(MAX(olay_id), 0) FROM olaylar), "
+            "(SELECT COALESCE(MAX(olay_id), 0) FROM anlik_goruntuler)"
+        ).fetchone()
+        if son_olay - son_goruntu >= ANLIK_GORUNTU_ARALIGI:
+            self._anlik_goruntu_yaz()
+
+    def anlik_goruntu_al(self):
+        """Güncel durumun anlık görüntüsünü al, görüntünün kapsadığı son olay numarasını döndür"""
+        with self._kilit, self._baglanti:
+            return self._anlik_goruntu_yaz()
+
+    def durum(self):
+        """Depo sürüm bilgilerini döndür"""
+        with self._kilit:
+            meta = dict(self._baglanti.execute("SELECT anahtar, deger FROM meta").fetchall())
+        return DepoDurumu(meta['surum'], meta['silme_surumu'], self.yol)
+
+    def meta_oku(self, anahtar, varsayilan=None):
+        """Meta tablosundan bir değer oku"""
+        with self._kilit:
+            satir = self._baglanti.execute("SELECT deger FROM meta WHERE anahtar = ?", (anahtar,)).fetchone()
+        return varsayilan if satir is None else satir[0]
+
+    def meta_yaz(self, degerler):
+        """Meta tablosuna anahtar/değer çiftlerini yaz"""
+        with self._kilit, self._baglanti:
+            self._baglanti.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", list(degerler.items()))
+
+    def ekle(self, kayitlar):
+        """Kayıtları tek işlemde ekle, eklenen satır sayısını döndür"""
+        return self.toplu_ekle([kayitlar])
+
+    def toplu_ekle(self, parcalar):
+        """Parça parça gelen kayıtları tek bir işlemde ekle"""
+        yer_tutucular = ", ".join("?" * (len(KAYIT_KOLONLAR) + 1))
+        sorgu = f"INSERT INTO mevduatlar (surum, {', '.join(KAYIT_KOLONLAR)}) VALUES ({yer_tutucular})"
+
+        toplam = 0
+        with self._kilit, self._baglanti:
+            surum = self._surum_arttir()
+            for parca in parcalar:
+                satirlar = _satirlara_cevir(parca)
+                self._baglanti.executemany(sorgu, [(surum,) + satir for satir in satirlar])
+                toplam += len(satirlar)
+            self._olay_yaz('ekle', surum)
+        return toplam
+
+    def alanlari_guncelle(self, df):
+        """id indeksli DataFrame'deki kolonları ilgili kayıtlara yaz"""
+        if df.empty:
+            return
+        kolonlar = list(df.columns)
+        atamalar = ", ".join(f"{kolon} = ?" for kolon in kolonlar)
+        degerler = df.astype(object).where(df.notna(), None)
+        with self._kilit, self._baglanti:
+            surum = self._surum_arttir()
+            self._baglanti.executemany(
+                f"UPDATE mevduatlar SET surum = ?, {atamalar} WHERE id = ?",
+                [(surum,) + satir[1:] + (int(satir[0]),) for satir in degerler.itertuples(name=None)]
+            )
+            # Kur ve tarihe bağlı yenilemeler çok sık olduğundan değerleri olaya yazılmaz
+            self._isaret_yaz('turetilmis', {'kolonlar': kolonlar, 'adet': len(df)})
+
+    def kalan_gunleri_guncelle(self, bugun):
+        """Kalan gün alanını SQL üzerinde verilen tarihe göre yeniden hesapla, değişen kayıt sayısını döndür"""
+        hesap = "CAST(julianday(vade_bitis) - julianday(?) AS INTEGER)"
+        tarih = pd.Timestamp(bugun).strftime('%Y-%m-%d')
+        with self._kilit, self._baglanti:
+            # Sürüm yalnızca değişen kayıt varsa arttırılır; aynı gün tekrar çağrılar önbellekleri bozmaz
+            surum = self._baglanti.execute("SELECT deger + 1 FROM meta WHERE anahtar = 'surum'").fetchone()[0]
+            imlec = self._baglanti.execute(
+                f"UPDATE mevduatlar SET surum = ?, kalan_gun = {hesap} WHERE kalan_gun IS NOT {hesap}",
+                (surum, tarih, tarih)
+            )
+            if imlec.rowcount == 0:
+                return 0
+            self._surum_arttir()
+            self._isaret_yaz('turetilmis', {'kolonlar': ['kalan_gun'], 'adet': imlec.rowcount, 'bugun': tarih})
+        return imlec.rowcount
+
+    def guncelle(self, kayit_id, kayit):
+        """Tek bir kaydın tüm alanlarını yeni hesaplanmış değerlerle değiştir"""
+        satir = _satirlara_cevir([kayit])[0]
+        atamalar = ", ".join(f"{kolon} = ?" for kolon in KAYIT_KOLONLAR)
+        with self._kilit, self._baglanti:
+            surum = self._surum_arttir()
+            imlec = self._baglanti.execute(
+                f"UPDATE mevduatlar SET surum = ?, {atamalar} WHERE id = ?",
+                (surum,) + satir + (int(kayit_id),)
+            )
+            self._olay_yaz('guncelle', surum)
+        return imlec.rowcount == 1
+
+    def getir(self, kayit_id):
+        """Tek bir kaydı id ile sözlük olarak getir (yoksa None)"""
+        with self._kilit:
+            satir = self._baglanti.execute(
+                f"SELECT {', '.join(KAYIT_KOLONLAR)} FROM mevduatlar WHERE id = ?", (int(kayit_id),)
+            ).fetchone()
+        if satir is None:
+            return None
+        kayit = dict(zip(KAYIT_KOLONLAR, satir))
+        for kolon in TARIH_KOLONLARI:
+            kayit[kolon] = date.fromisoformat(kayit[kolon])
+        return kayit
+
+    def sil(self, idler):
+        """Verilen id'lere sahip kayıtları sil"""
+        idler = [(int(i),) for i in idler]
+        if not idler:
+            return
+        with self._kilit, self._baglanti:
+            zaman = _zaman_metni()
+            self._baglanti.executemany(
+                "INSERT INTO olaylar (zaman, tur, kayit_id) SELECT ?, 'sil', id FROM mevduatlar WHERE id = ?",
+                [(zaman,) + i for i in idler]
+            )
+            self._baglanti.executemany("DELETE FROM mevduatlar WHERE id = ?", idler)
+            self._surum_arttir('silme_surumu')
+            self._anlik_goruntu_gerekirse_al()
+
+    def adet(self, mevduat_tipi=None, banka=None, vade_bitis_min=None, vade_bitis_max=None):
+        """Filtrelere uyan kayıt sayısını döndür"""
+        where, parametreler = self._filtre(mevduat_tipi, banka, vade_bitis_min, vade_bitis_max)
+        with self._kilit:
+            return self._baglanti.execute(f"SELECT COUNT(*) FROM mevduatlar{where}", parametreler).fetchone()[0]
+
+    @staticmethod
+    def _filtre(mevduat_tipi=None, banka=None, vade_bitis_min=None, vade_bitis_max=None, surum_sonrasi=None):
+        """Filtrelerden WHERE ifadesi ve parametreleri oluştur (banka tek değer veya liste olabilir)"""
+        kosullar, parametreler = [], []
+        if isinstance(banka, (list, tuple, set)):
+            bankalar = list(banka)
+            kosullar.append(f"banka IN ({', '.join('?' * len(bankalar))})" if bankalar else "0")
+            parametreler.extend(bankalar)
+            banka = None
+
+        for kosul, deger in [
+            ("mevduat_tipi = ?", mevduat_tipi),
+            ("banka = ?", banka),
+            ("vade_bitis >= ?", vade_bitis_min and pd.Timestamp(vade_bitis_min).strftime('%Y-%m-%d')),
+            ("vade_bitis <= ?", vade_bitis_max and pd.Timestamp(vade_bitis_max).strftime('%Y-%m-%d')),
+            ("surum > ?", surum_sonrasi)
+        ]:
+            if deger is not None:
+                kosullar.append(kosul)
+                parametreler.append(deger)
+
+        return (" WHERE " + " AND ".join(kosullar) if kosullar else ""), parametreler
+
+    def _cerceve_oku(self, sorgu, parametreler):
+        """Sorgu sonucunu id indeksli, tarihleri çevrilmiş DataFrame olarak oku"""
+        with self._kilit:
+            df = pd.read_sql_query(sorgu, self._baglanti, params=parametreler, index_col='id')
+
+        for kolon in df.columns:
+            if kolon in TARIH_KOLONLARI:
+                df[kolon] = pd.to_datetime(df[kolon])
+            elif kolon not in METIN_KOLONLARI and df[kolon].dtype == object:
+                # Tamamı NULL olan sayısal kolonlar None yerine NaN taşır
+                df[kolon] = pd.to_numeric(df[kolon])
+        return df
+
+    def oku(self, mevduat_tipi=None, banka=None, vade_bitis_min=None, vade_bitis_max=None,
+            surum_sonrasi=None, kolonlar=None):
+        """Filtrelere uyan kayıtları id indeksli DataFrame olarak oku"""
+        kolonlar = KAYIT_KOLONLAR if kolonlar is None else [k for k in kolonlar if k in KAYIT_KOLONLAR]
+        where, parametreler = self._filtre(mevduat_tipi, banka, vade_bitis_min, vade_bitis_max, surum_sonrasi)
+        sorgu = f"SELECT {', '.join(['id'] + kolonlar)} FROM mevduatlar{where} ORDER BY id"
+        return self._cerceve_oku(sorgu, parametreler)
+
+    def sayfa(self, mevduat_tipi=None, banka=None, vade_bitis_min=None, vade_bitis_max=None,
+              siralama='id', azalan=False, sayfa_boyutu=50, sayfa_no=0, kolonlar=None):
+        """Filtrelenmiş ve sıralanmış kayıtların tek sayfasını id indeksli DataFrame olarak döndür"""
+        kolonlar = KAYIT_KOLONLAR if kolonlar is None else [k for k in kolonlar if k in KAYIT_KOLONLAR]
+        # Sıralama kolonu SQL'e doğrudan yazıldığı için sadece bilinen kolonlar kabul edilir
+        if siralama != 'id' and siralama not in KAYIT_KOLONLAR:
+            raise ValueError(f"Geçersiz sıralama kolonu: {siralama}")
+        yon = "DESC" if azalan else "ASC"
+
+        where, parametreler = self._filtre(mevduat_tipi, banka, vade_bitis_min, vade_bitis_max)
+        sorgu = (
+            f"SELECT {', '.join(['id'] + kolonlar)} FROM mevduatlar{where} "
+            f"ORDER BY {siralama} {yon}, id {yon} LIMIT ? OFFSET ?"
+        )
+        return self._cerceve_oku(sorgu, parametreler + [sayfa_boyutu, sayfa_no * sayfa_boyutu])
+
+    def akis(self, kolonlar, mevduat_tipi=None, parca_boyutu=5000):
+        """Kayıtları ayrı bir okuma bağlantısı üzerinden parça parça (satır listesi) döndür"""
+        kolonlar = [k for k in kolonlar if k == 'id' or k in KAYIT_KOLONLAR]
+        sorgu, parametreler = f"SELECT {', '.join(kolonlar)} FROM mevduatlar", ()
+        if mevduat_tipi is not None:
+            sorgu, parametreler = sorgu + " WHERE mevduat_tipi = ?", (mevduat_tipi,)
+        sorgu += " ORDER BY id"
+
+        # WAL modunda okuyucu bağlantı yazma işlemlerini bekletmez
+        baglanti = sqlite3.connect(self.yol)
+        try:
+            imlec = baglanti.execute(sorgu, parametreler)
+            while True:
+                satirlar = imlec.fetchmany(parca_boyutu)
+                if not satirlar:
+                    break
+                yield satirlar
+        finally:
+            baglanti.close()
+
+    def olaylari_oku(self, kayit_id=None, olay_sonrasi=None):
+        """Olay kaydını (isteğe bağlı olarak tek bir kaydın olaylarını) sırasıyla oku"""
+        kosullar, parametreler = [], []
+        for kosul, deger in [("kayit_id = ?", kayit_id), ("olay_id > ?", olay_sonrasi)]:
+            if deger is not None:
+                kosullar.append(kosul)
+                parametreler.append(int(deger))
+        where = " WHERE " + " AND ".join(kosullar) if kosullar else ""
+        with self._kilit:
+            return pd.read_sql_query(
+                f"SELECT olay_id, zaman, tur, kayit_id, veri FROM olaylar{where} ORDER BY olay_id",
+                self._baglanti, params=parametreler, index_col='olay_id'
+            )
+
+    def tarihteki_durum(self, zaman, kolonlar=None):
+        """Portföyün verilen andaki (tarih verilirse o günün sonundaki) halini kur
+
+        Zamandan önceki en yeni anlık görüntü yüklenir ve yalnızca ondan sonraki olaylar
+        uygulanır. Kur ve tarihe bağlı türetilmiş alanlar kaydın o ana kadarki son
+        ekleme/güncelleme olayındaki (veya görüntüdeki) değerleridir.
+        """
+        kolonlar = KAYIT_KOLONLAR if kolonlar is None else [k for k in kolonlar if k in KAYIT_KOLONLAR]
+        zaman = _zaman_metni(zaman)
+        with self._kilit:
+            goruntu = self._baglanti.execute(
+                "SELECT olay_id FROM anlik_goruntuler WHERE zaman <= ? ORDER BY olay_id DESC LIMIT 1", (zaman,)
+            ).fetchone()
+            if goruntu is None:
+                baslangic = self._baglanti.execute("SELECT MIN(zaman) FROM anlik_goruntuler").fetchone()[0]
+                raise ValueError(f"Olay kaydı {baslangic[:10]} tarihinde başlamaktadır, daha önceki durum bilinmiyor")
+
+            df = self._cerceve_oku(
+                f"SELECT {', '.join(['id'] + KAYIT_KOLONLAR)} FROM anlik_goruntu_kayitlari "
+                f"WHERE olay_id = ? ORDER BY id",
+                [goruntu[0]]
+            )
+            kuyruk = pd.read_sql_query(
+                "SELECT kayit_id, tur, veri FROM olaylar "
+                "WHERE olay_id > ? AND zaman <= ? AND kayit_id IS NOT NULL ORDER BY olay_id",
+                self._baglanti, params=(goruntu[0], zaman)
+            )
+
+        # Olaylar kaydın tam halini taşıdığından her kaydın yalnızca son olayı uygulanır
+        son = kuyruk.drop_duplicates('kayit_id', keep='last')
+        df = df.drop(index=son['kayit_id'], errors='ignore')
+        yazilan = son[son['tur'] != 'sil']
+        if not yazilan.empty:
+            yeni = pd.DataFrame(
+                [json.loads(veri) for veri in yazilan['veri']],
+                index=pd.Index(yazilan['kayit_id'].to_numpy(), name='id')
+            )
+            yeni = yeni.reindex(columns=KAYIT_KOLONLAR)
+            for kolon in KAYIT_KOLONLAR:
+                if kolon in TARIH_KOLONLARI:
+                    yeni[kolon] = pd.to_datetime(yeni[kolon])
+                elif kolon not in METIN_KOLONLARI:
+                    yeni[kolon] = pd.to_numeric(yeni[kolon])
+            df = pd.concat([df, yeni]).sort_index()
+        return df[kolonlar]
+
+    def ozet(self, bugun):
+        """Mevduat tipi ve aktiflik bazında toplamları SQL üzerinde hesapla"""
+        sorgu = """
+            SELECT
+                mevduat_tipi,
+                vade_bitis >= ? AS aktif,
+                COUNT(*) AS adet,
+                COALESCE(SUM(tutar), 0) AS tutar,
+                COALESCE(SUM(net_faiz), 0) AS net_faiz,
+                COALESCE(SUM(net_faiz_usd), 0) AS net_faiz_usd,
+                COALESCE(SUM(tutar * kalan_gun), 0) AS tutar_gun
+            FROM mevduatlar
+            GROUP BY mevduat_tipi, aktif
+        """
+        with self._kilit:
+            return pd.read_sql_query(
+                sorgu, self._baglanti, params=(pd.Timestamp(bugun).strftime('%Y-%m-%d'),)
+            )
+
+
+class ArtimliOkuyucu:
+    """Sorgu sonuçlarını bellekte tutar, sonraki okumalarda yalnızca değişen satırları getirir
+
+    En son kullanılan kapasite kadar filtrenin sonucu saklanır.
+    """
+
+    def __init__(self, depo, kapasite=OKUYUCU_KAPASITESI):
+        self.depo = depo
+        self.kapasite = kapasite
+        self._onbellek = OrderedDict()
+        self._kilit = threading.Lock()
+
+    def oku(self, **filtre):
+        """Depo.oku ile aynı filtrelerle güncel DataFrame'i döndür"""
+        anahtar = tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v) for k, v in filtre.items()
+        ))
+        durum = self.depo.durum()
+
+        with self._kilit:
+            onceki = self._onbellek.get(anahtar)
+            if onceki is not None and onceki[0] == durum:
+                self._onbellek.move_to_end(anahtar)
+                return onceki[1]
+
+            if onceki is None or onceki[0].silme_surumu != durum.silme_surumu:
+                # Silme sonrası tam yükleme
+                df = self.depo.oku(**filtre)
+            else:
+                # Eklenen ve güncellenen satırları birleştir
+                degisen = self.depo.oku(surum_sonrasi=onceki[0].surum, kolonlar=[]).index
+                yeni = self.depo.oku(surum_sonrasi=onceki[0].surum, **filtre)
+                df = pd.concat([onceki[1].drop(index=degisen, errors='ignore'), yeni]).sort_index()
+
+            self._onbellek[anahtar] = (durum, df)
+            self._onbellek.move_to_end(anahtar)
+            while len(self._onbellek) > self.kapasite:
+                self._onbellek.popitem(last=False)
+        return df
+
+
+# Veritabanı yolu -> (depo, artımlı okuyucu), en son kullanılan sırasıyla
+_depolar = OrderedDict()
+_depo_kilidi = threading.Lock()
+
+
+def defter_yolu(defter):
+    """Defter adına ait veritabanı dosyasının yolu"""
+    if defter == ORTAK_DEFTER:
+        return VARSAYILAN_YOL
+    if not isinstance(defter, str) or not _DEFTER_ADI.fullmatch(defter):
+        raise ValueError("Defter adı yalnızca harf, rakam, '-' ve '_' içerebilir (en fazla 64 karakter)")
+    os.makedirs(DEFTER_KLASORU, exist_ok=True)
+    return os.path.join(DEFTER_KLASORU, f'{defter}.db')
+
+
+def _defter(defter):
+    """Defterin deposunu ve okuyucusunu açık defterler arasından getir, yoksa aç"""
+    yol = defter_yolu(defter)
+    with _depo_kilidi:
+        kayit = _depolar.get(yol)
+        if kayit is None:
+            depo = MevduatDeposu(yol)
+            kayit = _depolar[yol] = (depo, ArtimliOkuyucu(depo))
+        _depolar.move_to_end(yol)
+        # Çıkarılan depoların bağlantısı son kullanan bıraktığında kapanır
+        while len(_depolar) > ACIK_DEFTER_SINIRI:
+            _depolar.popitem(last=False)
+    return kayit
+
+
+def varsayilan_depo(defter=ORTAK_DEFTER):
+    """Defterin deposunu döndür (verilmezse VARSAYILAN_YOL'daki ortak defter)"""
+    return _defter(defter)[0]
+
+
+def varsayilan_okuyucu(defter=ORTAK_DEFTER):
+    """Defterin deposu için artımlı okuyucuyu döndür"""
+    return _defter(defter)[1]
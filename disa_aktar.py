@@ -0,0 +1,264 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import io
+import math
+
+import numpy as np
+
+from constants import KAYIT_KOLONLAR, MEVDUAT_KOLONLARI, MEVDUAT_TIPLERI, PARA_BIRIMLERI
+from depo import METIN_KOLONLARI, TAMSAYI_KOLONLARI, TARIH_KOLONLARI
+from hesaplama import tl_kurlari
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PARQUET_MIME = "application/vnd.apache.parquet"
+ARROW_MIME = "application/vnd.apache.arrow.file"
+
+# Arrow dosyalarında 32 bit tutulan gün sayısı kolonları
+GUN_KOLONLARI = ['orijinal_vade', 'kalan_gun']
+
+# Excel dosyaları arayüzü bekletmeden bu havuzda hazırlanır
+_excel_havuzu = ThreadPoolExecutor(max_workers=2, thread_name_prefix='excel')
+
+
+def _ozet_verisi(ozet_df, guncel_kur, kurlar=None):
+    """Depo özet tablosundan özet sayfası satırlarını oluştur"""
+    def toplam(kolon, mevduat_tipi=None, aktif=None):
+        secim = ozet_df
+        if mevduat_tipi is not None:
+            secim = secim[secim['mevduat_tipi'] == mevduat_tipi]
+        if aktif is not None:
+            secim = secim[secim['aktif'] == aktif]
+        return secim[kolon].sum()
+
+    toplam_adet = toplam('adet')
+    aktif_adet = toplam('adet', aktif=1)
+
+    # Ortalama vade arayüzdeki gibi TL karşılıklarıyla ağırlıklandırılır (kuru bilinmeyen tipler hariç)
+    aktif = ozet_df[ozet_df['aktif'] == 1]
+    aktif_kur = tl_kurlari(aktif['mevduat_tipi'], guncel_kur, kurlar)
+    bilinen = ~np.isnan(aktif_kur)
+    aktif_tutar_tl = (aktif['tutar'].to_numpy(dtype=float) * aktif_kur)[bilinen].sum()
+    aktif_tutar_gun_tl = (aktif['tutar_gun'].to_numpy(dtype=float) * aktif_kur)[bilinen].sum()
+    ortalama_vade = round(aktif_tutar_gun_tl / aktif_tutar_tl, 0) if aktif_tutar_tl else 0
+
+    # Her tipin aktif anapara ve net faizi kendi para biriminde; TL karşılıkları güncel kurlarla
+    tipler = []
+    for mevduat_tipi in MEVDUAT_TIPLERI:
+        para = PARA_BIRIMLERI[mevduat_tipi]
+        adet = toplam('adet', mevduat_tipi, 1)
+        # TL ve USD bölümleri her zaman, diğer tipler yalnızca aktif mevduat varsa gösterilir
+        if not adet and para not in ('TRY', 'USD'):
+            continue
+        tutar = toplam('tutar', mevduat_tipi, 1)
+        net_faiz = toplam('net_faiz' if para == 'TRY' else 'net_faiz_usd', mevduat_tipi, 1)
+        kur = tl_kurlari([mevduat_tipi], guncel_kur, kurlar)[0]
+        tipler.append((mevduat_tipi, mevduat_tipi.split()[0], adet, tutar, net_faiz, kur))
+
+    # Toplam portföy değerleri (TL cinsinden, kuru bilinmeyen tipler hariç)
+    toplam_portfoy = sum(tutar * kur for _, _, _, tutar, _, kur in tipler if not math.isnan(kur))
+    toplam_net_faiz = sum(net_faiz * kur for _, _, _, _, net_faiz, kur in tipler if not math.isnan(kur))
+    toplam_getiri = (toplam_net_faiz / toplam_portfoy) if toplam_portfoy > 0 else 0
+
+    data = [
+        ['1. GENEL PORTFÖY BİLGİLERİ', ''],
+        ['Toplam Mevduat Adedi', toplam_adet],
+        ['Aktif Mevduat Adedi', aktif_adet],
+        ['Kapanmış Mevduat Adedi', toplam_adet - aktif_adet],
+        ['Ortalama Vade (Gün)', ortalama_vade],
+        ['', '']
+    ]
+    bolum = 2
+    for mevduat_tipi, kod, adet, tutar, net_faiz, _ in tipler:
+        data += [
+            [f'{bolum}. {kod} MEVDUAT BİLGİLERİ', ''],
+            [f'{mevduat_tipi} Adedi', adet],
+            [f'Toplam {kod} Anapara', tutar],
+            [f'Toplam {kod} Net Faiz', net_faiz],
+            [f'{kod} Portföy Getiri Oranı', (net_faiz / tutar) if adet and tutar else 0],
+            ['', '']
+        ]
+        bolum += 1
+
+    data += [
+        [f'{bolum}. TOPLAM PORTFÖY (TL)', ''],
+        ['Toplam Portföy Değeri (TL)', toplam_portfoy],
+        ['Toplam Net Faiz (TL)', toplam_net_faiz],
+        ['Genel Portföy Getiri Oranı', toplam_getiri],
+        ['', ''],
+        [f'{bolum + 1}. DÖVİZ DAĞILIMI', '']
+    ]
+    for _, kod, _, tutar, _, kur in tipler:
+        pay = tutar * kur / toplam_portfoy if toplam_portfoy > 0 and not math.isnan(kur) else 0
+        data.append([f'{kod} Portföy Oranı', pay])
+
+    data += [['', ''], [f'{bolum + 2}. GÜNCEL BİLGİLER', '']]
+    for _, kod, _, _, _, kur in tipler:
+        if kod != 'TL' and not math.isnan(kur):
+            data.append([f'Güncel {kod}/TL Kuru', kur])
+    data.append(['Rapor Tarihi', datetime.now().strftime('%d.%m.%Y %H:%M')])
+    return data
+
+
+def _ozet_sayfasi_yaz(workbook, data):
+    """Portföy özeti sayfasını formatlı yaz"""
+    header_format = workbook.add_format({
+        'bold': True,
+        'font_size': 12,
+        'bg_color': '#D9D9D9'
+    })
+    money_tl = workbook.add_format({'num_format': '#,##0 ₺'})
+    money_usd = workbook.add_format({'num_format': '#,##0 $'})
+    money = workbook.add_format({'num_format': '#,##0'})
+    percent = workbook.add_format({'num_format': '0.00%'})
+    number = workbook.add_format({'num_format': '0'})
+    kur = workbook.add_format({'num_format': '0.0000'})
+
+    ozet = workbook.add_worksheet('Portföy Özeti')
+    ozet.set_column('A:A', 40)
+    ozet.set_column('B:B', 20)
+
+    for row, (label, value) in enumerate(data):
+        # Başlıklar
+        if label[:1].isdigit():
+            ozet.write(row, 0, label, header_format)
+            ozet.write(row, 1, value, header_format)
+            continue
+
+        ozet.write(row, 0, label)
+
+        # Boş satırlar
+        if label == '':
+            ozet.write(row, 1, value)
+            continue
+
+        # Değer formatlamaları
+        if 'Adedi' in label or 'Gün' in label:
+            ozet.write(row, 1, value, number)
+        elif 'TL' in label and ('Anapara' in label or 'Faiz' in label or 'Değeri' in label):
+            ozet.write(row, 1, value, money_tl)
+        elif 'USD' in label and ('Anapara' in label or 'Faiz' in label):
+            ozet.write(row, 1, value, money_usd)
+        elif 'Anapara' in label or 'Faiz' in label:
+            ozet.write(row, 1, value, money)
+        elif 'Oran' in label or 'Payı' in label:
+            ozet.write(row, 1, value, percent)
+        elif 'Kur' in label:
+            ozet.write(row, 1, value, kur)
+        else:
+            ozet.write(row, 1, value)
+
+
+def _mevduat_sayfasi_yaz(workbook, depo, sayfa_adi, mevduat_tipi, kolonlar):
+    """Mevduat kayıtlarını depodan akış halinde sayfaya yaz"""
+    sayfa = None
+    satir_no = 0
+    tarih_format = workbook.add_format({'num_format': 'dd.mm.yyyy'})
+
+    for satirlar in depo.akis(kolonlar, mevduat_tipi=mevduat_tipi):
+        # Boş tipler için sayfa açılmaz
+        if sayfa is None:
+            sayfa = workbook.add_worksheet(sayfa_adi)
+            sayfa.set_column(0, len(kolonlar) - 1, 16)
+            sayfa.write_row(0, 0, kolonlar, workbook.add_format({'bold': True}))
+
+            # Her kolon için tür kontrolü yapmadan doğrudan yazan fonksiyon
+            yazicilar = []
+            for kolon in kolonlar:
+                if kolon in ('vade_baslangic', 'vade_bitis'):
+                    yazicilar.append(lambda r, c, d: sayfa.write_datetime(r, c, date.fromisoformat(d), tarih_format))
+                elif kolon in ('mevduat_tipi', 'banka'):
+                    yazicilar.append(sayfa.write_string)
+                else:
+                    yazicilar.append(sayfa.write_number)
+
+        for satir in satirlar:
+            satir_no += 1
+            for kolon_no, deger in enumerate(satir):
+                if deger is not None:
+                    yazicilar[kolon_no](satir_no, kolon_no, deger)
+
+
+def excel_olustur(depo, guncel_kur, bugun, kurlar=None):
+    """Portföy Excel dosyasını bellekte, sabit bellek modunda oluştur"""
+    import xlsxwriter
+
+    cikti = io.BytesIO()
+    workbook = xlsxwriter.Workbook(cikti, {'constant_memory': True})
+
+    _ozet_sayfasi_yaz(workbook, _ozet_verisi(depo.ozet(bugun), guncel_kur, kurlar))
+    for mevduat_tipi in MEVDUAT_TIPLERI:
+        _mevduat_sayfasi_yaz(workbook, depo, f'{mevduat_tipi}lar', mevduat_tipi, MEVDUAT_KOLONLARI[mevduat_tipi])
+
+    workbook.close()
+    return cikti.getvalue()
+
+
+def excel_olustur_arka_planda(depo, guncel_kur, bugun, kurlar=None):
+    """Excel oluşturma işini arka plan havuzuna gönder, Future döndür"""
+    return _excel_havuzu.submit(excel_olustur, depo, guncel_kur, bugun, kurlar)
+
+
+def arrow_semasi(kolonlar=KAYIT_KOLONLAR):
+    """Kayıt kolonlarının (ör. TL_KOLONLAR, USD_KOLONLAR) id ile birlikte Arrow şeması
+
+    Banka ve mevduat tipi sözlük (kategorik), tarihler date32, gün sayıları int32
+    olarak tutulur; depoda tam sayı olan tutarlar int64, diğerleri float64'tür.
+    """
+    import pyarrow as pa
+
+    alanlar = [pa.field('id', pa.int64(), nullable=False)]
+    for kolon in kolonlar:
+        if kolon in METIN_KOLONLARI:
+            tip = pa.dictionary(pa.int16(), pa.string())
+        elif kolon in TARIH_KOLONLARI:
+            tip = pa.date32()
+        elif kolon in GUN_KOLONLARI:
+            tip = pa.int32()
+        elif kolon in TAMSAYI_KOLONLARI:
+            tip = pa.int64()
+        else:
+            tip = pa.float64()
+        alanlar.append(pa.field(kolon, tip))
+    return pa.schema(alanlar)
+
+
+def arrow_tablosu(depo, parca_boyutu=50000):
+    """Tüm mevduatları depodan akış halinde okuyup tek bir Arrow tablosunda topla"""
+    import pyarrow as pa
+
+    sema = arrow_semasi()
+    parcalar = []
+    for satirlar in depo.akis(sema.names, parca_boyutu=parca_boyutu):
+        kolonlar = []
+        for alan, degerler in zip(sema, zip(*satirlar)):
+            # Tarihler depoda ISO metni olarak saklanır
+            if alan.name in TARIH_KOLONLARI:
+                kolonlar.append(pa.array(degerler, type=pa.string()).cast(alan.type))
+            else:
+                kolonlar.append(pa.array(degerler, type=alan.type))
+        parcalar.append(pa.RecordBatch.from_arrays(kolonlar, schema=sema))
+
+    # Parçaların sözlükleri tek sözlükte birleştirilir (Arrow dosya biçimi bunu gerektirir)
+    return pa.Table.from_batches(parcalar, schema=sema).unify_dictionaries()
+
+
+def arrow_olustur(depo, bicim='parquet'):
+    """Tüm mevduatları hesaplanmış alanlarıyla Parquet veya Arrow (IPC) dosyası olarak bellekte oluştur
+
+    Parquet sıkıştırılmış ve küçüktür; Arrow dosyası sıkıştırılmaz, böylece bellek
+    eşlemesiyle kopyalamadan okunabilir.
+    """
+    import pyarrow as pa
+
+    tablo = arrow_tablosu(depo)
+    cikti = pa.BufferOutputStream()
+    if bicim == 'parquet':
+        import pyarrow.parquet as pq
+
+        pq.write_table(tablo, cikti, compression='zstd')
+    elif bicim == 'arrow':
+        with pa.ipc.new_file(cikti, tablo.schema) as yazici:
+            yazici.write_table(tablo)
+    else:
+        raise ValueError(f"Desteklenmeyen dosya biçimi: {bicim}")
+    return cikti.getvalue().to_pybytes()
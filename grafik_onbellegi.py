@@ -0,0 +1,70 @@
+from collections import OrderedDict, namedtuple
+import hashlib
+import threading
+
+import pandas as pd
+
+# Önbellekte tutulacak en fazla grafik sayısı
+GRAFIK_KAPASITESI = 64
+
+OnbellekDurumu = namedtuple('OnbellekDurumu', ['isabet', 'iska', 'boyut', 'kapasite'])
+
+
+def grafik_anahtari(tur, df, **parametreler):
+    """Grafik türü, özet çerçevenin içeriği ve grafik parametrelerinden önbellek anahtarı üret"""
+    ozet = hashlib.blake2b(digest_size=16)
+    ozet.update(tur.encode())
+    ozet.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    # İçerik özeti kolon ve indeks adlarını kapsamaz
+    ozet.update(repr((list(df.columns), df.index.name)).encode())
+    ozet.update(repr(sorted(parametreler.items())).encode())
+    return ozet.hexdigest()
+
+
+class GrafikOnbellegi:
+    """Oturumlar arasında paylaşılan, sınırlı boyutlu LRU grafik önbelleği
+
+    Dönen grafikler paylaşıldığı için çağıran tarafından değiştirilmemelidir.
+    """
+
+    def __init__(self, kapasite=GRAFIK_KAPASITESI):
+        self.kapasite = kapasite
+        self.isabet = 0
+        self.iska = 0
+
+        self._grafikler = OrderedDict()
+        self._kilit = threading.Lock()
+
+    def getir(self, anahtar, olustur):
+        """Anahtara ait grafiği döndür, yoksa olustur() ile üretip sakla"""
+        with self._kilit:
+            grafik = self._grafikler.get(anahtar)
+            if grafik is not None:
+                self._grafikler.move_to_end(anahtar)
+                self.isabet += 1
+                return grafik
+            self.iska += 1
+
+        # Grafik kilit dışında oluşturulur, aynı anda üretilen kopyalardan biri saklanır
+        grafik = olustur()
+        with self._kilit:
+            self._grafikler[anahtar] = grafik
+            self._grafikler.move_to_end(anahtar)
+            while len(self._grafikler) > self.kapasite:
+                self._grafikler.popitem(last=False)
+        return grafik
+
+    def durum(self):
+        """İsabet/ıska sayaçları ve doluluk"""
+        with self._kilit:
+            return OnbellekDurumu(self.isabet, self.iska, len(self._grafikler), self.kapasite)
+
+    def temizle(self):
+        """Saklanan grafikleri ve sayaçları sıfırla"""
+        with self._kilit:
+            self._grafikler.clear()
+            self.isabet = self.iska = 0
+
+
+# Tüm oturumların kullandığı ortak önbellek
+grafik_onbellegi = GrafikOnbellegi()
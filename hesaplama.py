@@ -0,0 +1,362 @@
+from collections import namedtuple
+from datetime import date
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from constants import (
+    DOVIZ_TIPLERI,
+    PARA_BIRIMLERI,
+    STOPAJ_BANT_SINIRLARI,
+    STOPAJ_BANTLARI,
+    STOPAJ_KURALLARI
+)
+
+# Arama anahtarı: para birimi kodu * _GUN_CARPANI + yürürlük tarihinin gün sırası
+_GUN_CARPANI = 10 ** 7
+# 1970-01-01'in date.toordinal() karşılığı
+_EPOK_GUNU = date(1970, 1, 1).toordinal()
+
+StopajTablosu = namedtuple('StopajTablosu', ['paralar', 'anahtarlar', 'oranlar', 'ozet'])
+
+def stopaj_tablosu_olustur(kurallar=STOPAJ_KURALLARI):
+    """Kural tablosunu (para birimi, yürürlük tarihi) sırasında aranabilir dizilere çevir"""
+    paralar = sorted(kurallar)
+    satirlar = sorted(
+        (kod * _GUN_CARPANI + yururluk.toordinal(), [oranlar[bant] for bant in STOPAJ_BANTLARI])
+        for kod, para in enumerate(paralar)
+        for yururluk, oranlar in kurallar[para]
+    )
+    anahtarlar = np.array([anahtar for anahtar, _ in satirlar], dtype=np.int64)
+    if (np.diff(anahtarlar) == 0).any():
+        raise ValueError("Aynı para birimi ve yürürlük tarihi için birden fazla stopaj kuralı var")
+    
+    # Kayıtlı hesapların hangi tabloyla yapıldığını anlamak için içerik özeti
+    ozet = hashlib.blake2b(repr(satirlar).encode(), digest_size=8).hexdigest()
+    return StopajTablosu(paralar, anahtarlar, np.array([o for _, o in satirlar], dtype=float), ozet)
+
+_STOPAJ_TABLOSU = stopaj_tablosu_olustur()
+
+def stopaj_tablosu_ozeti():
+    """Geçerli stopaj kural tablosunun içerik özeti"""
+    return _STOPAJ_TABLOSU.ozet
+
+def _gun_sirasi(tarihler):
+    """Tarih dizisini date.toordinal() gün sıralarına çevir"""
+    gunler = pd.to_datetime(pd.Series(tarihler)).to_numpy()
+    return gunler.astype('datetime64[D]').astype(np.int64) + _EPOK_GUNU
+
+def hesapla_stopaj_orani(vade_gun, mevduat_tipi, baslangic=None):
+    """Mevduat tipine, vadeye ve açılış tarihine göre stopaj oranı hesapla"""
+    tarih = None if baslangic is None else [baslangic]
+    return float(hesapla_stopaj_orani_toplu([vade_gun], [mevduat_tipi], tarih)[0])
+
+def hesapla_tl_mevduat(data, vade_gun, guncel_kur):
+    """TL mevduat hesaplamaları"""
+    # Stopaj oranı hesapla
+    stopaj_orani = hesapla_stopaj_orani(vade_gun, data['mevduat_tipi'], data['vade_baslangic'])
+    
+    # Brüt faiz tutarı
+    brut_faiz = round(
+        data['tutar'] * 
+        (data['faiz_orani'] / 100) * 
+        (vade_gun / 365)
+    )
+    
+    # Stopaj tutarı
+    stopaj_tutari = round(
+        brut_faiz * 
+        (stopaj_orani / 100)
+    )
+    
+    # Net faiz
+    net_faiz = brut_faiz - stopaj_tutari
+    
+    # TL toplam dönüş
+    donus_tutari_tl = data['tutar'] + net_faiz
+    
+    # USD karşılıkları
+    tutar_usd = round(data['tutar'] / guncel_kur, 2)
+    
+    # Başabaş kur hesaplama
+    brut_getiri = ((data['faiz_orani']/100) / 365) * vade_gun
+    net_getiri = brut_getiri * (1 - stopaj_orani/100)
+    basabas_kur = round(guncel_kur * (1 + net_getiri), 4)
+    
+    return {
+        'stopaj_orani': stopaj_orani,
+        'brut_faiz': brut_faiz,
+        'stopaj_tutari': stopaj_tutari,
+        'net_faiz': net_faiz,
+        'donus_tutari_tl': donus_tutari_tl,
+        'tutar_usd': tutar_usd,
+        'baslangic_kur': guncel_kur,
+        'basabas_kur': basabas_kur
+    }
+
+def hesapla_basabas_kur(faiz_orani, orijinal_vade, baslangic_kur, stopaj_orani):
+    """USD mevduat için başabaş kur hesaplama"""
+    brut_getiri = ((faiz_orani/100) / 365) * orijinal_vade
+    net_getiri = brut_getiri * (1 - stopaj_orani/100)
+    return round((1 + net_getiri) * baslangic_kur, 4)
+
+def hesapla_usd_mevduat(data, vade_gun, guncel_kur):
+    """Döviz (USD, EUR, GBP, altın) mevduat hesaplamaları
+
+    guncel_kur mevduatın kendi para biriminin TL kurudur; *_usd alanları o para
+    birimindeki tutarlardır.
+    """
+    # Stopaj oranı hesapla
+    stopaj_orani = hesapla_stopaj_orani(vade_gun, data['mevduat_tipi'], data['vade_baslangic'])
+    
+    # USD cinsinden brüt faiz tutarı
+    brut_faiz_usd = round(
+        data['tutar'] * 
+        (data['faiz_orani'] / 100) * 
+        (vade_gun / 365)
+    )
+    
+    # USD cinsinden stopaj tutarı
+    stopaj_tutari_usd = round(
+        brut_faiz_usd * 
+        (stopaj_orani / 100)
+    )
+    
+    # USD cinsinden net faiz
+    net_faiz_usd = brut_faiz_usd - stopaj_tutari_usd
+    
+    # USD toplam dönüş
+    donus_tutari_usd = data['tutar'] + net_faiz_usd
+    
+    # TL karşılıkları
+    brut_faiz = round(brut_faiz_usd * guncel_kur)
+    stopaj_tutari = round(stopaj_tutari_usd * guncel_kur)
+    net_faiz = round(net_faiz_usd * guncel_kur)
+    donus_tutari_tl = round(donus_tutari_usd * guncel_kur)
+    
+    # Başabaş kur hesaplama
+    basabas_kur = hesapla_basabas_kur(
+        data['faiz_orani'],
+        data['orijinal_vade'],
+        data.get('baslangic_kur', guncel_kur),
+        stopaj_orani
+    )
+    
+    return {
+        'stopaj_orani': stopaj_orani,
+        'brut_faiz': brut_faiz,
+        'stopaj_tutari': stopaj_tutari,
+        'net_faiz': net_faiz,
+        'donus_tutari_tl': donus_tutari_tl,
+        'brut_faiz_usd': brut_faiz_usd,
+        'stopaj_tutari_usd': stopaj_tutari_usd,
+        'net_faiz_usd': net_faiz_usd,
+        'donus_tutari_usd': donus_tutari_usd,
+        'basabas_kur': basabas_kur
+    }
+
+def doviz_kuru(mevduat_tipi, guncel_kur, kurlar=None):
+    """Mevduatın kendi para biriminin TL kuru (guncel_kur USD/TL, kurlar diğer para birimleri)"""
+    para = PARA_BIRIMLERI[mevduat_tipi]
+    if para == 'TRY':
+        return 1.0
+    
+    kur = guncel_kur if para == 'USD' else (kurlar or {}).get(para)
+    if not (kur or 0) > 0:
+        raise ValueError(f"Kur bilgisi yok: {para}/TL")
+    return kur
+
+def _gecerli_kur(kur):
+    """Sıfır ya da negatif kurları bilinmeyen (NaN) say"""
+    kur = np.asarray(kur, dtype=float)
+    return np.where(kur > 0, kur, np.nan)
+
+def tl_kurlari(mevduat_tipi, guncel_kur, kurlar=None):
+    """Mevduat tipi dizisi için kendi para birimlerinin TL kurları (bilinmeyen ya da sıfır kurlar NaN)"""
+    tablo = {'TRY': 1.0, **(kurlar or {}), 'USD': guncel_kur}
+    para = pd.Series(np.asarray(mevduat_tipi, dtype=object)).map(PARA_BIRIMLERI)
+    return _gecerli_kur(para.map(tablo).to_numpy(dtype=float))
+
+def eksik_kurlar(mevduat_tipi, guncel_kur, kurlar=None):
+    """Hesaplamak için gereken kuru bilinmeyen mevduatlar (TL mevduatlar USD/TL kuruna bağlıdır)"""
+    mevduat_tipi = np.asarray(mevduat_tipi, dtype=object)
+    doviz = np.isin(mevduat_tipi, DOVIZ_TIPLERI)
+    eksik = doviz & np.isnan(tl_kurlari(mevduat_tipi, guncel_kur, kurlar))
+    if np.isnan(_gecerli_kur(guncel_kur)):
+        eksik |= ~doviz
+    return eksik
+
+def _eksik_kur_hatasi(mevduat_tipi):
+    """Kuru bilinmeyen mevduat tipleri için hata (TL mevduatlarda eksik olan USD/TL kurudur)"""
+    paralar = sorted({PARA_BIRIMLERI[tip] if tip in DOVIZ_TIPLERI else 'USD' for tip in mevduat_tipi})
+    return ValueError(f"Kur bilgisi yok: {', '.join(f'{para}/TL' for para in paralar)}")
+
+def hesapla(data, guncel_kur, bugun=None, kurlar=None):
+    """Ana hesaplama fonksiyonu (guncel_kur USD/TL, kurlar diğer para birimlerinin TL kurları)"""
+    # Vade gün hesaplamaları
+    vade_gun = (data['vade_bitis'] - data['vade_baslangic']).days
+    kalan_gun = (data['vade_bitis'] - (bugun or date.today())).days
+    
+    # Temel veri hazırlama
+    hesaplama = {
+        'mevduat_tipi': data['mevduat_tipi'],
+        'banka': data['banka'],
+        'tutar': round(float(data['tutar'])),
+        'faiz_orani': round(float(data['faiz_orani']), 2),
+        'vade_baslangic': data['vade_baslangic'],
+        'vade_bitis': data['vade_bitis'],
+        'orijinal_vade': vade_gun,  # Orijinal vade eklendi
+        'kalan_gun': kalan_gun,
+        'baslangic_kur': data.get('baslangic_kur', guncel_kur)
+    }
+    
+    # Mevduat tipine göre hesaplama; döviz mevduatları kendi para birimlerinin kuruyla çevrilir
+    if hesaplama['mevduat_tipi'] in DOVIZ_TIPLERI:
+        kur = doviz_kuru(hesaplama['mevduat_tipi'], guncel_kur, kurlar)
+        hesaplama['baslangic_kur'] = data.get('baslangic_kur', kur)
+        hesaplama.update(hesapla_usd_mevduat(hesaplama, vade_gun, kur))
+    else:
+        if not (guncel_kur or 0) > 0:
+            raise _eksik_kur_hatasi([hesaplama['mevduat_tipi']])
+        hesaplama.update(hesapla_tl_mevduat(hesaplama, vade_gun, guncel_kur))
+    
+    return hesaplama
+
+def hesapla_stopaj_orani_toplu(vade_gun, mevduat_tipi, baslangic=None, tablo=None):
+    """Vade, mevduat tipi ve açılış tarihi dizileri için yürürlükteki stopaj oranlarını tek seferde bul
+
+    baslangic verilmezse mevduatların bugün açıldığı varsayılır. Her mevduata kendi
+    para biriminde açılış tarihinden önce yürürlüğe girmiş en son kural uygulanır.
+    """
+    tablo = tablo or _STOPAJ_TABLOSU
+    # Kategorik tip dizilerinde eşleme yalnızca kategoriler üzerinden yapılır
+    mevduat_tipi = pd.Series(mevduat_tipi).reset_index(drop=True)
+    
+    para = mevduat_tipi.map(PARA_BIRIMLERI)
+    para_kodu = pd.Index(tablo.paralar).get_indexer(para).astype(np.int64)
+    if (para_kodu < 0).any():
+        bilinmeyen = sorted(set(mevduat_tipi[para_kodu < 0]))
+        raise KeyError(f"Bilinmeyen mevduat tipi: {', '.join(map(str, bilinmeyen))}")
+    
+    if baslangic is None:
+        gun = np.full(len(mevduat_tipi), date.today().toordinal(), dtype=np.int64)
+    else:
+        gun = _gun_sirasi(baslangic)
+    
+    # (para birimi, tarih) anahtarından küçük veya eşit son kural
+    satir = np.searchsorted(tablo.anahtarlar, para_kodu * _GUN_CARPANI + gun, side='right') - 1
+    kuralsiz = (satir < 0) | (tablo.anahtarlar[np.maximum(satir, 0)] // _GUN_CARPANI != para_kodu)
+    if kuralsiz.any():
+        ilk = int(np.argmax(kuralsiz))
+        tarih = date.fromordinal(int(gun[ilk])) if gun[ilk] > 0 else 'boş açılış'
+        raise ValueError(f"{para[ilk]} için {tarih} tarihinde yürürlükte stopaj kuralı bulunmamaktadır")
+    
+    # 0: 6 aya kadar, 1: 1 yıla kadar, 2: 1 yıldan uzun
+    bant = np.searchsorted(STOPAJ_BANT_SINIRLARI, np.asarray(vade_gun), side='left')
+    return tablo.oranlar[satir, bant]
+
+def _yuvarla(degerler, basamak=0):
+    """Python round() ile birebir aynı sonucu veren vektörel yuvarlama"""
+    degerler = np.asarray(degerler, dtype=float)
+    if basamak == 0:
+        # np.rint de round() gibi yarımları çifte yuvarlar
+        return np.rint(degerler)
+    
+    olcekli = degerler * 10 ** basamak
+    sonuc = np.rint(olcekli) / 10 ** basamak
+    
+    # Ölçekleme hatasının sonucu değiştirebileceği yarım değerleri round() ile düzelt
+    kesir = np.abs(olcekli - np.floor(olcekli) - 0.5)
+    supheli = kesir <= 4 * np.spacing(np.abs(olcekli))
+    if supheli.any():
+        sonuc[supheli] = [round(float(x), basamak) for x in degerler[supheli]]
+    return sonuc
+
+def hesapla_toplu(df, guncel_kur, bugun=None, kurlar=None):
+    """Birden fazla mevduatı tek seferde hesapla (hesapla ile aynı sonuçlar)"""
+    # Vade gün hesaplamaları
+    vade_baslangic = pd.to_datetime(df['vade_baslangic']).dt.normalize()
+    vade_bitis = pd.to_datetime(df['vade_bitis']).dt.normalize()
+    vade_gun = (vade_bitis - vade_baslangic).dt.days.to_numpy()
+    kalan_gun = (vade_bitis - pd.Timestamp(bugun or date.today())).dt.days.to_numpy()
+    
+    mevduat_tipi = df['mevduat_tipi'].to_numpy()
+    doviz = np.isin(mevduat_tipi, DOVIZ_TIPLERI)
+    tutar = _yuvarla(df['tutar'].astype(float))
+    faiz_orani = _yuvarla(df['faiz_orani'].astype(float), 2)
+    
+    # Her mevduatın kendi para biriminin TL kuru
+    kur = tl_kurlari(mevduat_tipi, guncel_kur, kurlar)
+    eksik = eksik_kurlar(mevduat_tipi, guncel_kur, kurlar)
+    if eksik.any():
+        raise _eksik_kur_hatasi(mevduat_tipi[eksik])
+    
+    # TL mevduatlarda başlangıç kuru her zaman güncel USD/TL kurudur
+    if 'baslangic_kur' in df:
+        baslangic_kur = df['baslangic_kur'].astype(float).to_numpy()
+    else:
+        baslangic_kur = np.full(len(df), np.nan)
+    baslangic_kur = np.where(doviz, np.where(np.isnan(baslangic_kur), kur, baslangic_kur), guncel_kur)
+    
+    stopaj_orani = hesapla_stopaj_orani_toplu(vade_gun, mevduat_tipi, vade_baslangic)
+    
+    # Mevduatın kendi para birimindeki tutarlar
+    brut_faiz_ana = _yuvarla(tutar * (faiz_orani / 100) * (vade_gun / 365))
+    stopaj_tutari_ana = _yuvarla(brut_faiz_ana * (stopaj_orani / 100))
+    net_faiz_ana = brut_faiz_ana - stopaj_tutari_ana
+    donus_tutari_ana = tutar + net_faiz_ana
+    
+    # Başabaş kur hesaplama
+    brut_getiri = ((faiz_orani / 100) / 365) * vade_gun
+    net_getiri = brut_getiri * (1 - stopaj_orani / 100)
+    basabas_kur = _yuvarla(baslangic_kur * (1 + net_getiri), 4)
+    
+    sonuc = pd.DataFrame({
+        'mevduat_tipi': mevduat_tipi,
+        'banka': df['banka'].to_numpy(),
+        'tutar': tutar.astype('int64'),
+        'faiz_orani': faiz_orani,
+        'vade_baslangic': df['vade_baslangic'].to_numpy(),
+        'vade_bitis': df['vade_bitis'].to_numpy(),
+        'orijinal_vade': vade_gun,
+        'kalan_gun': kalan_gun,
+        'baslangic_kur': baslangic_kur,
+        'stopaj_orani': stopaj_orani,
+        # TL karşılıkları (döviz mevduatlarında kendi para biriminin güncel kuru ile çevrilir)
+        'brut_faiz': np.where(doviz, _yuvarla(brut_faiz_ana * kur), brut_faiz_ana).astype('int64'),
+        'stopaj_tutari': np.where(doviz, _yuvarla(stopaj_tutari_ana * kur), stopaj_tutari_ana).astype('int64'),
+        'net_faiz': np.where(doviz, _yuvarla(net_faiz_ana * kur), net_faiz_ana).astype('int64'),
+        'donus_tutari_tl': np.where(doviz, _yuvarla(donus_tutari_ana * kur), donus_tutari_ana).astype('int64'),
+        'tutar_usd': np.where(doviz, np.nan, _yuvarla(tutar / _gecerli_kur(guncel_kur), 2)),
+        'basabas_kur': basabas_kur,
+        'brut_faiz_usd': np.where(doviz, brut_faiz_ana, np.nan),
+        'stopaj_tutari_usd': np.where(doviz, stopaj_tutari_ana, np.nan),
+        'net_faiz_usd': np.where(doviz, net_faiz_ana, np.nan),
+        'donus_tutari_usd': np.where(doviz, donus_tutari_ana, np.nan)
+    }, index=df.index)
+    
+    return sonuc
+
+def kura_bagli_alanlar(tl_df, guncel_kur):
+    """TL mevduatların güncel kura bağlı alanlarını (USD karşılığı, başabaş kur) hesapla"""
+    vade_gun = (tl_df['vade_bitis'] - tl_df['vade_baslangic']).dt.days.to_numpy()
+    stopaj_orani = hesapla_stopaj_orani_toplu(
+        vade_gun, np.full(len(tl_df), 'TL Mevduat'), tl_df['vade_baslangic']
+    )
+    brut_getiri = ((tl_df['faiz_orani'].to_numpy() / 100) / 365) * vade_gun
+    net_getiri = brut_getiri * (1 - stopaj_orani / 100)
+    
+    return pd.DataFrame({
+        'tutar_usd': _yuvarla(tl_df['tutar'].to_numpy() / guncel_kur, 2),
+        'basabas_kur': _yuvarla(guncel_kur * (1 + net_getiri), 4)
+    }, index=tl_df.index)
+
+def doviz_tl_karsiliklari(doviz_df, kur):
+    """Döviz mevduatlarının kendi para birimlerinin güncel kuruna bağlı TL karşılıklarını hesapla"""
+    return pd.DataFrame({
+        'brut_faiz': _yuvarla(doviz_df['brut_faiz_usd'].to_numpy(dtype=float) * kur),
+        'stopaj_tutari': _yuvarla(doviz_df['stopaj_tutari_usd'].to_numpy(dtype=float) * kur),
+        'net_faiz': _yuvarla(doviz_df['net_faiz_usd'].to_numpy(dtype=float) * kur),
+        'donus_tutari_tl': _yuvarla(doviz_df['donus_tutari_usd'].to_numpy(dtype=float) * kur)
+    }, index=doviz_df.index).astype('int64')
@@ -0,0 +1,243 @@
+from collections import namedtuple
+from datetime import date
+import os
+
+import pandas as pd
+
+from constants import KAYIT_KOLONLAR, MEVDUAT_KOLONLARI, TL_KOLONLAR, USD_KOLONLAR, MEVDUAT_TIPLERI
+from disa_aktar import arrow_semasi
+from hesaplama import eksik_kurlar, hesapla_toplu
+
+# Dosyada bulunması zorunlu kolonlar
+GIRDI_KOLONLARI = [
+    'mevduat_tipi',
+    'banka',
+    'tutar',
+    'faiz_orani',
+    'vade_baslangic',
+    'vade_bitis'
+]
+
+PARCA_BOYUTU = 5000
+
+AktarimSonucu = namedtuple('AktarimSonucu', ['eklenen', 'hatalar'])
+
+
+def kolonlari_dogrula(kolonlar):
+    """Dosya başlıklarını TL/USD kolon tanımlarına göre kontrol et"""
+    kolonlar = [str(k).strip() for k in kolonlar]
+    eksik = [k for k in GIRDI_KOLONLARI if k not in kolonlar]
+    if eksik:
+        raise ValueError(f"Eksik kolonlar: {', '.join(eksik)}")
+
+    izinli = set(TL_KOLONLAR) | set(USD_KOLONLAR)
+    bilinmeyen = [k for k in kolonlar if k not in izinli]
+    if bilinmeyen:
+        raise ValueError(f"Tanımsız kolonlar: {', '.join(bilinmeyen)}")
+    return kolonlar
+
+
+def _dosya_boyutu(dosya):
+    """Dosya nesnesinin bayt cinsinden boyutu"""
+    konum = dosya.tell()
+    dosya.seek(0, os.SEEK_END)
+    boyut = dosya.tell()
+    dosya.seek(konum)
+    return boyut or 1
+
+
+def csv_parcalari(dosya, parca_boyutu=PARCA_BOYUTU):
+    """CSV dosyasını (parça, ilerleme oranı) çiftleri halinde oku"""
+    boyut = _dosya_boyutu(dosya)
+    with pd.read_csv(dosya, chunksize=parca_boyutu, dtype=str, skipinitialspace=True) as okuyucu:
+        for parca in okuyucu:
+            # İndeks dosyadaki satır numarasıdır (başlık 1. satır)
+            parca.index = parca.index + 2
+            yield parca, dosya.tell() / boyut
+
+
+def excel_parcalari(dosya, parca_boyutu=PARCA_BOYUTU):
+    """Excel dosyasını salt okunur modda (parça, ilerleme oranı) çiftleri halinde oku"""
+    from openpyxl import load_workbook
+
+    kitap = load_workbook(dosya, read_only=True, data_only=True)
+    try:
+        sayfa = kitap.worksheets[0]
+        satirlar = sayfa.iter_rows(values_only=True)
+        baslik = next(satirlar, None)
+        if baslik is None:
+            return
+        baslik = [str(k).strip() if k is not None else '' for k in baslik]
+        toplam = max((sayfa.max_row or 1) - 1, 1)
+
+        tampon, satir_nolari = [], []
+        for satir_no, satir in enumerate(satirlar, start=2):
+            # Tamamen boş satırları atla
+            if all(deger is None for deger in satir):
+                continue
+            tampon.append(satir)
+            satir_nolari.append(satir_no)
+            if len(tampon) == parca_boyutu:
+                yield pd.DataFrame(tampon, columns=baslik, index=satir_nolari), (satir_no - 1) / toplam
+                tampon, satir_nolari = [], []
+        if tampon:
+            yield pd.DataFrame(tampon, columns=baslik, index=satir_nolari), 1.0
+    finally:
+        kitap.close()
+
+
+def _tarihe_cevir(seri):
+    """Tarihleri önce ISO 8601 (yyyy-aa-gg), çevrilemeyenleri gg.aa.yyyy biçiminde oku"""
+    if pd.api.types.is_string_dtype(seri):
+        seri = seri.str.strip()
+    tarihler = pd.to_datetime(seri, errors='coerce', format='ISO8601')
+
+    # Gün-ay sırası tahmin edilmez; her değer iki biçimden birine tam uymalıdır
+    eksik = tarihler.isna() & seri.notna()
+    if eksik.any():
+        tarihler[eksik] = pd.to_datetime(seri[eksik].astype('string'), errors='coerce', format='%d.%m.%Y')
+    return tarihler
+
+
+def satirlari_dogrula(parca):
+    """Parçadaki satırları kontrol et, geçerli satırları ve hata listesini döndür"""
+    df = pd.DataFrame({
+        'mevduat_tipi': parca['mevduat_tipi'].astype('string').str.strip(),
+        'banka': parca['banka'].astype('string').str.strip(),
+        'tutar': pd.to_numeric(parca['tutar'], errors='coerce'),
+        'faiz_orani': pd.to_numeric(parca['faiz_orani'], errors='coerce'),
+        'vade_baslangic': _tarihe_cevir(parca['vade_baslangic']),
+        'vade_bitis': _tarihe_cevir(parca['vade_bitis'])
+    }, index=parca.index)
+    if 'baslangic_kur' in parca:
+        df['baslangic_kur'] = pd.to_numeric(parca['baslangic_kur'], errors='coerce')
+
+    kontroller = [
+        (~df['mevduat_tipi'].isin(MEVDUAT_TIPLERI).fillna(False), "Geçersiz mevduat tipi"),
+        (df['banka'].isna() | (df['banka'] == ''), "Banka boş"),
+        (~(df['tutar'] > 0), "Geçersiz tutar"),
+        (~(df['faiz_orani'] >= 0), "Geçersiz faiz oranı"),
+        (df['vade_baslangic'].isna(), "Geçersiz vade başlangıç tarihi"),
+        (df['vade_bitis'].isna(), "Geçersiz vade bitiş tarihi"),
+        (~(df['vade_bitis'] > df['vade_baslangic']) & df['vade_baslangic'].notna() & df['vade_bitis'].notna(),
+         "Vade bitiş tarihi, başlangıç tarihinden sonra olmalıdır"),
+    ]
+    if 'baslangic_kur' in df:
+        girilen = parca['baslangic_kur'].notna() & (parca['baslangic_kur'].astype('string').str.strip() != '')
+        kontroller.append((girilen.fillna(False) & ~(df['baslangic_kur'] > 0), "Geçersiz başlangıç kuru"))
+
+    hatali = pd.Series(False, index=df.index)
+    for maske, _ in kontroller:
+        hatali |= maske.to_numpy(dtype=bool)
+
+    # Sadece hatalı satırlar için mesaj oluştur
+    hatalar = []
+    for konum in hatali.to_numpy().nonzero()[0]:
+        mesajlar = [mesaj for maske, mesaj in kontroller if maske.iloc[konum]]
+        hatalar.append({'satir': int(df.index[konum]), 'hata': "; ".join(mesajlar)})
+
+    return df[~hatali], hatalar
+
+
+def hesaplanmis_parcalar(dosya, dosya_adi, guncel_kur, hatalar, parca_boyutu=PARCA_BOYUTU, ilerleme=None,
+                         bugun=None, kurlar=None):
+    """Dosyayı parça parça doğrulayıp hesapla; hatalı satırları hatalar listesine ekle
+
+    Kuru bilinmeyen mevduatlar aktarımı durdurmaz, "Kur bilgisi yok" hatasıyla atlanır.
+    """
+    if dosya_adi.lower().endswith(('.xlsx', '.xlsm')):
+        parcalar = excel_parcalari(dosya, parca_boyutu)
+    else:
+        parcalar = csv_parcalari(dosya, parca_boyutu)
+
+    kolonlar = None
+    okunan = 0
+    for parca, oran in parcalar:
+        if kolonlar is None:
+            kolonlar = kolonlari_dogrula(parca.columns)
+        parca.columns = kolonlar
+
+        gecerli, parca_hatalari = satirlari_dogrula(parca)
+        kursuz = eksik_kurlar(gecerli['mevduat_tipi'], guncel_kur, kurlar)
+        if kursuz.any():
+            parca_hatalari += [{'satir': int(satir), 'hata': "Kur bilgisi yok"} for satir in gecerli.index[kursuz]]
+            parca_hatalari.sort(key=lambda hata: hata['satir'])
+            gecerli = gecerli[~kursuz]
+        hatalar.extend(parca_hatalari)
+        okunan += len(parca)
+
+        if not gecerli.empty:
+            yield hesapla_toplu(gecerli, guncel_kur, bugun, kurlar)
+        if ilerleme is not None:
+            ilerleme(min(oran, 1.0), okunan)
+
+
+def toplu_ice_aktar(dosya, dosya_adi, depo, guncel_kur, parca_boyutu=PARCA_BOYUTU, ilerleme=None, kurlar=None):
+    """CSV/Excel dosyasındaki mevduatları doğrulayıp tek işlemde depoya ekle"""
+    hatalar = []
+    eklenen = depo.toplu_ekle(
+        hesaplanmis_parcalar(dosya, dosya_adi, guncel_kur, hatalar, parca_boyutu, ilerleme, kurlar=kurlar)
+    )
+    return AktarimSonucu(eklenen, hatalar)
+
+
+def arrow_oku(dosya, mevduat_tipi=None):
+    """Parquet veya Arrow (IPC) dosyasındaki mevduatları id indeksli DataFrame olarak oku
+
+    Kolonlar arrow_semasi tiplerine çevrilerek doğrulanır, hesaplanmış alanlar
+    olduğu gibi korunur. mevduat_tipi verilirse yalnızca o tipin kayıtları ve
+    kolonları (TL_KOLONLAR / USD_KOLONLAR) okunur. Dosya yolu verilirse Arrow
+    dosyası bellek eşlemesiyle, kopyalanmadan okunur.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    kolonlar = KAYIT_KOLONLAR if mevduat_tipi is None else MEVDUAT_KOLONLARI[mevduat_tipi]
+    sema = arrow_semasi(kolonlar)
+    if isinstance(dosya, (str, os.PathLike)):
+        dosya = pa.memory_map(os.fspath(dosya))
+
+    imza = dosya.read(6)
+    dosya.seek(0)
+    try:
+        if imza[:4] == b'PAR1':
+            dosya_semasi = pq.read_schema(dosya)
+            dosya.seek(0)
+        elif imza == b'ARROW1':
+            okuyucu = pa.ipc.open_file(dosya)
+            dosya_semasi = okuyucu.schema
+        else:
+            raise ValueError("Dosya Parquet veya Arrow biçiminde değil")
+
+        eksik = [k for k in sema.names if k not in dosya_semasi.names]
+        if eksik:
+            raise ValueError(f"Eksik kolonlar: {', '.join(eksik)}")
+
+        if imza[:4] == b'PAR1':
+            filtre = None if mevduat_tipi is None else [('mevduat_tipi', '=', mevduat_tipi)]
+            tablo = pq.read_table(dosya, columns=sema.names, filters=filtre)
+        else:
+            tablo = okuyucu.read_all().select(sema.names)
+            if mevduat_tipi is not None:
+                tablo = tablo.filter(pc.equal(tablo['mevduat_tipi'], mevduat_tipi))
+
+        # Şemayla aynı tipteki kolonlarda dönüşüm kopyalama yapmaz
+        tablo = tablo.cast(sema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+        raise ValueError(f"Dosya okunamadı: {e}") from e
+
+    df = tablo.to_pandas(date_as_object=False, split_blocks=True).set_index('id')
+    bilinmeyen = set(df['mevduat_tipi'].dropna().unique()) - set(MEVDUAT_TIPLERI)
+    if bilinmeyen or df['mevduat_tipi'].isna().any():
+        raise ValueError(f"Geçersiz mevduat tipleri: {', '.join(sorted(map(str, bilinmeyen))) or 'boş'}")
+    return df
+
+
+def arrow_ice_aktar(dosya, depo, bugun=None):
+    """Parquet/Arrow dosyasındaki mevduatları yeniden hesaplamadan tek işlemde depoya ekle"""
+    eklenen = depo.toplu_ekle([arrow_oku(dosya)])
+
+    # Kalan gün dışa aktarım günündeki haliyle gelir
+    depo.kalan_gunleri_guncelle(bugun or date.today())
+    return AktarimSonucu(eklenen, [])
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from constants import BANKALAR, DOVIZ_TIPLERI, MEVDUAT_TIPLERI, VARSAYILAN_FAIZ
+from hesaplama import _yuvarla, hesapla_stopaj_orani_toplu, tl_kurlari
+
+# Stopaj kademelerinin iki yanındaki vadeler de karşılaştırılabilsin diye 180/181 ve 365/366 birlikte
+VADE_SECENEKLERI = [32, 92, 180, 181, 365, 366, 730]
+VARSAYILAN_VADELER = [32, 92, 181, 366]
+
+OLCUTLER = {
+    'net_faiz_tl': 'Net Faiz (TL)',
+    'yillik_net_getiri': 'Yıllık Net Getiri (%)'
+}
+
+
+def oran_tablosu_olustur(vadeler, bankalar=BANKALAR, mevduat_tipleri=MEVDUAT_TIPLERI):
+    """Her (mevduat tipi, banka) satırı ve vade kolonu için varsayılan faiz oranı tablosu"""
+    tablo = pd.DataFrame(
+        [(tip, banka) for tip in mevduat_tipleri for banka in bankalar],
+        columns=['mevduat_tipi', 'banka']
+    )
+    for vade in vadeler:
+        tablo[str(vade)] = tablo['mevduat_tipi'].map(VARSAYILAN_FAIZ).astype(float)
+    return tablo
+
+
+def urun_tablosu(oranlar):
+    """Geniş faiz oranı tablosunu (mevduat_tipi, banka, vade, faiz_orani) satırlarına aç"""
+    uzun = oranlar.melt(id_vars=['mevduat_tipi', 'banka'], var_name='vade', value_name='faiz_orani')
+    uzun['vade'] = uzun['vade'].astype(np.int64)
+    return uzun
+
+
+def urunleri_hesapla(urunler, tutar, guncel_kur, kurlar=None):
+    """Ürün satırlarını verilen TL tutar(lar)ı için tek vektörel geçişte hesapla
+
+    tutar TL cinsindendir; döviz ürünlerinde kendi para biriminin güncel kuruyla
+    çevrilir ve sonuçlar aynı kurla TL'ye geri çevrilir. Kuru bilinmeyen ürünlerin
+    sonuçları NaN olur.
+    """
+    uzun = urunler.copy()
+    vade = uzun['vade'].to_numpy(dtype=np.int64)
+    faiz_orani = _yuvarla(uzun['faiz_orani'].to_numpy(dtype=float), 2)
+    doviz = uzun['mevduat_tipi'].isin(DOVIZ_TIPLERI).to_numpy()
+    kur = tl_kurlari(uzun['mevduat_tipi'], guncel_kur, kurlar)
+
+    # hesapla ile aynı yuvarlama adımları: önce mevduatın kendi para biriminde
+    tutar = np.asarray(tutar, dtype=float)
+    ana_tutar = np.where(doviz, _yuvarla(tutar / kur), _yuvarla(tutar))
+    stopaj_orani = hesapla_stopaj_orani_toplu(vade, uzun['mevduat_tipi'].to_numpy())
+    brut_faiz = _yuvarla(ana_tutar * (faiz_orani / 100) * (vade / 365))
+    net_faiz = brut_faiz - _yuvarla(brut_faiz * (stopaj_orani / 100))
+
+    net_faiz_tl = np.where(doviz, _yuvarla(net_faiz * kur), net_faiz)
+    uzun['stopaj_orani'] = stopaj_orani
+    uzun['net_faiz_tl'] = net_faiz_tl
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uzun['yillik_net_getiri'] = np.where(ana_tutar > 0, net_faiz / ana_tutar * 365 / vade * 100, 0.0)
+    return uzun
+
+
+def karsilastirma_izgarasi(oranlar, tutar, guncel_kur, kurlar=None):
+    """Tüm (banka, vade, mevduat tipi) hücrelerini tek vektörel geçişte hesapla"""
+    return urunleri_hesapla(urun_tablosu(oranlar), tutar, guncel_kur, kurlar)
+
+
+def en_iyi_hucre(izgara, olcut):
+    """Ölçüte göre en yüksek getirili hücreyi döndür (hesaplanabilen hücre yoksa None)"""
+    degerler = izgara[olcut]
+    if degerler.isna().all():
+        return None
+    return izgara.loc[degerler.idxmax()]
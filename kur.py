@@ -0,0 +1,255 @@
+from collections import deque, namedtuple
+from datetime import datetime
+import logging
+import os
+import statistics
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Önbellek süreleri (saniye)
+KUR_TTL = 300
+HATA_BEKLEME = 30
+# Arka plan yenileme aralığı ve ardışık hatalarda ulaşılabilecek en uzun bekleme (saniye)
+YENILEME_ARALIGI = float(os.environ.get('KUR_YENILEME_ARALIGI', KUR_TTL))
+EN_FAZLA_BEKLEME = 900
+# Saklanan son getirme süresi sayısı
+SURE_PENCERESI = 100
+
+KurMetrikleri = namedtuple('KurMetrikleri', [
+    'calisiyor', 'deneme', 'hata', 'ardisik_hata', 'son_sure_ms', 'medyan_sure_ms', 'son_hata', 'zaman',
+    'sonraki_deneme_sn'
+])
+
+# Para birimlerinin TL kuru için Yahoo Finance sembolleri
+KUR_SEMBOLLERI = {
+    'USD': 'USDTRY=X',
+    'EUR': 'EURTRY=X',
+    'GBP': 'GBPTRY=X'
+}
+# Gram altın fiyatı ons fiyatı (USD) ve USD/TL kurundan türetilir
+ALTIN_SEMBOLU = 'GC=F'
+ONS_GRAM = 31.1034768
+
+
+def yfinance_kurlari_getir(para_birimleri=('USD', 'EUR', 'GBP', 'XAU')):
+    """Tüm para birimlerinin TL kurlarını tek bir toplu yfinance isteğiyle getir
+
+    Semboller yfinance tarafından eşzamanlı indirilir. Alınamayan kurlar sonuçta yer almaz.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    semboller = {para: KUR_SEMBOLLERI[para] for para in para_birimleri if para in KUR_SEMBOLLERI}
+    if 'XAU' in para_birimleri:
+        semboller.setdefault('USD', KUR_SEMBOLLERI['USD'])
+        semboller['XAU'] = ALTIN_SEMBOLU
+
+    kapanis = yf.download(
+        list(semboller.values()), period='5d', progress=False, threads=True, auto_adjust=False
+    )['Close']
+    # Tatil günlerinde boş kalan kapanışlar için son geçerli değer
+    son = kapanis.ffill().iloc[-1]
+    kurlar = {para: float(son[sembol]) for para, sembol in semboller.items() if pd.notna(son.get(sembol))}
+
+    if 'XAU' in kurlar:
+        if 'USD' in kurlar:
+            kurlar['XAU'] = kurlar['XAU'] * kurlar['USD'] / ONS_GRAM
+        else:
+            del kurlar['XAU']
+    return {para: round(kur, 4) for para, kur in kurlar.items() if para in para_birimleri}
+
+
+class KurSaglayici:
+    """Oturumlar arasında paylaşılan, TTL önbellekli kur sağlayıcı
+
+    kaynak tek bir USD/TL kuru ya da para birimi -> TL kuru sözlüğü döndürebilir;
+    sözlükte USD kuru bulunmalıdır. baslat() ile süreç genelinde tek bir zamanlayıcı
+    iş parçacığı çalıştırılırsa kurlar yalnızca onun tarafından yenilenir ve çizimler
+    hiçbir zaman kaynağı beklemez.
+    """
+
+    def __init__(self, kaynak=yfinance_kurlari_getir, ttl=KUR_TTL, hata_bekleme=HATA_BEKLEME):
+        self.kaynak = kaynak
+        self.ttl = ttl
+        self.hata_bekleme = hata_bekleme
+
+        self.kur = None          # Son başarılı USD/TL kuru
+        self.kurlar = {}         # Para birimi -> son başarılı TL kuru
+        self.zaman = None        # Son başarılı getirme zamanı
+        self.son_hata = None     # Son getirme denemesinin hatası
+
+        self._kilit = threading.Lock()
+        self._ucus = None        # Devam eden getirme işlemi
+        self._son_basari = None  # time.monotonic() cinsinden
+        self._son_deneme = None
+
+        # Zamanlayıcı ve ölçümler
+        self.aralik = None
+        self.en_fazla_bekleme = EN_FAZLA_BEKLEME
+        self.deneme = 0
+        self.hata = 0
+        self.ardisik_hata = 0
+        self._sureler = deque(maxlen=SURE_PENCERESI)
+        self._zamanlayici = None
+        self._durdur = threading.Event()
+        self._sonraki = None
+
+    def _taze_mi(self):
+        """Önbellekteki kur TTL içinde mi"""
+        simdi = time.monotonic()
+        if self._son_basari is not None and simdi - self._son_basari < self.ttl:
+            return True
+        # Başarısız denemeden sonra kaynağı hemen tekrar yorma
+        if self.son_hata is not None and self._son_deneme is not None:
+            return simdi - self._son_deneme < self.hata_bekleme
+        return False
+
+    def getir(self, zorla=False):
+        """Kuru döndür, gerekirse kaynaktan tek bir istekle yenile"""
+        with self._kilit:
+            if not zorla and self._taze_mi():
+                return self.kur
+
+            # Aynı anda gelen istekler tek bir getirme işlemini bekler
+            ucus = self._ucus
+            lider = ucus is None
+            if lider:
+                ucus = self._ucus = threading.Event()
+
+        if not lider:
+            ucus.wait()
+            return self.kur
+
+        baslangic = time.perf_counter()
+        try:
+            sonuc = self.kaynak()
+            kurlar = sonuc if isinstance(sonuc, dict) else {'USD': sonuc}
+            kurlar = {para: float(kur) for para, kur in kurlar.items()}
+            if not kurlar.get('USD', 0) > 0:
+                raise ValueError(f"Geçersiz kur değeri: {kurlar.get('USD')}")
+        except Exception as e:
+            logger.warning("Kur bilgisi alınamadı: %s", e)
+            with self._kilit:
+                self.son_hata = e
+                self._son_deneme = time.monotonic()
+                self.hata += 1
+                self.ardisik_hata += 1
+        else:
+            with self._kilit:
+                self.ardisik_hata = 0
+                # Bu istekte alınamayan kurlar için son bilinen değer korunur
+                self.kurlar = {**self.kurlar, **{para: kur for para, kur in kurlar.items() if kur > 0}}
+                self.kur = self.kurlar['USD']
+                self.zaman = datetime.now()
+                self.son_hata = None
+                self._son_basari = self._son_deneme = time.monotonic()
+        finally:
+            with self._kilit:
+                self.deneme += 1
+                self._sureler.append(time.perf_counter() - baslangic)
+                self._ucus = None
+            ucus.set()
+
+        # Hata durumunda son bilinen geçerli kur döner
+        return self.kur
+
+    def arka_planda_getir(self):
+        """Kur taze değilse yenilemeyi arka planda başlat, beklemeden dön"""
+        with self._kilit:
+            # Zamanlayıcı çalışıyorsa yenileme ona bırakılır
+            if self._ucus is not None or self._taze_mi() or self.zamanlayici_calisiyor():
+                return
+        threading.Thread(target=self.getir, name='kur-getir', daemon=True).start()
+
+    def zamanlayici_calisiyor(self):
+        """Arka plan zamanlayıcısı çalışıyorsa True"""
+        return self._zamanlayici is not None and self._zamanlayici.is_alive()
+
+    def baslat(self, aralik=YENILEME_ARALIGI, en_fazla_bekleme=EN_FAZLA_BEKLEME):
+        """Kurları aralik saniyede bir yenileyen zamanlayıcıyı başlat, zaten çalışıyorsa False döndür
+
+        Başarısız denemelerden sonra bekleme hata_bekleme'den başlayıp her ardışık
+        hatada ikiye katlanır, en_fazla_bekleme'yi aşmaz.
+        """
+        with self._kilit:
+            if self.zamanlayici_calisiyor():
+                return False
+            self.aralik = aralik
+            self.en_fazla_bekleme = en_fazla_bekleme
+            self._durdur.clear()
+            self._zamanlayici = threading.Thread(target=self._zamanla, name='kur-zamanlayici', daemon=True)
+            self._zamanlayici.start()
+        return True
+
+    def durdur(self, zaman_asimi=None):
+        """Zamanlayıcıyı durdur ve bitmesini bekle"""
+        self._durdur.set()
+        if self._zamanlayici is not None:
+            self._zamanlayici.join(zaman_asimi)
+
+    def _zamanla(self):
+        """Zamanlayıcı döngüsü: kuru yenile, sonuca göre aralık ya da geri çekilme süresi kadar bekle"""
+        while not self._durdur.is_set():
+            self.getir(zorla=True)
+
+            with self._kilit:
+                if self.ardisik_hata:
+                    bekleme = min(self.hata_bekleme * 2 ** (self.ardisik_hata - 1), self.en_fazla_bekleme)
+                    logger.info("Kur yenileme %d. ardışık hatadan sonra %.0f sn bekleyecek", self.ardisik_hata, bekleme)
+                else:
+                    bekleme = self.aralik
+                self._sonraki = time.monotonic() + bekleme
+            self._durdur.wait(bekleme)
+
+    def metrikler(self):
+        """Getirme denemesi, hata ve süre ölçümleri"""
+        with self._kilit:
+            sureler = list(self._sureler)
+            sonraki = None
+            if self.zamanlayici_calisiyor() and self._sonraki is not None:
+                sonraki = max(0.0, self._sonraki - time.monotonic())
+            return KurMetrikleri(
+                calisiyor=self.zamanlayici_calisiyor(),
+                deneme=self.deneme,
+                hata=self.hata,
+                ardisik_hata=self.ardisik_hata,
+                son_sure_ms=sureler[-1] * 1000 if sureler else None,
+                medyan_sure_ms=statistics.median(sureler) * 1000 if sureler else None,
+                son_hata=self.son_hata,
+                zaman=self.zaman,
+                sonraki_deneme_sn=sonraki
+            )
+
+    def guncel(self):
+        """Eldeki kuru hemen döndür, bayatsa arka planda yenile (ilk kur için bekler)"""
+        if self.kur is None:
+            # Zamanlayıcı varken ilk kur için de çizim bekletilmez
+            if self.zamanlayici_calisiyor():
+                return None
+            return self.getir()
+        self.arka_planda_getir()
+        return self.kur
+
+    def guncel_kurlar(self):
+        """Eldeki tüm kurları hemen döndür, bayatsa arka planda yenile (ilk kur için bekler)"""
+        self.guncel()
+        return dict(self.kurlar)
+
+    def bekleniyor_mu(self):
+        """İlk kur getirme işlemi henüz sonuçlanmadıysa True"""
+        return self.kur is None and self.son_hata is None
+
+    def bayat_mi(self):
+        """Elde kur var ama TTL süresini aşmışsa veya son yenileme başarısızsa True"""
+        if self.kur is None:
+            return False
+        # Arka planda süren yenileme ve zamanlayıcının tuttuğu kur bayatlık sayılmaz
+        if self.son_hata is None and (self._ucus is not None or self.zamanlayici_calisiyor()):
+            return False
+        return self.son_hata is not None or time.monotonic() - self._son_basari >= self.ttl
+
+
+# Tüm oturumların kullandığı ortak sağlayıcı
+kur_saglayici = KurSaglayici()
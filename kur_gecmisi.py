@@ -0,0 +1,270 @@
+from datetime import date, timedelta
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from depo import VARSAYILAN_YOL
+
+logger = logging.getLogger(__name__)
+
+VARSAYILAN_SEMBOL = 'USDTRY=X'
+# Alınamayan aralıkların yeniden denenmesi için ilk ve en uzun bekleme (saniye)
+HATA_BEKLEME = 60
+EN_FAZLA_BEKLEME = 3600
+
+
+class YFinanceKaynagi:
+    """Günlük kapanış kurlarını yfinance üzerinden toplu olarak getirir"""
+
+    def getir(self, sembol, baslangic, bitis):
+        """[baslangic, bitis] aralığındaki kapanışları tarih indeksli Series olarak döndür"""
+        import yfinance as yf
+
+        gecmis = yf.Ticker(sembol).history(
+            start=baslangic.isoformat(),
+            end=(bitis + timedelta(days=1)).isoformat(),
+            interval='1d',
+            auto_adjust=False
+        )
+        if gecmis.empty:
+            return pd.Series(dtype=float)
+        kapanis = gecmis['Close']
+        kapanis.index = pd.DatetimeIndex(kapanis.index.date)
+        return kapanis
+
+
+class DosyaKaynagi:
+    """tarih,kapanis kolonlu CSV dosyasından kur getirir (test ve çevrimdışı kurulumlar için)"""
+
+    def __init__(self, yol):
+        self.yol = yol
+        self._veri = None
+
+    def getir(self, sembol, baslangic, bitis):
+        """[baslangic, bitis] aralığındaki kapanışları tarih indeksli Series olarak döndür"""
+        if self._veri is None:
+            df = pd.read_csv(self.yol, parse_dates=['tarih'])
+            if 'sembol' in df:
+                df = df[df['sembol'] == sembol]
+            self._veri = df.set_index('tarih')['kapanis'].sort_index()
+        return self._veri.loc[pd.Timestamp(baslangic):pd.Timestamp(bitis)]
+
+
+def eksik_araliklar(baslangic, bitis, kapsam):
+    """[baslangic, bitis] aralığının kapsanmayan alt aralıklarını döndür"""
+    eksikler = []
+    imlec = baslangic
+    for k_bas, k_bit in sorted(kapsam):
+        if k_bit < imlec:
+            continue
+        if k_bas > bitis:
+            break
+        if k_bas > imlec:
+            eksikler.append((imlec, k_bas - timedelta(days=1)))
+        imlec = max(imlec, k_bit + timedelta(days=1))
+        if imlec > bitis:
+            break
+    if imlec <= bitis:
+        eksikler.append((imlec, bitis))
+    return eksikler
+
+
+def _araliklari_birlestir(araliklar):
+    """Çakışan veya bitişik tarih aralıklarını birleştir"""
+    birlesik = []
+    for bas, bit in sorted(araliklar):
+        if birlesik and bas <= birlesik[-1][1] + timedelta(days=1):
+            birlesik[-1] = (birlesik[-1][0], max(birlesik[-1][1], bit))
+        else:
+            birlesik.append((bas, bit))
+    return birlesik
+
+
+class KurGecmisi:
+    """Günlük kapanış kurlarının yerel zaman serisi deposu"""
+
+    def __init__(self, kaynak=None, yol=VARSAYILAN_YOL, sembol=VARSAYILAN_SEMBOL):
+        self.kaynak = kaynak or YFinanceKaynagi()
+        self.sembol = sembol
+        self._kilit = threading.RLock()
+        self._baglanti = sqlite3.connect(yol, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        with self._kilit, self._baglanti:
+            self._baglanti.executescript("""
+                CREATE TABLE IF NOT EXISTS kur_gecmisi (
+                    sembol TEXT NOT NULL,
+                    tarih TEXT NOT NULL,
+                    kapanis REAL NOT NULL,
+                    PRIMARY KEY (sembol, tarih)
+                );
+                CREATE TABLE IF NOT EXISTS kur_kapsami (
+                    sembol TEXT NOT NULL,
+                    baslangic TEXT NOT NULL,
+                    bitis TEXT NOT NULL
+                );
+            """)
+        self._diziler = None
+        # Senkronizasyonlar sırayla yapılır; ağ istekleri sırasında okumalar beklemez
+        self._senkron_kilidi = threading.Lock()
+        self._senkron = None
+        # Alınamayan aralıklar: (baslangic, bitis) -> (sonraki deneme zamanı, bekleme)
+        self._basarisiz = {}
+        # Yeni kapanış eklendikçe artar (önbellek anahtarı olarak kullanılır)
+        self.surum = 0
+
+    def _kapsam(self):
+        """Daha önce senkronize edilmiş tarih aralıkları"""
+        satirlar = self._baglanti.execute(
+            "SELECT baslangic, bitis FROM kur_kapsami WHERE sembol = ?", (self.sembol,)
+        ).fetchall()
+        return [(date.fromisoformat(b), date.fromisoformat(e)) for b, e in satirlar]
+
+    def _eksikler(self, baslangic, bitis):
+        """Getirilmesi gereken aralıklar (bekleme süresi dolmamış başarısız aralıklar hariç)"""
+        simdi = time.monotonic()
+        bekleyen = [aralik for aralik, (sonraki, _) in dict(self._basarisiz).items() if simdi < sonraki]
+        with self._kilit:
+            return eksik_araliklar(baslangic, bitis, self._kapsam() + bekleyen)
+
+    def _hata_kaydet(self, baslangic, bitis):
+        """Alınamayan aralığı artan bekleme süresiyle kaydet"""
+        onceki = self._basarisiz.get((baslangic, bitis))
+        bekleme = min(onceki[1] * 2, EN_FAZLA_BEKLEME) if onceki else HATA_BEKLEME
+        # Sözlük yerinde değiştirilmez; arka planda okuyanlar tutarlı bir kopya görür
+        self._basarisiz = {**self._basarisiz, (baslangic, bitis): (time.monotonic() + bekleme, bekleme)}
+
+    def senkronize(self, baslangic, bitis=None):
+        """Aralıkta eksik olan günleri kaynaktan toplu olarak getir, getirilen gün sayısını döndür
+
+        Alınamayan aralıklar bekleme süresi dolana kadar yeniden denenmez.
+        """
+        bitis = bitis or date.today()
+        # Bugünün kapanışı kesinleşmediği için kapsam dünle sınırlanır
+        kesin_bitis = min(bitis, date.today() - timedelta(days=1))
+
+        with self._senkron_kilidi:
+            eksikler = self._eksikler(baslangic, bitis)
+            if not eksikler:
+                return 0
+
+            yeni_kapsam = []
+            eklenen = 0
+            for e_bas, e_bit in eksikler:
+                try:
+                    seri = self.kaynak.getir(self.sembol, e_bas, e_bit)
+                except Exception as e:
+                    logger.warning("Kur geçmişi alınamadı (%s - %s): %s", e_bas, e_bit, e)
+                    self._hata_kaydet(e_bas, e_bit)
+                    continue
+
+                self._basarisiz = {
+                    (h_bas, h_bit): deger for (h_bas, h_bit), deger in self._basarisiz.items()
+                    if not e_bas <= h_bas <= h_bit <= e_bit
+                }
+                satirlar = [
+                    (self.sembol, pd.Timestamp(t).strftime('%Y-%m-%d'), float(k))
+                    for t, k in seri.dropna().items()
+                ]
+                with self._kilit, self._baglanti:
+                    self._baglanti.executemany("INSERT OR REPLACE INTO kur_gecmisi VALUES (?, ?, ?)", satirlar)
+                eklenen += len(satirlar)
+                if e_bas <= kesin_bitis:
+                    yeni_kapsam.append((e_bas, min(e_bit, kesin_bitis)))
+
+            with self._kilit:
+                if yeni_kapsam:
+                    birlesik = _araliklari_birlestir(self._kapsam() + yeni_kapsam)
+                    with self._baglanti:
+                        self._baglanti.execute("DELETE FROM kur_kapsami WHERE sembol = ?", (self.sembol,))
+                        self._baglanti.executemany(
+                            "INSERT INTO kur_kapsami VALUES (?, ?, ?)",
+                            [(self.sembol, b.isoformat(), e.isoformat()) for b, e in birlesik]
+                        )
+                if eklenen:
+                    self._diziler = None
+                    self.surum += 1
+        return eklenen
+
+    def senkronize_ediliyor(self):
+        """Arka plan senkronizasyonu sürüyorsa True"""
+        return self._senkron is not None and self._senkron.is_alive()
+
+    def arka_planda_senkronize(self, baslangic, bitis=None):
+        """Eksik günler varsa senkronizasyonu arka planda başlat, başlatıldıysa True döndür"""
+        with self._kilit:
+            if self.senkronize_ediliyor() or not self._eksikler(baslangic, bitis or date.today()):
+                return False
+            self._senkron = threading.Thread(
+                target=self.senkronize, args=(baslangic, bitis), name='kur-gecmisi', daemon=True
+            )
+            self._senkron.start()
+        return True
+
+    def _dizileri_getir(self):
+        """Sıralı tarih ve kapanış dizilerini (bellekte önbellekli) döndür"""
+        with self._kilit:
+            if self._diziler is None:
+                df = pd.read_sql_query(
+                    "SELECT tarih, kapanis FROM kur_gecmisi WHERE sembol = ? ORDER BY tarih",
+                    self._baglanti,
+                    params=(self.sembol,)
+                )
+                self._diziler = (
+                    pd.to_datetime(df['tarih']).to_numpy(dtype='datetime64[D]'),
+                    df['kapanis'].to_numpy(dtype=float)
+                )
+            return self._diziler
+
+    def kur_asof(self, tarihler):
+        """Her tarih için o gün veya öncesindeki son kapanış kurunu döndür (yoksa NaN)"""
+        gunler, kapanislar = self._dizileri_getir()
+        tarihler = np.asarray(tarihler, dtype='datetime64[D]')
+        konum = np.searchsorted(gunler, tarihler, side='right') - 1
+        sonuc = np.full(tarihler.shape, np.nan)
+        gecerli = konum >= 0
+        sonuc[gecerli] = kapanislar[konum[gecerli]]
+        return sonuc
+
+    def kurlar(self, baslangic, bitis=None, senkronize=True):
+        """Aralıktaki her takvim günü için kapanış kuru (tatiller bir önceki günle doldurulur)"""
+        bitis = bitis or date.today()
+        if senkronize:
+            self.senkronize(baslangic, bitis)
+        gunler = pd.date_range(baslangic, bitis, freq='D')
+        return pd.Series(self.kur_asof(gunler.to_numpy()), index=gunler, name=self.sembol)
+
+    def kur_yolu(self, tarihler, guncel_kur, arka_planda=False):
+        """Geçmiş tarihler için kapanış kurunu, gelecek ve eksik günler için güncel kuru döndür
+
+        arka_planda True ise eksik geçmiş beklenmez; arka planda getirilirken güncel kur kullanılır.
+        """
+        tarihler = pd.DatetimeIndex(pd.to_datetime(np.asarray(tarihler)))
+        bugun = pd.Timestamp(date.today())
+        gecmis = tarihler[tarihler < bugun]
+        if len(gecmis):
+            senkronize = self.arka_planda_senkronize if arka_planda else self.senkronize
+            senkronize(gecmis.min().date(), gecmis.max().date())
+
+        kurlar = self.kur_asof(tarihler.to_numpy())
+        kurlar[(tarihler >= bugun) | np.isnan(kurlar)] = guncel_kur
+        return kurlar
+
+
+_varsayilan_gecmis = None
+_gecmis_kilidi = threading.Lock()
+
+
+def varsayilan_kur_gecmisi():
+    """Uygulamanın ortak kur geçmişi deposunu döndür"""
+    global _varsayilan_gecmis
+    with _gecmis_kilidi:
+        if _varsayilan_gecmis is None:
+            # KUR_GECMISI_DOSYASI tanımlıysa ağ yerine yerel dosya kullanılır
+            dosya = os.environ.get('KUR_GECMISI_DOSYASI')
+            _varsayilan_gecmis = KurGecmisi(DosyaKaynagi(dosya) if dosya else None)
+    return _varsayilan_gecmis
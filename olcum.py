@@ -0,0 +1,138 @@
+import argparse
+from collections import deque
+import functools
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bu süreyi aşan ilk çizimler uyarı olarak loglanır (saniye)
+BASLANGIC_ESIGI = 3.0
+# Her bölüm için saklanan son etkileşim süresi sayısı
+ETKILESIM_PENCERESI = 200
+
+_olcumler = {}
+_etkilesimler = {}
+_baslangic = None
+_kilit = threading.Lock()
+
+
+def baslangic_isaretle(zaman):
+    """Sürecin ilk çalıştırmasının başlangıç zamanını (perf_counter) bir kez kaydet"""
+    global _baslangic
+    with _kilit:
+        if _baslangic is None:
+            _baslangic = zaman
+
+
+def baslangic():
+    """İlk çalıştırmanın başlangıç zamanı"""
+    return _baslangic
+
+
+def kaydet(ad, sure):
+    """Bir ölçümü süreç boyunca ilk değeriyle kaydet, ilk kayıtsa True döndür"""
+    with _kilit:
+        if ad in _olcumler:
+            return False
+        _olcumler[ad] = sure
+
+    seviye = logging.WARNING if ad == 'ilk_cizim' and sure > BASLANGIC_ESIGI else logging.INFO
+    logger.log(seviye, "Başlangıç ölçümü %s: %.3f sn", ad, sure)
+    return True
+
+
+def olcumler():
+    """Kaydedilmiş başlangıç ölçümlerinin kopyası"""
+    with _kilit:
+        return dict(_olcumler)
+
+
+def etkilesim_kaydet(ad, sure):
+    """Bir bölümün tek bir çizim süresini (saniye) kaydet"""
+    with _kilit:
+        _etkilesimler.setdefault(ad, deque(maxlen=ETKILESIM_PENCERESI)).append(sure)
+    logger.debug("Etkileşim %s: %.1f ms", ad, sure * 1000)
+
+
+def olculen(ad):
+    """Fonksiyonun her çalışmasını ad altında etkileşim süresi olarak kaydeden dekoratör"""
+    def dekorator(fonksiyon):
+        @functools.wraps(fonksiyon)
+        def sarmalayici(*args, **kwargs):
+            baslangic_zamani = time.perf_counter()
+            try:
+                return fonksiyon(*args, **kwargs)
+            finally:
+                etkilesim_kaydet(ad, time.perf_counter() - baslangic_zamani)
+        return sarmalayici
+    return dekorator
+
+
+def etkilesim_ozeti():
+    """Bölüm başına çizim sayısı ile son, medyan ve %95 süreleri (ms)"""
+    with _kilit:
+        sureler = {ad: sorted(kuyruk) for ad, kuyruk in _etkilesimler.items()}
+        sonlar = {ad: kuyruk[-1] for ad, kuyruk in _etkilesimler.items()}
+
+    return [
+        {
+            'bolum': ad,
+            'adet': len(sirali),
+            'son_ms': sonlar[ad] * 1000,
+            'medyan_ms': statistics.median(sirali) * 1000,
+            'p95_ms': sirali[min(len(sirali) - 1, int(len(sirali) * 0.95))] * 1000
+        }
+        for ad, sirali in sorted(sureler.items())
+    ]
+
+
+def _ice_aktarma_suresi(modul):
+    """Modülü yeni bir yorumlayıcıda içe aktarıp süresini ölç"""
+    kod = f"import time; t = time.perf_counter(); import {modul}; print(time.perf_counter() - t)"
+    cikti = subprocess.run(
+        [sys.executable, '-c', kod],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    return float(cikti.stdout.strip().splitlines()[-1])
+
+
+def _ilk_cizim_suresi():
+    """Uygulamanın ilk çalıştırmasını (ağ beklemeden) yeni bir yorumlayıcıda ölç"""
+    kod = (
+        "import time; t = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file('app.py', default_timeout=60).run()\n"
+        "print(time.perf_counter() - t)"
+    )
+    cikti = subprocess.run(
+        [sys.executable, '-c', kod],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    return float(cikti.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(description="Uygulamanın soğuk başlangıç süresini ölçer.")
+    ayristirici.add_argument('--tekrar', type=int, default=3, help="Ölçüm tekrar sayısı")
+    ayristirici.add_argument('--esik', type=float, default=BASLANGIC_ESIGI,
+                             help="İlk çizim medyanı bu süreyi (sn) aşarsa çıkış kodu 1 olur")
+    args = ayristirici.parse_args(argv)
+
+    ice_aktarma = [_ice_aktarma_suresi('app') for _ in range(args.tekrar)]
+    ilk_cizim = [_ilk_cizim_suresi() for _ in range(args.tekrar)]
+
+    print(f"app içe aktarma: {statistics.median(ice_aktarma):.3f} sn (medyan, {args.tekrar} tekrar)")
+    print(f"İlk çizim: {statistics.median(ilk_cizim):.3f} sn (medyan, {args.tekrar} tekrar)")
+    return 0 if statistics.median(ilk_cizim) <= args.esik else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+
+# Her adımda bu kadar günlük getiri birlikte çekilir (bellek sınırı)
+GUN_BLOGU = 64
+YUZDELIKLER = [5, 25, 50, 75, 95]
+# Bu senaryo sayısından itibaren simülasyon iş parçacıklarına dağıtılır
+PARALEL_ESIK = 20000
+
+SENARYO_KOLONLARI = [
+    'mevduat_tipi',
+    'banka',
+    'tutar',
+    'vade_bitis',
+    'donus_tutari_tl',
+    'tutar_usd',
+    'basabas_kur'
+]
+
+KurModeli = namedtuple('KurModeli', ['yontem', 'mu', 'sigma', 'getiriler'])
+SenaryoSonucu = namedtuple('SenaryoSonucu', ['mevduatlar', 'portfoy', 'portfoy_fark_usd'])
+
+
+def kur_modeli_kalibre_et(kurlar, yontem='gbm'):
+    """Günlük kur serisinden log getirileri çıkarıp modeli kalibre et
+
+    yontem 'gbm' ise getirilerin ortalaması ve standart sapması, 'bootstrap' ise
+    getirilerin kendisi kullanılır.
+    """
+    if yontem not in ('gbm', 'bootstrap'):
+        raise ValueError(f"Bilinmeyen senaryo yöntemi: {yontem}")
+
+    getiriler = np.diff(np.log(pd.Series(kurlar).dropna().to_numpy(dtype=float)))
+    if len(getiriler) < 30:
+        raise ValueError("Kalibrasyon için en az 30 günlük kur geçmişi gerekli")
+
+    return KurModeli(yontem, float(getiriler.mean()), float(getiriler.std(ddof=1)), getiriler)
+
+
+def kur_senaryolari(model, baslangic_kur, ufuklar, senaryo_sayisi, tohum=None):
+    """Sıralı gün ufuklarında (senaryo x ufuk) simüle edilmiş kur matrisi
+
+    Her senaryo tek bir kur yoludur; ufuklar aynı yol üzerindeki noktalardır.
+    """
+    ufuklar = np.asarray(ufuklar, dtype=np.int64)
+    rng = np.random.default_rng(tohum)
+    sonuc = np.empty((senaryo_sayisi, len(ufuklar)))
+    log_kur = np.zeros(senaryo_sayisi)
+
+    if model.yontem == 'gbm':
+        # Ufuklar arası artımlar bağımsız normal dağılır, günlük yürütmeye gerek yok
+        onceki = 0
+        for k, ufuk in enumerate(ufuklar):
+            adim = ufuk - onceki
+            if adim:
+                log_kur += rng.normal(model.mu * adim, model.sigma * np.sqrt(adim), senaryo_sayisi)
+            sonuc[:, k] = log_kur
+            onceki = ufuk
+    else:
+        # Geçmiş günlük getiriler bloklar halinde yeniden örneklenir
+        k = np.searchsorted(ufuklar, 0, side='right')
+        sonuc[:, :k] = 0.0
+        gun = 0
+        son_ufuk = ufuklar[-1] if len(ufuklar) else 0
+        while gun < son_ufuk:
+            blok = min(GUN_BLOGU, son_ufuk - gun)
+            secim = rng.integers(0, len(model.getiriler), (senaryo_sayisi, blok))
+            yol = log_kur[:, None] + np.cumsum(model.getiriler[secim], axis=1)
+            while k < len(ufuklar) and ufuklar[k] <= gun + blok:
+                sonuc[:, k] = yol[:, ufuklar[k] - gun - 1]
+                k += 1
+            log_kur = yol[:, -1]
+            gun += blok
+
+    return baslangic_kur * np.exp(sonuc)
+
+
+def _parca_simule_et(args):
+    """İş parçacığı havuzunda çalışan tek parça simülasyonu"""
+    return kur_senaryolari(*args)
+
+
+def _paralel_senaryolar(model, baslangic_kur, ufuklar, senaryo_sayisi, tohum, isci_sayisi):
+    """Senaryoları bağımsız tohumlu parçalara bölüp iş parçacıklarında simüle et
+
+    Streamlit sürecinde fork/spawn güvenli olmadığından süreç yerine iş parçacığı
+    kullanılır; numpy üretici ve vektör işlemlerinde GIL'i bıraktığı için parçalar
+    yine paralel ilerler.
+    """
+    tohumlar = np.random.SeedSequence(tohum).spawn(isci_sayisi)
+    parcalar = np.array_split(np.arange(senaryo_sayisi), isci_sayisi)
+    isler = [
+        (model, baslangic_kur, ufuklar, len(parca), t)
+        for parca, t in zip(parcalar, tohumlar) if len(parca)
+    ]
+    with ThreadPoolExecutor(max_workers=isci_sayisi, thread_name_prefix='senaryo') as havuz:
+        return np.vstack(list(havuz.map(_parca_simule_et, isler)))
+
+
+def basabas_analizi(df, model, guncel_kur, bugun, senaryo_sayisi=10000, tohum=None, isci_sayisi=None):
+    """TL mevduatların vade sonu USD karşılığını kur senaryolarında başabaş kura göre değerlendir
+
+    Mevduat, vade günündeki kur başabaş kurun altında kalırsa USD'yi geçmiş sayılır.
+    isci_sayisi verilmezse büyük simülasyonlar otomatik olarak paralel çalışır.
+    """
+    # Kur yoksa başabaş karşılaştırması sonsuz ve NaN değerler üretir
+    if not (guncel_kur or 0) > 0:
+        raise ValueError("Kur bilgisi yok: USD/TL")
+
+    if isci_sayisi is None:
+        isci_sayisi = min(os.cpu_count() or 1, 4) if senaryo_sayisi >= PARALEL_ESIK else 1
+
+    tl_df = df[
+        (df['mevduat_tipi'] == 'TL Mevduat')
+        & (pd.to_datetime(df['vade_bitis']) >= pd.Timestamp(bugun))
+    ]
+    if tl_df.empty:
+        raise ValueError("Değerlendirilecek aktif TL mevduat bulunmamaktadır")
+
+    gunler = (pd.to_datetime(tl_df['vade_bitis']) - pd.Timestamp(bugun)).dt.days.to_numpy()
+    ufuklar, ufuk_kodu = np.unique(gunler, return_inverse=True)
+
+    if isci_sayisi > 1:
+        kurlar = _paralel_senaryolar(model, guncel_kur, ufuklar, senaryo_sayisi, tohum, isci_sayisi)
+    else:
+        kurlar = kur_senaryolari(model, guncel_kur, ufuklar, senaryo_sayisi, tohum)
+
+    donus = tl_df['donus_tutari_tl'].to_numpy(dtype=float)
+    tutar_usd = tl_df['tutar_usd'].to_numpy(dtype=float)
+    basabas = tl_df['basabas_kur'].to_numpy(dtype=float)
+
+    # Mevduat sonucu vade kurunda monoton olduğundan her ufukta sıralanmış kurlar yeterli
+    sirali = np.sort(kurlar, axis=0)
+    olasilik = np.empty(len(tl_df))
+    for k in range(len(ufuklar)):
+        secim = ufuk_kodu == k
+        olasilik[secim] = np.searchsorted(sirali[:, k], basabas[secim], side='left') / senaryo_sayisi
+
+    # USD karşılığının p. yüzdeliği kurun (100 - p). yüzdeliğine denk gelir
+    kur_yuzdelik = np.percentile(kurlar, [100 - p for p in YUZDELIKLER], axis=0)
+    mevduatlar = tl_df[['banka', 'tutar', 'vade_bitis', 'basabas_kur', 'tutar_usd']].copy()
+    mevduatlar['usd_gecme_olasiligi'] = olasilik
+    for p, kur in zip(YUZDELIKLER, kur_yuzdelik):
+        mevduatlar[f'usd_karsiligi_p{p}'] = donus / kur[ufuk_kodu]
+
+    # Portföy sonucu: her senaryoda ufuk bazlı dönüş toplamlarının USD karşılığı
+    ufuk_donus = np.bincount(ufuk_kodu, weights=donus, minlength=len(ufuklar))
+    portfoy_usd = (1.0 / kurlar) @ ufuk_donus
+    portfoy_fark = portfoy_usd - tutar_usd.sum()
+
+    portfoy = {
+        'adet': len(tl_df),
+        'tutar_usd': float(tutar_usd.sum()),
+        'usd_gecme_olasiligi': float((portfoy_fark > 0).mean()),
+        'beklenen_fark_usd': float(portfoy_fark.mean()),
+        'yuzdelikler': dict(zip(YUZDELIKLER, np.percentile(portfoy_usd, YUZDELIKLER)))
+    }
+    return SenaryoSonucu(mevduatlar, portfoy, portfoy_fark)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from constants import DOVIZ_TIPLERI
+from hesaplama import _gecerli_kur, tl_kurlari
+
+# Matris bu kadar mevduatlık bloklar halinde kurulur (bellek sınırı)
+BLOK_BOYUTU = 2048
+
+TAHAKKUK_KOLONLARI = [
+    'mevduat_tipi',
+    'tutar',
+    'vade_baslangic',
+    'vade_bitis',
+    'net_faiz',
+    'net_faiz_usd'
+]
+
+
+def _gun_sayisi(tarihler):
+    """Tarihleri 1970'ten itibaren gün sayısına çevir"""
+    return pd.to_datetime(np.asarray(tarihler)).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def _mevduat_dizileri(df):
+    """Tahakkuk için gereken kolonları NumPy dizilerine çevir"""
+    doviz = df['mevduat_tipi'].isin(DOVIZ_TIPLERI).to_numpy()
+    bas = _gun_sayisi(df['vade_baslangic'])
+    bit = _gun_sayisi(df['vade_bitis'])
+    tutar = df['tutar'].to_numpy(dtype=float)
+
+    # Vade sonundaki net faiz (stopaj düşülmüş, hesapla ile aynı yuvarlanmış değer)
+    net_faiz = np.where(
+        doviz,
+        df.get('net_faiz_usd', pd.Series(np.nan, index=df.index)).to_numpy(dtype=float),
+        df['net_faiz'].to_numpy(dtype=float)
+    )
+    return doviz, bas, bit, tutar, np.nan_to_num(net_faiz)
+
+
+def tahakkuk_matrisi(df, tarihler, vade_sonrasi_dahil=True):
+    """Tarih x mevduat matrisinde her mevduatın kendi para birimindeki birikmiş değeri
+
+    Basit faiz günlük olarak doğrusal tahakkuk eder ve vade sonunda stopaj sonrası
+    net faize ulaşır. Açılıştan önce değer 0'dır; vade sonrasında dönüş tutarında
+    kalır (vade_sonrasi_dahil=False ise 0 olur).
+    """
+    _, bas, bit, tutar, net_faiz = _mevduat_dizileri(df)
+    t = _gun_sayisi(tarihler)[:, None]
+    vade = np.maximum(bit - bas, 1)
+
+    gecen = np.clip(t - bas, 0, vade)
+    deger = tutar + net_faiz * (gecen / vade)
+
+    dahil = t >= bas
+    if not vade_sonrasi_dahil:
+        dahil &= t <= bit
+    return np.where(dahil, deger, 0.0)
+
+
+def portfoy_degerleme(df, tarihler, kurlar, vade_sonrasi_dahil=True, blok_boyutu=BLOK_BOYUTU,
+                      doviz_kurlari=None):
+    """Günlük portföy değerini TL ve USD cinsinden hesapla
+
+    kurlar, tarihler ile aynı uzunlukta USD/TL kur dizisidir. USD dışındaki döviz
+    mevduatları doviz_kurlari'ndaki (para birimi -> TL) güncel kurla TL'ye çevrilir;
+    kuru bilinmeyenler toplama katılmaz. Sıfır kurlu günlerde USD karşılığı
+    (ve USD mevduat varsa TL toplamı) NaN olur.
+    """
+    tarihler = pd.DatetimeIndex(pd.to_datetime(np.asarray(tarihler)))
+    kurlar = _gecerli_kur(kurlar)
+
+    tl_toplam = np.zeros(len(tarihler))
+    usd_toplam = np.zeros(len(tarihler))
+    diger_toplam = np.zeros(len(tarihler))
+
+    # Blok blok kurulan matris sütun yönünde toplanır
+    for bas in range(0, len(df), blok_boyutu):
+        blok = df.iloc[bas:bas + blok_boyutu]
+        matris = tahakkuk_matrisi(blok, tarihler, vade_sonrasi_dahil)
+        tip = blok['mevduat_tipi'].to_numpy()
+        usd = tip == 'USD Mevduat'
+        diger = np.isin(tip, DOVIZ_TIPLERI) & ~usd
+        tl_toplam += matris[:, ~(usd | diger)].sum(axis=1)
+        usd_toplam += matris[:, usd].sum(axis=1)
+        if diger.any():
+            diger_kur = tl_kurlari(tip[diger], np.nan, doviz_kurlari)
+            diger_toplam += np.nan_to_num(matris[:, diger] * diger_kur).sum(axis=1)
+
+    return pd.DataFrame({
+        'tl_mevduat': tl_toplam,
+        'usd_mevduat': usd_toplam,
+        'diger_doviz_tl': diger_toplam,
+        'kur': kurlar,
+        'toplam_tl': tl_toplam + diger_toplam + np.where(usd_toplam == 0, 0.0, usd_toplam * kurlar),
+        'toplam_usd': (tl_toplam + diger_toplam) / kurlar + usd_toplam
+    }, index=tarihler.rename('tarih'))
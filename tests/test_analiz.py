@@ -0,0 +1,55 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analiz import VADE_GRUPLARI, hesapla_ortalama_vade, portfoy_analizi_hesapla
+from hesaplama import hesapla_toplu
+
+KUR = 34.5
+BUGUN = date.today()
+
+
+def _mevduatlar(adet, tohum=0):
+    rng = np.random.default_rng(tohum)
+    baslangic = pd.Timestamp(BUGUN) - pd.to_timedelta(rng.integers(0, 400, adet), unit='D')
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat'], adet),
+        'banka': rng.choice(['Akbank', 'Halkbank', 'Ziraat'], adet),
+        'tutar': rng.integers(1_000, 1_000_000, adet),
+        'faiz_orani': rng.uniform(1, 45, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(30, 800, adet), unit='D')
+    }), KUR, BUGUN)
+
+
+def test_ozetler_satir_bazli_hesapla_ayni():
+    df = _mevduatlar(300)
+    analiz = portfoy_analizi_hesapla(df, KUR, BUGUN)
+
+    aktif = df[df['vade_bitis'] >= pd.Timestamp(BUGUN)].copy()
+    usd = aktif['mevduat_tipi'] == 'USD Mevduat'
+    aktif['tutar_tl'] = aktif['tutar'].where(~usd, aktif['tutar'] * KUR)
+    aktif['net_faiz_tl'] = aktif['net_faiz'].where(~usd, aktif['net_faiz_usd'] * KUR)
+
+    assert analiz.metrikler['adet'] == len(aktif)
+    assert analiz.metrikler['toplam_anapara_tl'] == pytest.approx(aktif['tutar_tl'].sum())
+    assert analiz.metrikler['toplam_net_faiz_tl'] == pytest.approx(aktif['net_faiz_tl'].sum())
+
+    banka = aktif.groupby('banka')['tutar_tl'].sum()
+    assert analiz.banka_ozet['Toplam Anapara (TL)'].to_dict() == pytest.approx(banka.round(2).to_dict())
+    assert analiz.banka_ozet['Adet'].sum() == len(aktif)
+    assert analiz.doviz_ozet['Portföy Payı (%)'].sum() == pytest.approx(100, abs=0.02)
+
+    assert analiz.vade_ozet['vade_grubu'].tolist() == VADE_GRUPLARI
+    grup = pd.cut(aktif['kalan_gun'], [-np.inf, 30, 90, 180, 365, np.inf], labels=VADE_GRUPLARI)
+    beklenen = aktif.groupby(grup, observed=False)['tutar_tl'].sum().reindex(VADE_GRUPLARI)
+    assert analiz.vade_ozet['tutar_tl'].tolist() == pytest.approx(beklenen.tolist())
+
+
+def test_ortalama_vade():
+    df = pd.DataFrame({'tutar': [1000, 3000], 'kalan_gun': [10, 50]})
+
+    assert hesapla_ortalama_vade(df) == 40
+    assert hesapla_ortalama_vade(df.iloc[:0]) == 0
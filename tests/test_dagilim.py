@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from dagilim import dagilim_optimize_et
+
+KUR = 34.5
+
+
+def _urunler():
+    return pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'TL Mevduat', 'TL Mevduat', 'USD Mevduat'],
+        'banka': ['Akbank', 'Akbank', 'Halkbank', 'Halkbank'],
+        'vade': [32, 366, 92, 366],
+        'faiz_orani': [40.0, 45.0, 42.0, 3.0]
+    })
+
+
+def test_kisitsiz_en_yuksek_getiri_secilir():
+    sonuc = dagilim_optimize_et(_urunler(), 1_000_000, KUR)
+
+    assert sonuc.dagilim['tutar'].sum() == 1_000_000
+    assert sonuc.dagilim[['banka', 'vade']].values.tolist() == [['Akbank', 366]]
+
+
+def test_kisitlar_saglanir():
+    sonuc = dagilim_optimize_et(
+        _urunler(), 1_000_000, KUR,
+        banka_limitleri={'Akbank': 600_000},
+        doviz_payi=(0.1, 0.2),
+        likidite_hedefleri={100: 0.3},
+        urun_limiti=500_000
+    )
+    dagilim = sonuc.dagilim
+
+    assert dagilim['tutar'].sum() == 1_000_000
+    assert dagilim.loc[dagilim['banka'] == 'Akbank', 'tutar'].sum() <= 600_000
+    assert 0.1 - 1e-6 <= sonuc.ozet['doviz_payi'] <= 0.2 + 1e-6
+    assert dagilim.loc[dagilim['vade'] <= 100, 'tutar'].sum() >= 300_000
+    assert dagilim['tutar'].max() <= 500_000 + 1
+    assert sonuc.ozet['net_faiz_tl'] == dagilim['net_faiz_tl'].sum()
+
+
+def test_saglanamayan_kisitlar():
+    with pytest.raises(ValueError):
+        dagilim_optimize_et(_urunler(), 1_000_000, KUR, urun_limiti=100_000)
+    with pytest.raises(ValueError):
+        dagilim_optimize_et(_urunler().assign(faiz_orani=None), 1_000_000, KUR)
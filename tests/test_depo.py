@@ -0,0 +1,187 @@
+from datetime import date, datetime, timedelta
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import depo as depo_modulu
+from depo import ArtimliOkuyucu, MevduatDeposu
+from hesaplama import hesapla, hesapla_toplu
+
+
+def _mevduatlar(adet, tohum):
+    rng = np.random.default_rng(tohum)
+    baslangic = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 60, adet), unit='D')
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat'], adet),
+        'banka': rng.choice(['Akbank', 'Halkbank'], adet),
+        'tutar': rng.integers(1_000, 100_000, adet),
+        'faiz_orani': rng.uniform(1, 45, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(30, 400, adet), unit='D')
+    }), 34.0, date(2026, 3, 1))
+
+
+def _ayni(df, beklenen):
+    pd.testing.assert_frame_equal(df, beklenen, check_dtype=False, check_index_type=False)
+
+
+@pytest.fixture
+def depo(tmp_path, monkeypatch):
+    # Sık anlık görüntü alınması, geri oynatmanın görüntü ve olay kuyruğu birleşimini sınar
+    monkeypatch.setattr(depo_modulu, 'ANLIK_GORUNTU_ARALIGI', 7)
+    monkeypatch.setattr(depo_modulu, 'ANLIK_GORUNTU_SAKLAMA', 2)
+    return MevduatDeposu(str(tmp_path / 'mevduat.db'))
+
+
+def test_eklenen_kayitlar_aynen_okunur(depo):
+    kayitlar = _mevduatlar(20, 0)
+
+    assert depo.ekle(kayitlar) == 20
+    df = depo.oku()
+    _ayni(df[kayitlar.columns].reset_index(drop=True), kayitlar)
+    assert depo.adet() == 20
+    assert depo.adet('USD Mevduat') == (kayitlar['mevduat_tipi'] == 'USD Mevduat').sum()
+
+
+def test_filtreler(depo):
+    depo.ekle(_mevduatlar(30, 1))
+    tum = depo.oku()
+
+    _ayni(depo.oku(banka='Akbank'), tum[tum['banka'] == 'Akbank'])
+    _ayni(depo.oku(mevduat_tipi='TL Mevduat'), tum[tum['mevduat_tipi'] == 'TL Mevduat'])
+    sinir = date(2026, 6, 1)
+    _ayni(depo.oku(vade_bitis_min=sinir), tum[tum['vade_bitis'] >= pd.Timestamp(sinir)])
+    _ayni(depo.oku(vade_bitis_max=sinir), tum[tum['vade_bitis'] <= pd.Timestamp(sinir)])
+
+
+def test_artimli_okuyucu_degisiklikleri_izler(depo):
+    okuyucu = ArtimliOkuyucu(depo)
+    depo.ekle(_mevduatlar(10, 0))
+    _ayni(okuyucu.oku(banka='Akbank'), depo.oku(banka='Akbank'))
+
+    depo.ekle(_mevduatlar(5, 1))
+    _ayni(okuyucu.oku(banka='Akbank'), depo.oku(banka='Akbank'))
+
+    idler = depo.oku().index
+    depo.alanlari_guncelle(pd.DataFrame({'banka': 'Akbank'}, index=idler[:4]))
+    _ayni(okuyucu.oku(banka='Akbank'), depo.oku(banka='Akbank'))
+
+    depo.sil(idler[4:8])
+    _ayni(okuyucu.oku(banka='Akbank'), depo.oku(banka='Akbank'))
+    # Değişiklik yoksa önbellekteki çerçeve döner
+    assert okuyucu.oku(banka='Akbank') is okuyucu.oku(banka='Akbank')
+
+
+def test_sayfalama_ve_siralama(depo):
+    depo.ekle(_mevduatlar(25, 3))
+    tum = depo.oku()
+    bankalar = ['Akbank']
+    filtreli = tum[tum['banka'].isin(bankalar)]
+    sirali = filtreli.loc[sorted(filtreli.index, key=lambda i: (-filtreli.at[i, 'tutar'], -i))]
+
+    sayfalar = [depo.sayfa(banka=bankalar, siralama='tutar', azalan=True, sayfa_boyutu=4, sayfa_no=no)
+                for no in range(-(-len(filtreli) // 4))]
+
+    _ayni(pd.concat(sayfalar), sirali)
+    assert depo.adet(banka=bankalar) == len(filtreli)
+    assert depo.adet(banka=[]) == 0
+    with pytest.raises(ValueError, match="Geçersiz sıralama kolonu"):
+        depo.sayfa(siralama='tutar; DROP TABLE mevduatlar')
+
+
+def test_tek_kayit_getirilir_ve_guncellenir(depo):
+    depo.ekle(_mevduatlar(5, 4))
+    okuyucu = ArtimliOkuyucu(depo)
+    okuyucu.oku()
+    kayit_id = int(depo.oku().index[2])
+
+    kayit = depo.getir(kayit_id)
+    assert kayit['vade_baslangic'] == depo.oku().at[kayit_id, 'vade_baslangic'].date()
+    assert depo.getir(10_000) is None
+
+    kayit = hesapla({**kayit, 'tutar': 77_777.0}, 34.0, date(2026, 3, 1))
+    assert depo.guncelle(kayit_id, kayit)
+    assert not depo.guncelle(10_000, kayit)
+
+    df = okuyucu.oku()
+    assert df.at[kayit_id, 'tutar'] == 77_777.0
+    assert df.at[kayit_id, 'net_faiz'] == kayit['net_faiz']
+    _ayni(df, depo.oku())
+
+
+def test_tarihteki_durum_gecmis_halleri_kurar(depo):
+    anlar = []
+
+    def an_kaydet():
+        time.sleep(0.002)
+        anlar.append((datetime.now(), depo.oku()))
+        time.sleep(0.002)
+
+    an_kaydet()
+    for adim in range(6):
+        depo.ekle(_mevduatlar(4, adim))
+        an_kaydet()
+
+        idler = depo.oku().index
+        kayit = depo.getir(idler[adim])
+        depo.guncelle(idler[adim], {**kayit, 'tutar': kayit['tutar'] + 1, 'banka': f'Banka {adim}'})
+        depo.sil([idler[-1]])
+        an_kaydet()
+
+    assert len(depo.olaylari_oku()) > 7 * 3
+    for zaman, beklenen in anlar:
+        _ayni(depo.tarihteki_durum(zaman), beklenen)
+
+    # Tarih verilirse o günün sonundaki durum
+    _ayni(depo.tarihteki_durum(date.today()), depo.oku())
+    _ayni(depo.tarihteki_durum(anlar[3][0], kolonlar=['tutar', 'banka']), anlar[3][1][['tutar', 'banka']])
+
+    # Türetilmiş alan yenilemeleri işaret olayıdır; kalan gün son yazma olayındaki haliyle kalır
+    depo.kalan_gunleri_guncelle(date(2026, 6, 1))
+    _ayni(depo.tarihteki_durum(datetime.now()), anlar[-1][1])
+
+
+def test_kalan_gun_degismezse_surum_ve_olay_yazilmaz(depo):
+    depo.ekle(_mevduatlar(10, 2))
+
+    assert depo.kalan_gunleri_guncelle(date(2026, 6, 1)) == 10
+    durum, olay_sayisi = depo.durum(), len(depo.olaylari_oku())
+
+    assert depo.kalan_gunleri_guncelle(date(2026, 6, 1)) == 0
+    assert depo.durum() == durum
+    assert len(depo.olaylari_oku()) == olay_sayisi
+
+
+def test_olay_kaydindan_onceki_tarih(depo):
+    with pytest.raises(ValueError):
+        depo.tarihteki_durum(date.today() - timedelta(days=1))
+
+
+def test_artimli_okuyucu_sinirli_ve_guncel(depo):
+    okuyucu = ArtimliOkuyucu(depo, kapasite=2)
+    depo.ekle(_mevduatlar(10, 0))
+
+    for banka in ['Akbank', 'Halkbank', 'Akbank', 'Ziraat']:
+        _ayni(okuyucu.oku(banka=banka), depo.oku(banka=banka))
+    # En son kullanılan iki filtre saklanır
+    assert [dict(anahtar)['banka'] for anahtar in okuyucu._onbellek] == ['Akbank', 'Ziraat']
+
+    depo.ekle(_mevduatlar(5, 1))
+    _ayni(okuyucu.oku(banka='Akbank'), depo.oku(banka='Akbank'))
+
+
+def test_defterler_ayri_depolardir(tmp_path, monkeypatch):
+    monkeypatch.setattr(depo_modulu, 'DEFTER_KLASORU', str(tmp_path))
+    monkeypatch.setattr(depo_modulu, '_depolar', depo_modulu.OrderedDict())
+    birinci = depo_modulu.varsayilan_depo('birinci')
+    birinci.ekle(_mevduatlar(3, 0))
+
+    assert depo_modulu.varsayilan_depo('birinci') is birinci
+    assert depo_modulu.varsayilan_depo('ikinci').adet() == 0
+    assert depo_modulu.varsayilan_okuyucu('birinci').depo is birinci
+    # Aynı sürümdeki boş defterlerin durumları da önbellek anahtarı olarak ayrışır
+    assert depo_modulu.varsayilan_depo('ucuncu').durum() != depo_modulu.varsayilan_depo('ikinci').durum()
+    with pytest.raises(ValueError):
+        depo_modulu.varsayilan_depo('../mevduat')
@@ -0,0 +1,122 @@
+from datetime import date
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analiz import portfoy_analizi_hesapla
+from constants import MEVDUAT_KOLONLARI
+from depo import MevduatDeposu
+from disa_aktar import _ozet_verisi, arrow_olustur, excel_olustur, excel_olustur_arka_planda
+from hesaplama import hesapla_toplu
+from ice_aktar import arrow_ice_aktar, arrow_oku
+
+pytest.importorskip('pyarrow')
+
+BUGUN = date(2026, 3, 1)
+KURLAR = {'EUR': 37.0, 'XAU': 2950.0}
+
+
+@pytest.fixture
+def depo(tmp_path):
+    rng = np.random.default_rng(7)
+    adet = 200
+    baslangic = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 60, adet), unit='D')
+    depo = MevduatDeposu(str(tmp_path / 'kaynak.db'))
+    depo.ekle(hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat', 'EUR Mevduat', 'Altın Mevduat'], adet),
+        'banka': rng.choice(['Akbank', 'Halkbank', 'Ziraat'], adet),
+        'tutar': rng.uniform(100, 1_000_000, adet).round(2),
+        'faiz_orani': rng.uniform(0, 50, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(1, 800, adet), unit='D')
+    }), 34.5, BUGUN, KURLAR))
+    return depo
+
+
+def _ayni(df, beklenen):
+    pd.testing.assert_frame_equal(df, beklenen, check_dtype=False, check_categorical=False,
+                                  check_index_type=False, check_column_type=False)
+
+
+def _sayfalar(icerik):
+    return pd.read_excel(io.BytesIO(icerik), sheet_name=None)
+
+
+def test_mevduat_sayfalari_depoyla_ayni(depo):
+    sayfalar = _sayfalar(excel_olustur(depo, 34.5, BUGUN, KURLAR))
+    tipler = ['TL Mevduat', 'USD Mevduat', 'EUR Mevduat', 'Altın Mevduat']
+
+    assert list(sayfalar) == ['Portföy Özeti'] + [f'{tip}lar' for tip in tipler]
+    for tip in tipler:
+        kolonlar = MEVDUAT_KOLONLARI[tip]
+        beklenen = depo.oku(mevduat_tipi=tip)[kolonlar].reset_index(drop=True)
+        pd.testing.assert_frame_equal(sayfalar[f'{tip}lar'], beklenen, check_dtype=False)
+
+
+def test_ozet_sayfasi(depo):
+    ozet = _sayfalar(excel_olustur(depo, 34.5, BUGUN, KURLAR))['Portföy Özeti']
+    degerler = dict(zip(ozet.iloc[:, 0], ozet.iloc[:, 1]))
+    df = depo.oku()
+    aktif = df[df['vade_bitis'] >= pd.Timestamp(BUGUN)]
+
+    assert degerler['Toplam Mevduat Adedi'] == len(df)
+    assert degerler['Aktif Mevduat Adedi'] == len(aktif)
+    assert degerler['Toplam TL Anapara'] == aktif.loc[aktif['mevduat_tipi'] == 'TL Mevduat', 'tutar'].sum()
+    assert degerler['Güncel USD/TL Kuru'] == 34.5
+
+
+def test_bos_tipler_icin_sayfa_acilmaz(tmp_path):
+    bos = MevduatDeposu(str(tmp_path / 'bos.db'))
+
+    assert list(_sayfalar(excel_olustur_arka_planda(bos, 34.5, BUGUN).result(10))) == ['Portföy Özeti']
+
+
+@pytest.mark.parametrize('kurlar', [{'EUR': 37.0, 'XAU': 2950.0}, {'EUR': 37.0}])
+def test_ozet_ortalama_vadesi_arayuzle_ayni(depo, kurlar):
+    ozet = dict(_ozet_verisi(depo.ozet(BUGUN), 34.5, kurlar))
+    analiz = portfoy_analizi_hesapla(depo.oku(), 34.5, BUGUN, kurlar=kurlar)
+
+    assert ozet['Ortalama Vade (Gün)'] == analiz.metrikler['ortalama_vade']
+
+
+@pytest.mark.parametrize('bicim', ['parquet', 'arrow'])
+def test_gidis_donus_tum_alanlari_korur(depo, tmp_path, bicim):
+    veri = arrow_olustur(depo, bicim)
+    df = arrow_oku(io.BytesIO(veri))
+
+    _ayni(df.astype({'mevduat_tipi': object, 'banka': object}), depo.oku())
+    assert isinstance(df['banka'].dtype, pd.CategoricalDtype)
+    assert df['vade_bitis'].dtype.kind == 'M'
+    assert df['kalan_gun'].dtype == np.int32
+
+    # Dosya yolundan okuma ve tek tipin kolonlarıyla okuma
+    yol = tmp_path / f'portfoy.{bicim}'
+    yol.write_bytes(veri)
+    for tip, kolonlar in MEVDUAT_KOLONLARI.items():
+        tek = arrow_oku(yol, tip)
+        beklenen = depo.oku(mevduat_tipi=tip, kolonlar=kolonlar)
+        assert list(tek.columns) == kolonlar
+        _ayni(tek.astype({'mevduat_tipi': object, 'banka': object}), beklenen)
+
+
+def test_ice_aktarim_hesaplanmis_alanlari_korur(depo, tmp_path):
+    hedef = MevduatDeposu(str(tmp_path / 'hedef.db'))
+    sonuc = arrow_ice_aktar(io.BytesIO(arrow_olustur(depo)), hedef, bugun=BUGUN)
+
+    assert sonuc.eklenen == depo.adet()
+    _ayni(hedef.oku().reset_index(drop=True), depo.oku().reset_index(drop=True))
+
+
+def test_gecersiz_dosyalar():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with pytest.raises(ValueError, match='Parquet veya Arrow'):
+        arrow_oku(io.BytesIO(b'mevduat_tipi,banka\n'))
+
+    cikti = pa.BufferOutputStream()
+    pq.write_table(pa.table({'id': [1], 'mevduat_tipi': ['TL Mevduat']}), cikti)
+    with pytest.raises(ValueError, match='Eksik kolonlar'):
+        arrow_oku(io.BytesIO(cikti.getvalue().to_pybytes()))
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from grafik_onbellegi import GrafikOnbellegi, grafik_anahtari
+
+
+def _ozet(tutarlar):
+    return pd.DataFrame({'tutar': tutarlar}, index=pd.Index(['TL', 'USD'], name='doviz'))
+
+
+def test_anahtar_icerik_ve_parametrelere_baglidir():
+    anahtar = grafik_anahtari('pasta', _ozet([1.0, 2.0]), baslik='Döviz')
+
+    assert grafik_anahtari('pasta', _ozet([1.0, 2.0]), baslik='Döviz') == anahtar
+    assert grafik_anahtari('pasta', _ozet([1.0, 3.0]), baslik='Döviz') != anahtar
+    assert grafik_anahtari('pasta', _ozet([1.0, 2.0]).rename(columns={'tutar': 'tl'}), baslik='Döviz') != anahtar
+    assert grafik_anahtari('pasta', _ozet([1.0, 2.0]), baslik='Banka') != anahtar
+    assert grafik_anahtari('cubuk', _ozet([1.0, 2.0]), baslik='Döviz') != anahtar
+
+
+def test_lru_tahliyesi_ve_sayaclar():
+    onbellek = GrafikOnbellegi(kapasite=2)
+    olusturulan = []
+
+    def getir(anahtar):
+        return onbellek.getir(anahtar, lambda: olusturulan.append(anahtar) or anahtar.upper())
+
+    assert getir('a') == 'A'
+    getir('b')
+    getir('a')
+    # Kapasite dolunca en uzun süredir kullanılmayan 'b' çıkarılır
+    getir('c')
+    getir('a')
+    getir('b')
+
+    assert olusturulan == ['a', 'b', 'c', 'b']
+    assert onbellek.durum() == (2, 4, 2, 2)
+    onbellek.temizle()
+    assert onbellek.durum() == (0, 0, 0, 2)
@@ -0,0 +1,171 @@
+from datetime import date, timedelta
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hesaplama import (
+    _yuvarla, doviz_kuru, eksik_kurlar, hesapla, hesapla_stopaj_orani_toplu, hesapla_toplu, stopaj_tablosu_olustur
+)
+
+GUNCEL_KUR = 34.5678
+KURLAR = {'EUR': 37.1234, 'GBP': 43.9876, 'XAU': 2950.55}
+BUGUN = date(2026, 3, 15)
+
+
+def _rastgele_mevduatlar(adet, tohum=0):
+    rng = np.random.default_rng(tohum)
+    tipler = rng.choice(['TL Mevduat', 'USD Mevduat', 'EUR Mevduat', 'GBP Mevduat', 'Altın Mevduat'], adet)
+    # Stopaj bant sınırlarının iki yanı ve rastgele vadeler
+    vadeler = np.where(rng.random(adet) < 0.5, rng.choice([1, 32, 180, 181, 365, 366, 730], adet),
+                       rng.integers(1, 800, adet))
+    # Tam, yarım ve kesirli tutarlar
+    tutarlar = np.round(rng.uniform(100, 5_000_000, adet), 2)
+    tutarlar[::3] = np.floor(tutarlar[::3]) + 0.5
+    faizler = np.round(rng.uniform(0, 60, adet), 3)
+    faizler[::4] = np.floor(faizler[::4] * 100) / 100 + 0.005
+    baslangiclar = [date(2025, 1, 1) + timedelta(days=int(g)) for g in rng.integers(0, 500, adet)]
+
+    return pd.DataFrame({
+        'mevduat_tipi': tipler,
+        'banka': 'Akbank',
+        'tutar': tutarlar,
+        'faiz_orani': faizler,
+        'vade_baslangic': baslangiclar,
+        'vade_bitis': [b + timedelta(days=int(v)) for b, v in zip(baslangiclar, vadeler)]
+    })
+
+
+def _esit(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return a == b
+
+
+@pytest.mark.parametrize('basamak', [0, 2, 4])
+def test_yuvarla_round_ile_ayni(basamak):
+    rng = np.random.default_rng(1)
+    degerler = np.concatenate([
+        rng.uniform(-1e6, 1e6, 5000),
+        # Yarım sınırlar: 0.5, 2.5, 0.125, 1.005, 2.675 ...
+        (np.arange(-500, 500) + 0.5) / 10 ** basamak,
+        [0.125, 0.375, 1.005, 2.675, 1.0005, 0.285, 10.0049999, 1e-9]
+    ])
+
+    beklenen = [round(float(d), basamak) for d in degerler]
+    assert _yuvarla(degerler, basamak).tolist() == beklenen
+
+
+def test_toplu_hesaplama_tekil_ile_ayni():
+    df = _rastgele_mevduatlar(500)
+    toplu = hesapla_toplu(df, GUNCEL_KUR, BUGUN, KURLAR)
+
+    for konum, satir in enumerate(df.to_dict('records')):
+        tekil = hesapla(satir, GUNCEL_KUR, BUGUN, KURLAR)
+        for alan, deger in tekil.items():
+            if alan in ('vade_baslangic', 'vade_bitis'):
+                continue
+            toplu_deger = toplu[alan].iloc[konum]
+            toplu_deger = toplu_deger.item() if hasattr(toplu_deger, 'item') else toplu_deger
+            assert _esit(deger, toplu_deger), (konum, alan, deger, toplu_deger)
+
+
+@pytest.mark.parametrize('tip, guncel_kur, kurlar', [
+    ('TL Mevduat', 0.0, KURLAR),
+    ('USD Mevduat', 0.0, KURLAR),
+    ('USD Mevduat', None, KURLAR),
+    ('EUR Mevduat', GUNCEL_KUR, {**KURLAR, 'EUR': 0.0}),
+    ('GBP Mevduat', GUNCEL_KUR, {}),
+    ('Altın Mevduat', GUNCEL_KUR, {**KURLAR, 'XAU': -1.0}),
+])
+def test_kur_yoksa_hesaplanmaz(tip, guncel_kur, kurlar):
+    df = _rastgele_mevduatlar(20).assign(mevduat_tipi=tip)
+
+    with pytest.raises(ValueError, match='Kur bilgisi yok'):
+        hesapla(df.iloc[0].to_dict(), guncel_kur, BUGUN, kurlar)
+    with pytest.raises(ValueError, match='Kur bilgisi yok'):
+        hesapla_toplu(df, guncel_kur, BUGUN, kurlar)
+    assert eksik_kurlar(df['mevduat_tipi'], guncel_kur, kurlar).all()
+    if tip != 'TL Mevduat':
+        with pytest.raises(ValueError, match='Kur bilgisi yok'):
+            doviz_kuru(tip, guncel_kur, kurlar)
+
+
+def test_yalnizca_kuru_eksik_mevduatlar_isaretlenir():
+    tipler = ['TL Mevduat', 'USD Mevduat', 'EUR Mevduat', 'GBP Mevduat']
+
+    assert eksik_kurlar(tipler, GUNCEL_KUR, {'EUR': 37.0}).tolist() == [False, False, False, True]
+    assert eksik_kurlar(tipler, 0.0, {'EUR': 37.0}).tolist() == [True, True, False, True]
+    assert doviz_kuru('TL Mevduat', 0.0) == 1.0
+
+
+def _bantlar(alti_ay, bir_yil, uzun):
+    return {'6_ay': alti_ay, '1_yil': bir_yil, 'uzun': uzun}
+
+
+KURALLAR = {
+    'TRY': [
+        (date(2025, 1, 1), _bantlar(15.0, 12.0, 10.0)),
+        (date(2025, 7, 1), _bantlar(17.5, 15.0, 10.0)),
+        (date(2026, 1, 1), _bantlar(10.0, 7.5, 5.0))
+    ],
+    'USD': [
+        (date.min, _bantlar(25.0, 25.0, 25.0)),
+        (date(2025, 7, 1), _bantlar(20.0, 18.0, 15.0))
+    ]
+}
+
+
+@pytest.mark.parametrize('tip, baslangic, vade, oran', [
+    ('TL Mevduat', date(2025, 6, 30), 100, 15.0),
+    # Kural yürürlük gününde açılan mevduatlara uygulanır
+    ('TL Mevduat', date(2025, 7, 1), 100, 17.5),
+    ('TL Mevduat', date(2025, 12, 31), 200, 15.0),
+    ('TL Mevduat', date(2026, 3, 1), 180, 10.0),
+    ('TL Mevduat', date(2026, 3, 1), 181, 7.5),
+    ('TL Mevduat', date(2026, 3, 1), 365, 7.5),
+    ('TL Mevduat', date(2026, 3, 1), 366, 5.0),
+    ('USD Mevduat', date(2000, 1, 1), 400, 25.0),
+    ('USD Mevduat', date(2025, 7, 1), 400, 15.0),
+])
+def test_stopaj_yururluk_tarihine_gore(tip, baslangic, vade, oran):
+    tablo = stopaj_tablosu_olustur(KURALLAR)
+
+    assert hesapla_stopaj_orani_toplu([vade], [tip], [baslangic], tablo=tablo).tolist() == [oran]
+
+
+def test_stopaj_toplu_arama_tekil_ile_ayni():
+    tablo = stopaj_tablosu_olustur(KURALLAR)
+    rng = np.random.default_rng(2)
+    baslangic = [date(2025, 1, 1) + timedelta(days=int(g)) for g in rng.integers(0, 700, 300)]
+    vade = rng.integers(1, 800, 300)
+    tip = rng.choice(['TL Mevduat', 'USD Mevduat'], 300)
+
+    toplu = hesapla_stopaj_orani_toplu(vade, tip, baslangic, tablo=tablo)
+    for oran, v, t, b in zip(toplu, vade, tip, baslangic):
+        para = 'TRY' if t == 'TL Mevduat' else 'USD'
+        kural = max((k for k in KURALLAR[para] if k[0] <= b), key=lambda k: k[0])[1]
+        bant = '6_ay' if v <= 180 else '1_yil' if v <= 365 else 'uzun'
+        assert oran == kural[bant]
+
+
+# Kuralı olmayan para birimi pandas uyarısı değil KeyError üretmeli
+@pytest.mark.filterwarnings('error')
+def test_stopaj_kurali_olmayan_tarih_ve_tip():
+    tablo = stopaj_tablosu_olustur(KURALLAR)
+
+    with pytest.raises(ValueError, match='2024-12-31'):
+        hesapla_stopaj_orani_toplu([100], ['TL Mevduat'], [date(2024, 12, 31)], tablo=tablo)
+    with pytest.raises(KeyError):
+        hesapla_stopaj_orani_toplu([100], ['EUR Mevduat'], [date(2026, 1, 1)], tablo=tablo)
+
+
+def test_stopaj_tablosu_dogrulama_ve_ozet():
+    cift = {'TRY': KURALLAR['TRY'] + [(date(2026, 1, 1), _bantlar(1.0, 1.0, 1.0))]}
+    with pytest.raises(ValueError):
+        stopaj_tablosu_olustur(cift)
+
+    degisik = {**KURALLAR, 'USD': KURALLAR['USD'][:1]}
+    assert stopaj_tablosu_olustur(KURALLAR).ozet == stopaj_tablosu_olustur(dict(KURALLAR)).ozet
+    assert stopaj_tablosu_olustur(KURALLAR).ozet != stopaj_tablosu_olustur(degisik).ozet
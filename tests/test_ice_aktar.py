@@ -0,0 +1,135 @@
+from datetime import date
+import io
+
+import pandas as pd
+import pytest
+
+from depo import MevduatDeposu
+from ice_aktar import hesaplanmis_parcalar, toplu_ice_aktar
+
+BASLIK = "mevduat_tipi,banka,tutar,faiz_orani,vade_baslangic,vade_bitis\n"
+
+
+@pytest.fixture
+def depo(tmp_path):
+    return MevduatDeposu(str(tmp_path / 'mevduat.db'))
+
+
+def _aktar(depo, metin, **kwargs):
+    return toplu_ice_aktar(io.BytesIO(metin.encode()), 'dosya.csv', depo, 35.0, **kwargs)
+
+
+def _hesapla(metin):
+    hatalar = []
+    parcalar = list(hesaplanmis_parcalar(io.BytesIO(metin.encode()), 'dosya.csv', 35.0, hatalar,
+                                         bugun=date(2026, 1, 1)))
+    df = pd.concat(parcalar) if parcalar else pd.DataFrame()
+    return df, hatalar
+
+
+def test_gecerli_satirlar_eklenir_hatalilar_raporlanir(depo):
+    sonuc = _aktar(depo, BASLIK + (
+        "TL Mevduat,Akbank,1000,40,01.06.2026,01.07.2026\n"
+        "USD Mevduat,Halkbank,500,3,01.06.2026,31.12.2026\n"
+        "TL Mevduat,,1000,40,01.06.2026,01.07.2026\n"
+        "Hisse,Akbank,-5,40,01.06.2026,01.05.2026\n"
+    ))
+
+    assert sonuc.eklenen == 2
+    assert [h['satir'] for h in sonuc.hatalar] == [4, 5]
+    assert sonuc.hatalar[0]['hata'] == "Banka boş"
+    assert sonuc.hatalar[1]['hata'].split("; ") == [
+        "Geçersiz mevduat tipi", "Geçersiz tutar", "Vade bitiş tarihi, başlangıç tarihinden sonra olmalıdır"
+    ]
+    df = depo.oku()
+    assert df['banka'].tolist() == ['Akbank', 'Halkbank']
+    assert df['orijinal_vade'].tolist() == [30, 213]
+
+
+@pytest.mark.parametrize('guncel_kur, kurlar, beklenen', [
+    (35.0, {}, [3]),
+    (0.0, {'EUR': 38.0}, [2, 4]),
+])
+def test_kuru_olmayan_satirlar_raporlanir(depo, guncel_kur, kurlar, beklenen):
+    sonuc = toplu_ice_aktar(io.BytesIO((BASLIK + (
+        "TL Mevduat,Akbank,1000,40,01.06.2026,01.07.2026\n"
+        "EUR Mevduat,Akbank,500,2,01.06.2026,01.07.2026\n"
+        "USD Mevduat,Halkbank,500,3,01.06.2026,31.12.2026\n"
+    )).encode()), 'dosya.csv', depo, guncel_kur, kurlar=kurlar)
+
+    assert sonuc.hatalar == [{'satir': satir, 'hata': "Kur bilgisi yok"} for satir in beklenen]
+    assert sonuc.eklenen == 3 - len(beklenen)
+    assert depo.adet() == sonuc.eklenen
+
+
+def test_eksik_ve_tanimsiz_kolonlar(depo):
+    with pytest.raises(ValueError, match='faiz_orani'):
+        _aktar(depo, "mevduat_tipi,banka,tutar,vade_baslangic,vade_bitis\n")
+    with pytest.raises(ValueError, match='sube'):
+        _aktar(depo, BASLIK.strip() + ",sube\n")
+    assert depo.adet() == 0
+
+
+@pytest.mark.parametrize('bicim', ['csv', 'xlsx'])
+def test_parca_parca_aktarim(depo, bicim):
+    df = pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'USD Mevduat'] * 6,
+        'banka': 'Akbank',
+        'tutar': range(1000, 13000, 1000),
+        'faiz_orani': 40,
+        'vade_baslangic': '01.06.2026',
+        'vade_bitis': '01.07.2026'
+    })
+    df.loc[7, 'tutar'] = 0
+    dosya = io.BytesIO()
+    if bicim == 'csv':
+        df.to_csv(dosya, index=False)
+    else:
+        df.to_excel(dosya, index=False)
+    dosya.seek(0)
+
+    ilerleme = []
+    sonuc = toplu_ice_aktar(dosya, f'dosya.{bicim}', depo, 35.0, parca_boyutu=5,
+                            ilerleme=lambda oran, okunan: ilerleme.append((oran, okunan)))
+
+    assert sonuc.eklenen == 11
+    assert sonuc.hatalar == [{'satir': 9, 'hata': "Geçersiz tutar"}]
+    assert [okunan for _, okunan in ilerleme] == [5, 10, 12]
+    assert ilerleme[-1][0] == 1.0
+    assert depo.oku()['tutar'].sum() == sum(range(1000, 13000, 1000)) - 8000
+
+
+@pytest.mark.parametrize('baslangic, bitis', [
+    ('2026-06-01', '2026-07-01'),
+    ('01.06.2026', '01.07.2026'),
+    ('2026-06-01', '01.07.2026'),
+])
+def test_tarih_bicimleri(baslangic, bitis):
+    df, hatalar = _hesapla(BASLIK + f"TL Mevduat,Akbank,1000,40,{baslangic},{bitis}\n")
+
+    assert hatalar == []
+    assert df['vade_baslangic'].iloc[0] == pd.Timestamp('2026-06-01')
+    assert df['vade_bitis'].iloc[0] == pd.Timestamp('2026-07-01')
+    assert df['orijinal_vade'].iloc[0] == 30
+
+
+def test_ay_gunden_buyuk_iso_tarihler():
+    df, hatalar = _hesapla(BASLIK + (
+        "TL Mevduat,Akbank,1000,40,2026-07-01,2026-07-13\n"
+        "TL Mevduat,Akbank,1000,40,13.07.2026,2026-12-31\n"
+    ))
+
+    assert hatalar == []
+    assert df['orijinal_vade'].tolist() == [12, 171]
+
+
+def test_gecersiz_tarih_reddedilir():
+    df, hatalar = _hesapla(BASLIK + (
+        "TL Mevduat,Akbank,1000,40,2026-07-01,2026-08-01\n"
+        "TL Mevduat,Akbank,1000,40,07/01/2026,2026-08-01\n"
+        "TL Mevduat,Akbank,1000,40,31.02.2026,2026-08-01\n"
+    ))
+
+    assert len(df) == 1
+    assert [h['satir'] for h in hatalar] == [3, 4]
+    assert all('başlangıç tarihi' in h['hata'] for h in hatalar)
@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from constants import DOVIZ_TIPLERI, MEVDUAT_TIPLERI
+from hesaplama import doviz_kuru, hesapla
+from karsilastirma import VADE_SECENEKLERI, en_iyi_hucre, karsilastirma_izgarasi, oran_tablosu_olustur
+
+KUR = 34.5678
+KURLAR = {'EUR': 37.1234, 'GBP': 43.9876, 'XAU': 2950.55}
+BUGUN = date.today()
+
+
+def _oranlar():
+    oranlar = oran_tablosu_olustur(VADE_SECENEKLERI, bankalar=['Akbank', 'Halkbank'])
+    vadeler = [str(vade) for vade in VADE_SECENEKLERI]
+    oranlar[vadeler] = np.random.default_rng(0).uniform(0, 50, (len(oranlar), len(vadeler))).round(3)
+    return oranlar
+
+
+@pytest.mark.parametrize('tutar', [100_000, 123_456.5])
+def test_izgara_tekil_hesapla_ile_ayni(tutar):
+    izgara = karsilastirma_izgarasi(_oranlar(), tutar, KUR, KURLAR)
+
+    assert len(izgara) == 2 * len(MEVDUAT_TIPLERI) * len(VADE_SECENEKLERI)
+    for hucre in izgara.itertuples():
+        doviz = hucre.mevduat_tipi in DOVIZ_TIPLERI
+        tekil = hesapla({
+            'mevduat_tipi': hucre.mevduat_tipi,
+            'banka': hucre.banka,
+            'tutar': round(tutar / doviz_kuru(hucre.mevduat_tipi, KUR, KURLAR)) if doviz else tutar,
+            'faiz_orani': hucre.faiz_orani,
+            'vade_baslangic': BUGUN,
+            'vade_bitis': BUGUN + timedelta(days=hucre.vade)
+        }, KUR, BUGUN, KURLAR)
+        assert hucre.stopaj_orani == tekil['stopaj_orani']
+        assert hucre.net_faiz_tl == tekil['net_faiz']
+
+
+def test_en_iyi_hucre():
+    izgara = karsilastirma_izgarasi(_oranlar(), 100_000, KUR, KURLAR)
+
+    en_iyi = en_iyi_hucre(izgara, 'yillik_net_getiri')
+    assert en_iyi['yillik_net_getiri'] == izgara['yillik_net_getiri'].max()
+
+
+def test_oran_yoksa_en_iyi_hucre_yok():
+    oranlar = _oranlar()
+    oranlar[[str(vade) for vade in VADE_SECENEKLERI]] = np.nan
+    izgara = karsilastirma_izgarasi(oranlar, 100_000, KUR, KURLAR)
+
+    assert en_iyi_hucre(izgara, 'net_faiz_tl') is None
@@ -0,0 +1,208 @@
+from datetime import date, timedelta
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from hesaplama import hesapla_toplu
+from karsilastirma import urunleri_hesapla
+from kur import KurSaglayici
+from tahakkuk import portfoy_degerleme
+from yenileme import yenileme_projeksiyonu
+
+BUGUN = date(2026, 3, 15)
+
+
+def _sayacli_kaynak(degerler):
+    cagrilar = []
+
+    def kaynak():
+        cagrilar.append(time.monotonic())
+        deger = degerler[min(len(cagrilar), len(degerler)) - 1]
+        if isinstance(deger, Exception):
+            raise deger
+        return deger
+
+    return kaynak, cagrilar
+
+
+def _mevduatlar():
+    baslangic = BUGUN - timedelta(days=10)
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'USD Mevduat', 'EUR Mevduat'],
+        'banka': 'Akbank',
+        'tutar': [100_000.0, 5_000.0, 3_000.0],
+        'faiz_orani': [45.0, 3.0, 2.5],
+        'vade_baslangic': [baslangic] * 3,
+        'vade_bitis': [baslangic + timedelta(days=32)] * 3
+    }), 34.5, BUGUN, {'EUR': 37.0})
+
+
+def test_ttl_icinde_kaynak_tekrar_cagrilmaz():
+    kaynak, cagrilar = _sayacli_kaynak([34.5, 35.0])
+    saglayici = KurSaglayici(kaynak=kaynak, ttl=60)
+
+    assert saglayici.getir() == 34.5
+    assert saglayici.getir() == 34.5
+    assert len(cagrilar) == 1
+    assert saglayici.getir(zorla=True) == 35.0
+
+
+def test_hata_durumunda_son_gecerli_kur_doner():
+    kaynak, cagrilar = _sayacli_kaynak([34.5, ConnectionError('bağlantı yok')])
+    saglayici = KurSaglayici(kaynak=kaynak, ttl=0, hata_bekleme=60)
+
+    assert saglayici.getir() == 34.5
+    assert saglayici.getir() == 34.5
+    assert isinstance(saglayici.son_hata, ConnectionError)
+    assert saglayici.bayat_mi()
+    # Hata bekleme süresi dolmadan kaynak tekrar denenmez
+    saglayici.getir()
+    assert len(cagrilar) == 2
+
+
+def test_gecersiz_kur_hata_sayilir():
+    kaynak, _ = _sayacli_kaynak([0.0])
+    saglayici = KurSaglayici(kaynak=kaynak)
+
+    assert saglayici.getir() is None
+    assert isinstance(saglayici.son_hata, ValueError)
+
+
+def test_es_zamanli_istekler_tek_getirme_yapar():
+    serbest = threading.Event()
+    cagrilar = []
+
+    def kaynak():
+        cagrilar.append(1)
+        serbest.wait(1)
+        return 34.5
+
+    saglayici = KurSaglayici(kaynak=kaynak)
+    sonuclar = []
+    isciler = [threading.Thread(target=lambda: sonuclar.append(saglayici.getir())) for _ in range(8)]
+    for isci in isciler:
+        isci.start()
+    time.sleep(0.1)
+    serbest.set()
+    for isci in isciler:
+        isci.join()
+
+    assert sonuclar == [34.5] * 8
+    assert len(cagrilar) == 1
+
+
+def test_guncel_ilk_kuru_bekler_sonra_arka_planda_yeniler():
+    serbest = threading.Event()
+    degerler = iter([34.5, 35.0])
+
+    def kaynak():
+        deger = next(degerler)
+        if deger == 35.0:
+            serbest.wait(5)
+        return deger
+
+    saglayici = KurSaglayici(kaynak=kaynak, ttl=0)
+
+    assert saglayici.bekleniyor_mu()
+    assert saglayici.guncel() == 34.5
+    assert not saglayici.bekleniyor_mu()
+    # TTL dolmuş olsa da eldeki kur beklemeden döner, yenileme arka planda yapılır
+    assert saglayici.guncel() == 34.5
+    assert not saglayici.bayat_mi()
+
+    serbest.set()
+    for _ in range(200):
+        if saglayici.kur == 35.0:
+            break
+        time.sleep(0.01)
+    assert saglayici.kur == 35.0
+
+
+def test_kur_alinamazsa_hata_kalir():
+    def kaynak():
+        raise ConnectionError('bağlantı yok')
+
+    saglayici = KurSaglayici(kaynak=kaynak)
+    assert saglayici.guncel() is None
+    assert not saglayici.bekleniyor_mu()
+    assert isinstance(saglayici.son_hata, ConnectionError)
+
+
+def test_alinamayan_kurlar_onceki_degerini_korur():
+    kaynak, _ = _sayacli_kaynak([{'USD': 34.5, 'EUR': 37.0, 'XAU': 2950.0}, {'USD': 35.0, 'EUR': 0.0}])
+    saglayici = KurSaglayici(kaynak=kaynak, ttl=0)
+
+    saglayici.getir()
+    assert saglayici.getir() == 35.0
+    assert saglayici.kurlar == {'USD': 35.0, 'EUR': 37.0, 'XAU': 2950.0}
+
+
+def test_ilk_kur_beklenirken_hata_sayilmaz():
+    serbest = threading.Event()
+
+    def kaynak():
+        serbest.wait(1)
+        return {'USD': 34.5}
+
+    saglayici = KurSaglayici(kaynak=kaynak)
+    saglayici.baslat(aralik=60)
+    try:
+        assert saglayici.guncel() is None
+        assert saglayici.bekleniyor_mu()
+    finally:
+        serbest.set()
+        saglayici.durdur(1)
+    assert saglayici.guncel() == 34.5
+
+
+def test_zamanlayici_hatalardan_sonra_geri_cekilir():
+    kaynak, cagrilar = _sayacli_kaynak([ConnectionError('bağlantı yok')] * 2 + [{'USD': 34.5}])
+    saglayici = KurSaglayici(kaynak=kaynak, hata_bekleme=0.05)
+
+    assert saglayici.baslat(aralik=60)
+    assert not saglayici.baslat(aralik=60)
+    try:
+        for _ in range(200):
+            if saglayici.kur is not None:
+                break
+            time.sleep(0.01)
+        metrikler = saglayici.metrikler()
+    finally:
+        saglayici.durdur(1)
+
+    assert saglayici.kur == 34.5
+    assert (metrikler.deneme, metrikler.hata, metrikler.ardisik_hata) == (3, 2, 0)
+    # İkinci hatadan sonraki bekleme iki katına çıkar
+    assert cagrilar[1] - cagrilar[0] >= 0.05
+    assert cagrilar[2] - cagrilar[1] >= 0.1
+
+
+def test_zamanlayici_ttl_degistirmez():
+    saglayici = KurSaglayici(kaynak=lambda: {'USD': 34.5}, ttl=600)
+    assert saglayici.baslat(aralik=0.05)
+    saglayici.durdur(1)
+    assert saglayici.ttl == 600
+    assert saglayici.aralik == 0.05
+
+
+def test_sifir_kurda_hesaplayicilar_uyari_vermez():
+    df = _mevduatlar()
+    urunler = pd.DataFrame({'mevduat_tipi': ['TL Mevduat', 'USD Mevduat'], 'banka': 'Akbank',
+                            'vade': [32, 32], 'faiz_orani': [45.0, 3.0]})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        sonuc = urunleri_hesapla(urunler, 100_000, 0.0)
+        degerleme = portfoy_degerleme(df, pd.date_range(BUGUN, periods=3), [34.5, 0.0, 35.0],
+                                      doviz_kurlari={'EUR': 37.0})
+        projeksiyon = yenileme_projeksiyonu(df, BUGUN, 2, 3, 0.0, {'EUR': 37.0})
+
+    # Kuru bilinmeyen USD ürünü ve USD'ye bağlı toplamlar NaN, TL tarafı hesaplanır
+    assert sonuc['net_faiz_tl'].isna().tolist() == [False, True]
+    assert np.isnan(degerleme['toplam_usd'].iloc[1]) and np.isnan(degerleme['toplam_tl'].iloc[1])
+    assert np.isfinite(degerleme['toplam_usd'].iloc[[0, 2]]).all()
+    assert projeksiyon['toplam_usd'].isna().all()
+    assert (projeksiyon['tl_mevduat'] > 0).all()
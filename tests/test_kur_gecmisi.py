@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import kur_gecmisi as kur_gecmisi_modulu
+from kur_gecmisi import KurGecmisi, eksik_araliklar
+
+BAS = date(2025, 1, 1)
+
+
+class SahteKaynak:
+    """BAS'tan itibaren iş günleri için gün sırasından türeyen kapanışlar döndürür, istekleri kaydeder"""
+
+    def __init__(self):
+        self.istekler = []
+
+    def getir(self, sembol, baslangic, bitis):
+        self.istekler.append((baslangic, bitis))
+        gunler = pd.bdate_range(max(baslangic, BAS), bitis)
+        return pd.Series(30 + (gunler - pd.Timestamp(BAS)).days / 100, index=gunler)
+
+
+@pytest.fixture
+def gecmis(tmp_path):
+    return KurGecmisi(SahteKaynak(), yol=str(tmp_path / 'kur.db'))
+
+
+def test_eksik_araliklar():
+    kapsam = [(date(2025, 1, 5), date(2025, 1, 10)), (date(2025, 1, 15), date(2025, 1, 20))]
+
+    assert eksik_araliklar(date(2025, 1, 1), date(2025, 1, 31), kapsam) == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+        (date(2025, 1, 11), date(2025, 1, 14)),
+        (date(2025, 1, 21), date(2025, 1, 31))
+    ]
+    assert eksik_araliklar(date(2025, 1, 6), date(2025, 1, 9), kapsam) == []
+
+
+def test_yalnizca_eksik_araliklar_getirilir(gecmis):
+    gecmis.senkronize(date(2025, 1, 10), date(2025, 1, 20))
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+
+    assert gecmis.kaynak.istekler == [
+        (date(2025, 1, 10), date(2025, 1, 20)),
+        (BAS, date(2025, 1, 9)),
+        (date(2025, 1, 21), date(2025, 1, 31))
+    ]
+
+
+def test_tatiller_onceki_kapanisla_doldurulur(gecmis):
+    kurlar = gecmis.kurlar(BAS, date(2025, 1, 12))
+
+    # 4-5 Ocak ve 11-12 Ocak hafta sonu
+    assert kurlar[pd.Timestamp('2025-01-05')] == kurlar[pd.Timestamp('2025-01-03')] == 30.02
+    assert kurlar[pd.Timestamp('2025-01-12')] == 30.09
+    assert np.isnan(gecmis.kur_asof([np.datetime64('2024-12-31')])[0])
+
+
+def test_basarisiz_aralik_kapsama_yazilmaz(tmp_path):
+    class HataliKaynak(SahteKaynak):
+        def getir(self, sembol, baslangic, bitis):
+            super().getir(sembol, baslangic, bitis)
+            raise ConnectionError('bağlantı yok')
+
+    gecmis = KurGecmisi(HataliKaynak(), yol=str(tmp_path / 'kur.db'))
+
+    assert gecmis.senkronize(BAS, date(2025, 1, 31)) == 0
+    assert gecmis._kapsam() == []
+    assert gecmis.kurlar(BAS, date(2025, 1, 3), senkronize=False).isna().all()
+
+
+def test_basarisiz_aralik_beklemeden_once_denenmez(tmp_path, monkeypatch):
+    class HataliKaynak(SahteKaynak):
+        def getir(self, sembol, baslangic, bitis):
+            super().getir(sembol, baslangic, bitis)
+            raise ConnectionError('bağlantı yok')
+
+    saat = [1000.0]
+    monkeypatch.setattr(kur_gecmisi_modulu.time, 'monotonic', lambda: saat[0])
+    gecmis = KurGecmisi(HataliKaynak(), yol=str(tmp_path / 'kur.db'))
+
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+    assert len(gecmis.kaynak.istekler) == 1
+
+    # Bekleme dolunca yeniden denenir ve bir sonraki bekleme iki katına çıkar
+    saat[0] += kur_gecmisi_modulu.HATA_BEKLEME
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+    saat[0] += kur_gecmisi_modulu.HATA_BEKLEME
+    gecmis.senkronize(BAS, date(2025, 1, 31))
+    assert len(gecmis.kaynak.istekler) == 2
+
+    # Beklemedeki aralık dışındaki günler yine getirilir
+    gecmis.senkronize(BAS, date(2025, 2, 10))
+    assert gecmis.kaynak.istekler[-1] == (date(2025, 2, 1), date(2025, 2, 10))
+
+
+def test_kur_yolu_arka_planda_senkronize_eder(gecmis):
+    serbest = threading.Event()
+    getir = gecmis.kaynak.getir
+    gecmis.kaynak.getir = lambda *args: serbest.wait(5) and getir(*args)
+    tarihler = pd.to_datetime([BAS, date(2025, 1, 2)])
+
+    # Getirme sürerken okuma beklemez, eksik günlerde güncel kur kullanılır
+    assert gecmis.kur_yolu(tarihler, 40.0, arka_planda=True).tolist() == [40.0, 40.0]
+    assert gecmis.senkronize_ediliyor()
+    assert not gecmis.arka_planda_senkronize(BAS, date(2025, 1, 2))
+
+    serbest.set()
+    gecmis._senkron.join(5)
+    assert gecmis.surum == 1
+    assert gecmis.kur_yolu(tarihler, 40.0, arka_planda=True).tolist() == [30.0, 30.01]
+    assert not gecmis.senkronize_ediliyor()
+
+
+def test_bugun_kapsama_alinmaz(gecmis):
+    bugun = date.today()
+    gecmis.senkronize(bugun - timedelta(days=10), bugun)
+
+    assert gecmis._kapsam()[-1][1] == bugun - timedelta(days=1)
+
+
+def test_kur_yolu_gelecek_ve_eksik_gunlerde_guncel_kuru_kullanir(gecmis):
+    bugun = date.today()
+    tarihler = pd.to_datetime([BAS - timedelta(days=1), BAS, bugun, bugun + timedelta(days=30)])
+
+    kurlar = gecmis.kur_yolu(tarihler, 40.0)
+
+    assert kurlar.tolist() == [40.0, 30.0, 40.0, 40.0]
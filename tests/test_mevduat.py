@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import depo as depo_modulu
+from hesaplama import hesapla_toplu
+from kur import KurSaglayici
+import mevduat
+from mevduat import girdi_hatasi
+
+BUGUN = date.today()
+
+
+def _giris_formu():
+    import mevduat
+    mevduat.veri_giris_formu()
+
+
+def _duzenleme_formu():
+    import mevduat
+    mevduat.mevduat_duzenle(mevduat.oturum_deposu().oku(), 'test')
+
+
+@pytest.fixture
+def defter(tmp_path, monkeypatch):
+    monkeypatch.setattr(depo_modulu, 'DEFTER_KLASORU', str(tmp_path))
+    monkeypatch.setattr(depo_modulu, '_depolar', depo_modulu.OrderedDict())
+    return depo_modulu.varsayilan_depo('test')
+
+
+def _kur_kaynagi(monkeypatch, kurlar):
+    def kaynak():
+        if kurlar is None:
+            raise ConnectionError('bağlantı yok')
+        return kurlar
+
+    monkeypatch.setattr(mevduat, 'kur_saglayici', KurSaglayici(kaynak=kaynak))
+
+
+def _calistir(betik):
+    uygulama = AppTest.from_function(betik, default_timeout=30)
+    uygulama.query_params['defter'] = 'test'
+    return uygulama.run()
+
+
+def _dugme(uygulama, etiket):
+    return next(dugme for dugme in uygulama.button if dugme.label == etiket)
+
+
+def _kur_alani(uygulama):
+    return next(alan for alan in uygulama.number_input if alan.label == "Başlangıç Kuru")
+
+
+@pytest.mark.parametrize('tutar, bitis, kur, hata', [
+    (1000, BUGUN + timedelta(days=30), None, None),
+    (1000, BUGUN + timedelta(days=30), 34.5, None),
+    (0, BUGUN + timedelta(days=30), 34.5, "Lütfen geçerli bir tutar giriniz!"),
+    (1000, BUGUN, 34.5, "Vade bitiş tarihi, başlangıç tarihinden sonra olmalıdır!"),
+    (1000, BUGUN + timedelta(days=30), 0.0, "Geçersiz başlangıç kuru!"),
+    (1000, BUGUN + timedelta(days=30), -1.0, "Geçersiz başlangıç kuru!"),
+])
+def test_girdi_hatasi(tutar, bitis, kur, hata):
+    assert girdi_hatasi(tutar, BUGUN, bitis, kur) == hata
+
+
+def test_kur_yokken_kayit_yapilamaz(defter, monkeypatch):
+    _kur_kaynagi(monkeypatch, None)
+    uygulama = _calistir(_giris_formu)
+
+    assert _dugme(uygulama, "Kaydet").disabled
+    # Başlangıç kuru 0 ile doldurulmaz
+    assert _kur_alani(uygulama).value is None
+
+
+def test_kur_varken_doviz_mevduati_kaydedilir(defter, monkeypatch):
+    _kur_kaynagi(monkeypatch, {'USD': 34.5})
+    uygulama = _calistir(_giris_formu)
+    uygulama.selectbox[0].set_value('USD Mevduat').run()
+    uygulama.date_input[1].set_value(BUGUN + timedelta(days=30)).run()
+
+    assert not _dugme(uygulama, "Kaydet").disabled
+    assert _kur_alani(uygulama).value == 34.5
+    _dugme(uygulama, "Kaydet").click().run()
+
+    kayit = defter.oku().iloc[0]
+    assert kayit['mevduat_tipi'] == 'USD Mevduat'
+    assert kayit['baslangic_kur'] == 34.5
+
+
+def test_kur_yokken_duzenleme_yapilamaz(defter, monkeypatch):
+    # Kur alınamadığı sırada 0 başlangıç kuruyla kaydedilmiş eski bir kayıt
+    defter.ekle(hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': ['USD Mevduat'],
+        'banka': 'Akbank',
+        'tutar': [1_000],
+        'faiz_orani': [3.0],
+        'vade_baslangic': [BUGUN],
+        'vade_bitis': [BUGUN + timedelta(days=30)],
+        'baslangic_kur': [0.0]
+    }), 34.5, BUGUN))
+    _kur_kaynagi(monkeypatch, None)
+    uygulama = _calistir(_duzenleme_formu)
+
+    assert _dugme(uygulama, "Güncelle").disabled
+    assert _kur_alani(uygulama).value is None
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+
+import olcum
+
+
+def test_ilk_olcum_korunur(monkeypatch):
+    monkeypatch.setattr(olcum, '_olcumler', {})
+
+    assert olcum.kaydet('ilk_cizim', 1.5)
+    assert not olcum.kaydet('ilk_cizim', 0.5)
+    assert olcum.olcumler() == {'ilk_cizim': 1.5}
+
+
+def test_esigi_asan_ilk_cizim_uyari_olarak_loglanir(monkeypatch, caplog):
+    monkeypatch.setattr(olcum, '_olcumler', {})
+    caplog.set_level(logging.INFO, logger='olcum')
+
+    olcum.kaydet('ilk_cizim', olcum.BASLANGIC_ESIGI + 1)
+    olcum.kaydet('ilk_tam_cizim', olcum.BASLANGIC_ESIGI + 1)
+
+    assert [kayit.levelname for kayit in caplog.records] == ['WARNING', 'INFO']
+
+
+def test_etkilesim_ozeti(monkeypatch):
+    monkeypatch.setattr(olcum, '_etkilesimler', {})
+    monkeypatch.setattr(olcum, 'ETKILESIM_PENCERESI', 100)
+    for i in range(1, 151):
+        olcum.etkilesim_kaydet('liste', i / 1000)
+
+    ozet, = olcum.etkilesim_ozeti()
+    # Yalnızca son 100 ölçüm (51..150 ms) tutulur
+    assert ozet['bolum'] == 'liste'
+    assert ozet['adet'] == 100
+    assert ozet['son_ms'] == pytest.approx(150)
+    assert ozet['medyan_ms'] == pytest.approx(100.5)
+    assert ozet['p95_ms'] == pytest.approx(146)
+
+
+def test_olculen_hata_olsa_da_sureyi_kaydeder(monkeypatch):
+    monkeypatch.setattr(olcum, '_etkilesimler', {})
+
+    @olcum.olculen('bolum')
+    def bolum():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        bolum()
+    assert [ozet['adet'] for ozet in olcum.etkilesim_ozeti()] == [1]
@@ -0,0 +1,89 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hesaplama import hesapla_toplu
+from senaryo import KurModeli, basabas_analizi, kur_modeli_kalibre_et, kur_senaryolari
+
+BUGUN = date.today()
+
+
+def _tl_mevduatlar():
+    baslangic = pd.Timestamp(BUGUN)
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'TL Mevduat', 'TL Mevduat', 'USD Mevduat'],
+        'banka': 'Akbank',
+        'tutar': [100_000, 200_000, 50_000, 1_000],
+        'faiz_orani': [45.0, 10.0, 45.0, 3.0],
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta([32, 92, 92, 32], unit='D')
+    }), 34.5, BUGUN)
+
+
+def test_kalibrasyon():
+    kurlar = 30 * np.exp(np.cumsum(np.r_[0, np.full(59, 0.001)]))
+    model = kur_modeli_kalibre_et(kurlar)
+
+    assert model.mu == pytest.approx(0.001)
+    assert model.sigma == pytest.approx(0, abs=1e-12)
+    with pytest.raises(ValueError):
+        kur_modeli_kalibre_et(kurlar[:20])
+    with pytest.raises(ValueError):
+        kur_modeli_kalibre_et(kurlar, yontem='garch')
+
+
+@pytest.mark.parametrize('yontem', ['gbm', 'bootstrap'])
+def test_oynaklik_yoksa_yol_belirlenimlidir(yontem):
+    model = KurModeli(yontem, 0.001, 0.0, np.full(100, 0.001))
+    ufuklar = [0, 1, 70, 200]
+
+    kurlar = kur_senaryolari(model, 30.0, ufuklar, 5, tohum=1)
+
+    np.testing.assert_allclose(kurlar, np.tile(30.0 * np.exp(0.001 * np.array(ufuklar)), (5, 1)))
+
+
+def test_senaryolar_tohumla_tekrarlanabilir():
+    model = KurModeli('gbm', 0.0005, 0.01, None)
+
+    np.testing.assert_array_equal(kur_senaryolari(model, 30.0, [10, 50], 100, tohum=7),
+                                  kur_senaryolari(model, 30.0, [10, 50], 100, tohum=7))
+
+
+def test_basabas_analizi():
+    df = _tl_mevduatlar()
+    # Kur hep başabaşın altında kalır: yüksek faizli mevduatlar USD'yi geçer
+    model = KurModeli('gbm', 0.0, 0.0, None)
+
+    sonuc = basabas_analizi(df, model, 34.5, BUGUN, senaryo_sayisi=50, tohum=0)
+
+    assert len(sonuc.mevduatlar) == 3
+    assert sonuc.mevduatlar['usd_gecme_olasiligi'].tolist() == [1.0, 1.0, 1.0]
+    tl = df[df['mevduat_tipi'] == 'TL Mevduat']
+    beklenen = tl['donus_tutari_tl'].sum() / 34.5 - tl['tutar_usd'].sum()
+    assert sonuc.portfoy['beklenen_fark_usd'] == pytest.approx(beklenen)
+    np.testing.assert_allclose(sonuc.mevduatlar['usd_karsiligi_p50'], tl['donus_tutari_tl'] / 34.5)
+
+
+def test_paralel_simulasyon():
+    df = _tl_mevduatlar()
+    model = KurModeli('gbm', 0.0005, 0.01, None)
+
+    sonuc = basabas_analizi(df, model, 34.5, BUGUN, senaryo_sayisi=400, tohum=3, isci_sayisi=2)
+
+    assert len(sonuc.portfoy_fark_usd) == 400
+    assert 0 <= sonuc.portfoy['usd_gecme_olasiligi'] <= 1
+
+
+def test_aktif_tl_mevduat_yoksa_hata():
+    df = _tl_mevduatlar()
+
+    with pytest.raises(ValueError):
+        basabas_analizi(df[df['mevduat_tipi'] == 'USD Mevduat'], KurModeli('gbm', 0, 0, None), 34.5, BUGUN)
+
+
+@pytest.mark.parametrize('guncel_kur', [0.0, None])
+def test_kur_yoksa_hata(guncel_kur):
+    with pytest.raises(ValueError, match="Kur bilgisi yok"):
+        basabas_analizi(_tl_mevduatlar(), KurModeli('gbm', 0, 0, None), guncel_kur, BUGUN, senaryo_sayisi=50)
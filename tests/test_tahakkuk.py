@@ -0,0 +1,52 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hesaplama import hesapla_toplu
+from tahakkuk import portfoy_degerleme, tahakkuk_matrisi
+
+
+def _mevduatlar(adet, tohum=0):
+    rng = np.random.default_rng(tohum)
+    baslangic = pd.Timestamp('2025-06-01') + pd.to_timedelta(rng.integers(0, 200, adet), unit='D')
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat'], adet),
+        'banka': 'Akbank',
+        'tutar': rng.integers(1_000, 100_000, adet),
+        'faiz_orani': rng.uniform(1, 45, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(1, 400, adet), unit='D')
+    }), 34.5, date(2026, 3, 1))
+
+
+def test_dogrusal_tahakkuk():
+    df = pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat'],
+        'tutar': [100_000],
+        'vade_baslangic': [pd.Timestamp('2026-01-01')],
+        'vade_bitis': [pd.Timestamp('2026-01-11')],
+        'net_faiz': [1_000],
+        'net_faiz_usd': [np.nan]
+    })
+    tarihler = pd.to_datetime(['2025-12-31', '2026-01-01', '2026-01-06', '2026-01-11', '2026-02-01'])
+
+    assert tahakkuk_matrisi(df, tarihler)[:, 0].tolist() == [0, 100_000, 100_500, 101_000, 101_000]
+    assert tahakkuk_matrisi(df, tarihler, vade_sonrasi_dahil=False)[-1, 0] == 0
+
+
+@pytest.mark.parametrize('vade_sonrasi_dahil', [True, False])
+def test_bloklu_degerleme_tam_matrisle_ayni(vade_sonrasi_dahil):
+    df = _mevduatlar(300)
+    tarihler = pd.date_range('2025-05-01', '2026-09-01', freq='D')
+    kurlar = np.linspace(30, 40, len(tarihler))
+
+    degerleme = portfoy_degerleme(df, tarihler, kurlar, vade_sonrasi_dahil, blok_boyutu=64)
+    matris = tahakkuk_matrisi(df, tarihler, vade_sonrasi_dahil)
+    usd = (df['mevduat_tipi'] == 'USD Mevduat').to_numpy()
+
+    np.testing.assert_allclose(degerleme['tl_mevduat'], matris[:, ~usd].sum(axis=1))
+    np.testing.assert_allclose(degerleme['usd_mevduat'], matris[:, usd].sum(axis=1))
+    np.testing.assert_allclose(degerleme['toplam_tl'], degerleme['tl_mevduat'] + degerleme['usd_mevduat'] * kurlar)
+    np.testing.assert_allclose(degerleme['toplam_usd'], degerleme['toplam_tl'] / kurlar)
@@ -0,0 +1,54 @@
+from datetime import date
+import subprocess
+import sys
+
+import pandas as pd
+
+from depo import MevduatDeposu
+from hesaplama import hesapla_toplu
+from toplu_hesapla import main
+
+BUGUN = date(2026, 3, 1)
+
+
+def _girdiler():
+    return pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'USD Mevduat', 'TL Mevduat'],
+        'banka': 'Akbank',
+        'tutar': [100_000, 5_000, 250_000],
+        'faiz_orani': [45.0, 3.0, 40.0],
+        'vade_baslangic': pd.to_datetime(['2026-01-01', '2026-01-01', '2026-02-01']),
+        'vade_bitis': pd.to_datetime(['2026-04-01', '2027-01-01', '2026-03-01'])
+    })
+
+
+def test_hesaplama_cekirdegi_streamlit_yuklemez():
+    kod = "import sys, hesaplama, ice_aktar, karsilastirma, dagilim; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', kod]).returncode == 0
+
+
+def test_csv_dosyasi(tmp_path):
+    _girdiler().to_csv(tmp_path / 'portfoy.csv', index=False, date_format='%d.%m.%Y')
+
+    assert main([str(tmp_path / 'portfoy.csv'), '--kur', '34.5', '--tarih', BUGUN.isoformat()]) == 0
+    sonuc = pd.read_csv(tmp_path / 'portfoy_hesaplanmis.csv', index_col='satir')
+    beklenen = hesapla_toplu(_girdiler(), 34.5, BUGUN)
+    assert sonuc.index.tolist() == [2, 3, 4]
+    assert sonuc['net_faiz'].tolist() == beklenen['net_faiz'].tolist()
+
+
+def test_depo_yerinde_guncellenir(tmp_path):
+    yol = str(tmp_path / 'portfoy.db')
+    depo = MevduatDeposu(yol)
+    depo.ekle(hesapla_toplu(_girdiler(), 30.0, date(2026, 1, 1)))
+    surum = depo.durum().surum
+
+    assert main([yol, '--kur', '34.5', '--tarih', BUGUN.isoformat(), '--yerinde']) == 0
+    df = depo.oku()
+    assert df['kalan_gun'].tolist() == [31, 306, 0]
+    assert df['tutar_usd'].iloc[0] == round(100_000 / 34.5, 2)
+    assert depo.durum().surum == surum + 1
+
+
+def test_hatali_kaynak_cikis_kodu(tmp_path):
+    assert main([str(tmp_path / 'yok.csv'), '--kur', '34.5']) == 1
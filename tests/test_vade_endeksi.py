@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vade_endeksi import VadeMerdiveni
+
+
+@pytest.fixture
+def mevduatlar():
+    rng = np.random.default_rng(3)
+    adet = 400
+    tipler = rng.choice(['TL Mevduat', 'USD Mevduat', 'EUR Mevduat', 'Altın Mevduat'], adet)
+    tutar = rng.integers(1_000, 1_000_000, adet)
+    net_faiz = rng.integers(0, 50_000, adet)
+    donus_tl = (tutar + net_faiz) * np.where(tipler == 'TL Mevduat', 1, 35)
+    return pd.DataFrame({
+        'mevduat_tipi': tipler,
+        'banka': 'Akbank',
+        'tutar': tutar,
+        # Aynı güne düşen vadeler sınır durumlarını da sınar
+        'vade_bitis': pd.to_datetime(date(2026, 1, 1)) + pd.to_timedelta(rng.integers(0, 120, adet), unit='D'),
+        'net_faiz': net_faiz,
+        'donus_tutari_tl': donus_tl,
+        'donus_tutari_usd': np.where(tipler == 'TL Mevduat', np.nan, tutar * 1.1)
+    }, index=pd.RangeIndex(1, adet + 1, name='id'))
+
+
+def _toplamlar(secim):
+    """Merdivenin toplamlarını filtrelenmiş satırlar üzerinden doğrudan hesapla"""
+    usd = secim['mevduat_tipi'] == 'USD Mevduat'
+    tl_veya_usd = secim['mevduat_tipi'].isin(['TL Mevduat', 'USD Mevduat'])
+    tutar = secim['tutar'].where(tl_veya_usd, secim['donus_tutari_tl'] - secim['net_faiz'])
+    return {
+        'adet_tl': (~usd).sum(),
+        'adet_usd': usd.sum(),
+        'anapara_tl': tutar[~usd].sum(),
+        'anapara_usd': tutar[usd].sum(),
+        'donus_tl': secim.loc[~usd, 'donus_tutari_tl'].sum(),
+        'donus_usd': secim.loc[usd, 'donus_tutari_usd'].sum()
+    }
+
+
+def _ayni(sonuc, beklenen):
+    assert sonuc.keys() == beklenen.keys()
+    for ad in beklenen:
+        assert sonuc[ad] == pytest.approx(beklenen[ad]), ad
+
+
+@pytest.mark.parametrize('gun', [-5, 0, 17, 60, 119, 200])
+def test_aktif(mevduatlar, gun):
+    merdiven = VadeMerdiveni(mevduatlar)
+    tarih = date(2026, 1, 1) + timedelta(days=gun)
+    beklenen = mevduatlar[mevduatlar['vade_bitis'] >= pd.Timestamp(tarih)]
+
+    _ayni(merdiven.aktif_toplam(tarih), _toplamlar(beklenen))
+    assert sorted(merdiven.aktif_idler(tarih)) == sorted(beklenen.index)
+    assert merdiven.sonraki_vadeler(10, tarih)['vade_bitis'].tolist() == \
+        beklenen['vade_bitis'].sort_values().head(10).tolist()
+
+
+@pytest.mark.parametrize('bas, bit', [(0, 0), (10, 40), (30, 29), (100, 400)])
+def test_nakit_akisi(mevduatlar, bas, bit):
+    merdiven = VadeMerdiveni(mevduatlar)
+    baslangic = date(2026, 1, 1) + timedelta(days=bas)
+    bitis = date(2026, 1, 1) + timedelta(days=bit)
+    vade = mevduatlar['vade_bitis']
+    beklenen = mevduatlar[(vade >= pd.Timestamp(baslangic)) & (vade <= pd.Timestamp(bitis))]
+
+    _ayni(merdiven.nakit_akisi(baslangic, bitis), _toplamlar(beklenen))
+
+
+@pytest.mark.parametrize('frekans', ['MS', 'W-MON'])
+def test_takvim(mevduatlar, frekans):
+    merdiven = VadeMerdiveni(mevduatlar)
+    baslangic, bitis = date(2026, 1, 10), date(2026, 4, 15)
+    takvim = merdiven.takvim(baslangic, bitis, frekans)
+
+    sinirlar = list(takvim.index) + [pd.Timestamp(bitis) + pd.Timedelta(days=1)]
+    assert sinirlar[0] == pd.Timestamp(baslangic)
+    for donem, (bas, bit) in zip(takvim.index, zip(sinirlar, sinirlar[1:])):
+        vade = mevduatlar['vade_bitis']
+        _ayni(takvim.loc[donem].to_dict(), _toplamlar(mevduatlar[(vade >= bas) & (vade < bit)]))
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from depo import MevduatDeposu
+from hesaplama import hesapla_toplu
+from yeniden_hesaplama import yeniden_hesapla
+
+BUGUN = date(2026, 3, 1)
+KURLAR = {'EUR': 37.0}
+
+
+def _mevduatlar(adet=30):
+    rng = np.random.default_rng(5)
+    baslangic = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 60, adet), unit='D')
+    return pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat', 'EUR Mevduat'], adet),
+        'banka': 'Akbank',
+        'tutar': rng.integers(1_000, 100_000, adet),
+        'faiz_orani': rng.uniform(1, 45, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(30, 400, adet), unit='D')
+    })
+
+
+@pytest.fixture
+def depo(tmp_path):
+    depo = MevduatDeposu(str(tmp_path / 'mevduat.db'))
+    depo.ekle(hesapla_toplu(_mevduatlar(), 34.0, BUGUN, KURLAR))
+    return depo
+
+
+def test_degisiklik_yoksa_hicbir_sey_yazilmaz(depo):
+    assert yeniden_hesapla(depo, 34.0, BUGUN, KURLAR) == {'kur': 0, 'bugun': 0, 'stopaj': 0}
+    durum = depo.durum()
+
+    assert yeniden_hesapla(depo, 34.0, BUGUN, KURLAR) == {'kur': 0, 'bugun': 0, 'stopaj': 0}
+    assert depo.durum() == durum
+
+
+def test_kur_degisince_tum_kayitlar_yenilenir(depo):
+    yeniden_hesapla(depo, 34.0, BUGUN, KURLAR)
+    sonuc = yeniden_hesapla(depo, 35.0, BUGUN, KURLAR)
+
+    df = depo.oku()
+    # EUR kuru değişmediğinden EUR mevduatlarına dokunulmaz
+    assert sonuc['kur'] == (df['mevduat_tipi'] != 'EUR Mevduat').sum()
+    beklenen = hesapla_toplu(df, 35.0, BUGUN, KURLAR)
+    for kolon in ['tutar_usd', 'basabas_kur', 'brut_faiz', 'net_faiz', 'donus_tutari_tl']:
+        pd.testing.assert_series_equal(df[kolon], beklenen[kolon].set_axis(df.index), check_dtype=False)
+
+
+def test_yalnizca_kirli_kayitlar_yenilenir(depo):
+    yeniden_hesapla(depo, 34.0, BUGUN, KURLAR)
+
+    # Başka kurla hesaplanmış kayıt eklenir; kur aynı kaldığından sadece o kayıt yenilenir
+    yeni = hesapla_toplu(_mevduatlar(1).assign(mevduat_tipi='USD Mevduat'), 30.0, BUGUN, KURLAR)
+    depo.ekle(yeni)
+    assert yeniden_hesapla(depo, 34.0, BUGUN, KURLAR) == {'kur': 1, 'bugun': 0, 'stopaj': 0}
+
+    kayit = depo.oku().iloc[-1]
+    assert kayit['donus_tutari_tl'] == round(kayit['donus_tutari_usd'] * 34.0)
+
+
+@pytest.mark.parametrize('guncel_kur', [0.0, None])
+def test_usd_kuru_yokken_kura_bagli_alanlar_korunur(depo, guncel_kur):
+    yeniden_hesapla(depo, 34.0, BUGUN, KURLAR)
+    depo.meta_yaz({'stopaj_ozeti': 'eski'})
+    yeni = hesapla_toplu(_mevduatlar(1).assign(mevduat_tipi='USD Mevduat'), 30.0, BUGUN, KURLAR)
+    depo.ekle(yeni)
+    once = depo.oku()
+
+    assert yeniden_hesapla(depo, guncel_kur, BUGUN, {'EUR': 38.0}) == {'kur': 0, 'bugun': 0, 'stopaj': 0}
+    pd.testing.assert_frame_equal(depo.oku(), once)
+    assert depo.meta_oku('hesap_kuru_USD') == 34.0
+    assert depo.meta_oku('hesap_kuru_EUR') == 37.0
+    assert depo.meta_oku('stopaj_ozeti') == 'eski'
+
+    # Kur gelince kur yokken eklenen kayıt da yenilenir
+    sonuc = yeniden_hesapla(depo, 34.0, BUGUN, KURLAR)
+    assert sonuc['kur'] == 1
+    kayit = depo.oku().iloc[-1]
+    assert kayit['donus_tutari_tl'] == round(kayit['donus_tutari_usd'] * 34.0)
+
+
+def test_tarih_degisince_kalan_gun_guncellenir(depo):
+    yeniden_hesapla(depo, 34.0, BUGUN, KURLAR)
+    sonuc = yeniden_hesapla(depo, 34.0, BUGUN + timedelta(days=1), KURLAR)
+
+    assert sonuc == {'kur': 0, 'bugun': depo.adet(), 'stopaj': 0}
+    df = depo.oku()
+    assert (df['kalan_gun'] == (df['vade_bitis'] - pd.Timestamp(BUGUN + timedelta(days=1))).dt.days).all()
@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from hesaplama import hesapla, hesapla_toplu
+from tahakkuk import portfoy_degerleme
+from yenileme import donguleri_hesapla, yenileme_projeksiyonu
+
+BUGUN = date(2026, 3, 1)
+KUR = 34.5
+
+
+def _mevduatlar(adet, tohum=0):
+    rng = np.random.default_rng(tohum)
+    baslangic = pd.Timestamp('2025-10-01') + pd.to_timedelta(rng.integers(0, 150, adet), unit='D')
+    return hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': rng.choice(['TL Mevduat', 'USD Mevduat'], adet),
+        'banka': 'Akbank',
+        'tutar': rng.integers(1_000, 100_000, adet),
+        'faiz_orani': rng.uniform(1, 45, adet).round(2),
+        'vade_baslangic': baslangic,
+        'vade_bitis': baslangic + pd.to_timedelta(rng.integers(1, 400, adet), unit='D')
+    }), KUR, BUGUN)
+
+
+def test_yenilemeler_tekil_hesapla_ile_ayni():
+    df = _mevduatlar(40)
+    donguler = donguleri_hesapla(df, 3)
+
+    for i, kayit in enumerate(df.itertuples()):
+        usd = kayit.mevduat_tipi == 'USD Mevduat'
+        assert donguler.net_faiz[i, 0] == (kayit.net_faiz_usd if usd else kayit.net_faiz)
+        vade = (kayit.vade_bitis - kayit.vade_baslangic).days
+        baslangic = kayit.vade_bitis.date()
+        for k in range(1, 4):
+            tekil = hesapla({
+                'mevduat_tipi': kayit.mevduat_tipi,
+                'banka': kayit.banka,
+                'tutar': donguler.anapara[i, k],
+                'faiz_orani': kayit.faiz_orani,
+                'vade_baslangic': baslangic,
+                'vade_bitis': baslangic + timedelta(days=vade)
+            }, KUR, BUGUN)
+            assert donguler.net_faiz[i, k] == (tekil['net_faiz_usd'] if usd else tekil['net_faiz'])
+            assert donguler.anapara[i, k + 1] == donguler.anapara[i, k] + donguler.net_faiz[i, k]
+            baslangic += timedelta(days=vade)
+
+
+def test_faiz_yolu_yururluk_tarihinden_itibaren_uygulanir():
+    df = hesapla_toplu(pd.DataFrame({
+        'mevduat_tipi': ['TL Mevduat', 'USD Mevduat'],
+        'banka': 'Akbank',
+        'tutar': [100_000, 10_000],
+        'faiz_orani': [40.0, 3.0],
+        'vade_baslangic': [pd.Timestamp('2026-01-01')] * 2,
+        'vade_bitis': [pd.Timestamp('2026-04-01')] * 2
+    }), KUR, BUGUN)
+    yol = {'TL Mevduat': [(date(2026, 6, 30), 30.0)]}
+
+    sabit = donguleri_hesapla(df, 3)
+    yollu = donguleri_hesapla(df, 3, faiz_yolu=yol)
+
+    # 1 Nisan ve 30 Haziran yenilemeleri: ilki eski, ikincisi yoldaki oranla yapılır
+    assert yollu.net_faiz[0, 1] == sabit.net_faiz[0, 1]
+    assert yollu.net_faiz[0, 2] < sabit.net_faiz[0, 2]
+    np.testing.assert_array_equal(yollu.net_faiz[1], sabit.net_faiz[1])
+
+
+def test_yenilemesiz_projeksiyon_degerlemeyle_ayni():
+    df = _mevduatlar(300, 1)
+    projeksiyon = yenileme_projeksiyonu(df, BUGUN, 0, 24, KUR, blok_boyutu=64)
+    degerleme = portfoy_degerleme(df, projeksiyon.index, np.full(len(projeksiyon), KUR))
+
+    for kolon in ['tl_mevduat', 'usd_mevduat', 'toplam_tl', 'toplam_usd']:
+        np.testing.assert_allclose(projeksiyon[kolon], degerleme[kolon])
+
+
+def test_yenileme_portfoy_degerini_artirir():
+    df = _mevduatlar(100, 2)
+    projeksiyon = yenileme_projeksiyonu(df, BUGUN, 4, 36, KUR)
+
+    assert (projeksiyon['toplam_tl'].diff().dropna() >= 0).all()
+    assert projeksiyon['toplam_tl'].iloc[-1] > yenileme_projeksiyonu(df, BUGUN, 0, 36, KUR)['toplam_tl'].iloc[-1]
@@ -0,0 +1,138 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import os
+import sys
+import time
+
+import pandas as pd
+
+from constants import KAYIT_KOLONLAR
+from hesaplama import hesapla_toplu
+
+# Girdilerden türetilen, yeniden hesaplanan kolonlar (başlangıç kuru kayıttaki haliyle korunur)
+HESAPLANAN_KOLONLAR = [
+    kolon for kolon in KAYIT_KOLONLAR[KAYIT_KOLONLAR.index('orijinal_vade'):]
+    if kolon != 'baslangic_kur'
+]
+
+
+def _cikti_yolu(kaynak, cikti_klasoru, ek):
+    """Kaynak dosya adından çıktı dosyası yolu oluştur"""
+    ad = os.path.splitext(os.path.basename(kaynak))[0]
+    return os.path.join(cikti_klasoru or os.path.dirname(os.path.abspath(kaynak)), f"{ad}_{ek}.csv")
+
+
+def depoyu_hesapla(yol, guncel_kur, bugun, cikti_klasoru=None, yerinde=False, kurlar=None):
+    """Kayıtlı portföyü yeniden hesapla; çıktı dosyasına yaz ya da değişen alanları depoya geri yaz"""
+    from depo import MevduatDeposu
+
+    depo = MevduatDeposu(yol)
+    df = depo.oku()
+    sonuc = hesapla_toplu(df, guncel_kur, bugun, kurlar)
+    sonuc['baslangic_kur'] = df['baslangic_kur'].fillna(sonuc['baslangic_kur'])
+
+    if not yerinde:
+        hedef = _cikti_yolu(yol, cikti_klasoru, 'hesaplanmis')
+        sonuc.to_csv(hedef, index_label='id')
+        return f"{yol}: {len(sonuc):,} kayıt hesaplandı -> {hedef}"
+
+    # Sadece değeri değişen kayıtlar yazılır
+    eski, yeni = df[HESAPLANAN_KOLONLAR], sonuc[HESAPLANAN_KOLONLAR]
+    degisen = ((eski != yeni) & ~(eski.isna() & yeni.isna())).any(axis=1)
+    depo.alanlari_guncelle(yeni[degisen])
+    return f"{yol}: {len(sonuc):,} kayıt hesaplandı, {int(degisen.sum()):,} kayıt güncellendi"
+
+
+def dosyayi_hesapla(yol, guncel_kur, bugun, cikti_klasoru=None, kurlar=None):
+    """CSV/Excel dosyasını parça parça hesaplayıp çıktı CSV'sine yaz"""
+    from ice_aktar import hesaplanmis_parcalar
+
+    hedef = _cikti_yolu(yol, cikti_klasoru, 'hesaplanmis')
+    hatalar = []
+    adet = 0
+    with open(yol, 'rb') as dosya, open(hedef, 'w', newline='', encoding='utf-8') as cikti:
+        for parca in hesaplanmis_parcalar(dosya, yol, guncel_kur, hatalar, bugun=bugun, kurlar=kurlar):
+            parca.to_csv(cikti, header=adet == 0, index_label='satir')
+            adet += len(parca)
+
+    mesaj = f"{yol}: {adet:,} kayıt hesaplandı -> {hedef}"
+    if hatalar:
+        hata_yolu = _cikti_yolu(yol, cikti_klasoru, 'hatalar')
+        pd.DataFrame(hatalar).to_csv(hata_yolu, index=False)
+        mesaj += f" ({len(hatalar):,} hatalı satır -> {hata_yolu})"
+    return mesaj
+
+
+def kaynagi_hesapla(yol, guncel_kur, bugun, cikti_klasoru=None, yerinde=False, kurlar=None):
+    """Kaynağın türüne göre depo veya dosya hesaplamasını çalıştır"""
+    if yol.lower().endswith(('.db', '.sqlite', '.sqlite3')):
+        return depoyu_hesapla(yol, guncel_kur, bugun, cikti_klasoru, yerinde, kurlar)
+    if yerinde:
+        raise ValueError("--yerinde sadece depo (.db) kaynakları için kullanılabilir")
+    return dosyayi_hesapla(yol, guncel_kur, bugun, cikti_klasoru, kurlar)
+
+
+def _calistir(args):
+    """Süreç havuzunda tek kaynak hesapla, hatayı mesaj olarak döndür"""
+    try:
+        return True, kaynagi_hesapla(*args)
+    except Exception as e:
+        return False, f"{args[0]}: HATA - {e}"
+
+
+def _doviz_kuru(deger):
+    """PARA=KUR biçimindeki argümanı (para birimi, kur) çiftine çevir"""
+    para, _, kur = deger.partition('=')
+    return para.strip().upper(), float(kur)
+
+
+def arguman_ayristirici():
+    """Komut satırı argümanlarını tanımla"""
+    ayristirici = argparse.ArgumentParser(
+        description="Mevduat portföylerini (SQLite depo, CSV veya Excel) arayüz olmadan toplu hesaplar."
+    )
+    ayristirici.add_argument('kaynaklar', nargs='+', help="Depo (.db), CSV veya Excel dosyaları")
+    ayristirici.add_argument('--kur', type=float,
+                             help="USD/TL kuru (verilmezse tüm kurlar yfinance'ten tek istekle alınır)")
+    ayristirici.add_argument('--doviz-kuru', type=_doviz_kuru, action='append', default=[], metavar='PARA=KUR',
+                             help="Diğer para birimlerinin TL kuru, ör. EUR=37.5 veya XAU=2900 (tekrarlanabilir)")
+    ayristirici.add_argument('--tarih', type=date.fromisoformat, default=None,
+                             help="Kalan gün hesabı için tarih (YYYY-AA-GG, varsayılan bugün)")
+    ayristirici.add_argument('--cikti', help="Çıktı klasörü (varsayılan kaynağın klasörü)")
+    ayristirici.add_argument('--yerinde', action='store_true',
+                             help="Depoları dosyaya yazmak yerine yerinde güncelle")
+    ayristirici.add_argument('--isci', type=int, default=1, help="Paralel işlenecek kaynak sayısı")
+    return ayristirici
+
+
+def main(argv=None):
+    args = arguman_ayristirici().parse_args(argv)
+    baslangic = time.perf_counter()
+
+    kurlar = dict(args.doviz_kuru)
+    guncel_kur = args.kur
+    if guncel_kur is None:
+        from kur import yfinance_kurlari_getir
+        kurlar = {**yfinance_kurlari_getir(), **kurlar}
+        guncel_kur = kurlar['USD']
+    bugun = args.tarih or date.today()
+
+    if args.cikti:
+        os.makedirs(args.cikti, exist_ok=True)
+
+    isler = [(yol, guncel_kur, bugun, args.cikti, args.yerinde, kurlar) for yol in args.kaynaklar]
+    if args.isci > 1 and len(isler) > 1:
+        with ProcessPoolExecutor(max_workers=args.isci) as havuz:
+            sonuclar = list(havuz.map(_calistir, isler))
+    else:
+        sonuclar = [_calistir(is_) for is_ in isler]
+
+    for _, mesaj in sonuclar:
+        print(mesaj)
+    print(f"Kur: {guncel_kur:.4f}, süre: {time.perf_counter() - baslangic:.2f} sn")
+    return 0 if all(basarili for basarili, _ in sonuclar) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
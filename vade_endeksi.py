@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+MERDIVEN_KOLONLARI = [
+    'mevduat_tipi',
+    'banka',
+    'tutar',
+    'vade_bitis',
+    'net_faiz',
+    'donus_tutari_tl',
+    'donus_tutari_usd'
+]
+
+
+def _gun(tarih):
+    """Tarih(ler)i datetime64[D] gün sayısına çevir"""
+    return np.asarray(pd.to_datetime(tarih), dtype='datetime64[D]').astype(np.int64)
+
+
+class VadeMerdiveni:
+    """Vade bitişine göre sıralı mevduat endeksi; kümülatif toplamlarla aralık sorguları
+
+    USD mevduatları USD, diğerleri (USD dışındaki döviz mevduatları kayıtlı TL
+    karşılıklarıyla) TL toplamlarında yer alır.
+    """
+
+    def __init__(self, df):
+        gunler = _gun(df['vade_bitis'])
+        sira = np.argsort(gunler, kind='stable')
+
+        self.df = df.iloc[sira]
+        self.gunler = gunler[sira]
+        self.idler = df.index.to_numpy()[sira]
+
+        tip = self.df['mevduat_tipi'].to_numpy()
+        usd = tip == 'USD Mevduat'
+        donus_tl = np.nan_to_num(self.df['donus_tutari_tl'].to_numpy(dtype=float))
+        # Diğer döviz mevduatlarının anaparası TL karşılığı olarak (dönüş - net faiz)
+        tutar = np.where(
+            np.isin(tip, ['TL Mevduat', 'USD Mevduat']),
+            self.df['tutar'].to_numpy(dtype=float),
+            donus_tl - np.nan_to_num(self.df.get('net_faiz', pd.Series(0.0, index=self.df.index)).to_numpy(dtype=float))
+        )
+        donus_usd = np.nan_to_num(self.df.get('donus_tutari_usd', pd.Series(0.0, index=self.df.index)).to_numpy(dtype=float))
+
+        # Başında 0 olan kümülatif toplamlar: [i, j) aralığı toplamı = kum[j] - kum[i]
+        def kumulatif(degerler):
+            return np.concatenate([[0.0], np.cumsum(degerler)])
+
+        self._kum = {
+            'adet_tl': kumulatif(~usd),
+            'adet_usd': kumulatif(usd),
+            'anapara_tl': kumulatif(np.where(usd, 0.0, tutar)),
+            'anapara_usd': kumulatif(np.where(usd, tutar, 0.0)),
+            'donus_tl': kumulatif(np.where(usd, 0.0, donus_tl)),
+            'donus_usd': kumulatif(np.where(usd, donus_usd, 0.0))
+        }
+
+    def __len__(self):
+        return len(self.gunler)
+
+    def _aralik_toplami(self, i, j):
+        """Sıralı konumlar [i, j) için toplamlar"""
+        return {ad: kum[j] - kum[i] for ad, kum in self._kum.items()}
+
+    def aktif_konum(self, tarih):
+        """Vadesi tarih veya sonrasında olan ilk sıralı konum"""
+        return int(np.searchsorted(self.gunler, _gun(tarih), side='left'))
+
+    def aktif_idler(self, tarih):
+        """Tarih itibarıyla aktif (vadesi gelmemiş) mevduat id'leri"""
+        return self.idler[self.aktif_konum(tarih):]
+
+    def aktif(self, tarih):
+        """Tarih itibarıyla aktif mevduatlar (vade sırasına göre)"""
+        return self.df.iloc[self.aktif_konum(tarih):]
+
+    def aktif_toplam(self, tarih):
+        """Tarih itibarıyla aktif mevduatların adet, anapara ve dönüş toplamları"""
+        return self._aralik_toplami(self.aktif_konum(tarih), len(self))
+
+    def nakit_akisi(self, baslangic, bitis):
+        """Vadesi [baslangic, bitis] aralığında dolan mevduatların toplamları"""
+        i = int(np.searchsorted(self.gunler, _gun(baslangic), side='left'))
+        j = int(np.searchsorted(self.gunler, _gun(bitis), side='right'))
+        return self._aralik_toplami(i, max(i, j))
+
+    def sonraki_vadeler(self, n, tarih):
+        """Tarihten itibaren vadesi dolacak ilk n mevduat"""
+        i = self.aktif_konum(tarih)
+        return self.df.iloc[i:i + n]
+
+    def takvim(self, baslangic, bitis, frekans='MS'):
+        """Aralığı dönemlere bölüp her dönemde vadesi dolan toplamları döndür"""
+        donemler = pd.date_range(pd.Timestamp(baslangic), pd.Timestamp(bitis), freq=frekans)
+        if len(donemler) == 0 or donemler[0] > pd.Timestamp(baslangic):
+            donemler = donemler.insert(0, pd.Timestamp(baslangic))
+        sinirlar = np.append(_gun(donemler), _gun(bitis) + 1)
+
+        # Her dönem sınırının konumu tek searchsorted ile bulunur
+        konumlar = np.searchsorted(self.gunler, sinirlar, side='left')
+        return pd.DataFrame(
+            {ad: np.diff(kum[konumlar]) for ad, kum in self._kum.items()},
+            index=donemler.rename('donem')
+        )
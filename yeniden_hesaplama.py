@@ -0,0 +1,143 @@
+import threading
+
+from constants import DOVIZ_TIPLERI, PARA_BIRIMLERI
+from hesaplama import doviz_tl_karsiliklari, hesapla_toplu, kura_bagli_alanlar, stopaj_tablosu_ozeti
+
+# Türetilmiş alanların neye bağlı olduğu. 'girdi' değişiklikleri kayıt yazılırken
+# hesapla ile karşılanır; 'kur' ve 'bugun' değiştiğinde yalnızca ilgili alanlar yenilenir.
+BAGIMLILIKLAR = {
+    'girdi': {
+        'TL Mevduat': ['orijinal_vade', 'kalan_gun', 'stopaj_orani', 'brut_faiz', 'stopaj_tutari',
+                       'net_faiz', 'donus_tutari_tl', 'tutar_usd', 'basabas_kur'],
+        **{
+            tip: ['orijinal_vade', 'kalan_gun', 'stopaj_orani', 'brut_faiz_usd', 'stopaj_tutari_usd',
+                  'net_faiz_usd', 'donus_tutari_usd', 'basabas_kur']
+            for tip in DOVIZ_TIPLERI
+        }
+    },
+    'kur': {
+        'TL Mevduat': ['tutar_usd', 'basabas_kur'],
+        **{tip: ['brut_faiz', 'stopaj_tutari', 'net_faiz', 'donus_tutari_tl'] for tip in DOVIZ_TIPLERI}
+    },
+    'bugun': {tip: ['kalan_gun'] for tip in PARA_BIRIMLERI},
+    # Stopaj kural tablosu değiştiğinde oranı ve ondan türeyen tutarlar yenilenir
+    'stopaj': {
+        'TL Mevduat': ['stopaj_orani', 'stopaj_tutari', 'net_faiz', 'donus_tutari_tl', 'basabas_kur'],
+        **{
+            tip: ['stopaj_orani', 'stopaj_tutari_usd', 'net_faiz_usd', 'donus_tutari_usd', 'basabas_kur',
+                  'stopaj_tutari', 'net_faiz', 'donus_tutari_tl']
+            for tip in DOVIZ_TIPLERI
+        }
+    }
+}
+
+# Kura bağlı alanların hangi para biriminin kuruna bağlı olduğu (TL mevduatlarda USD karşılığı)
+_KUR_PARA_BIRIMI = {
+    tip: 'USD' if tip == 'TL Mevduat' else PARA_BIRIMLERI[tip]
+    for tip in BAGIMLILIKLAR['kur']
+}
+
+# Kur bağımlı alanları hesaplamak için okunan kolonlar
+_KUR_GIRDILERI = {
+    'TL Mevduat': ['tutar', 'faiz_orani', 'vade_baslangic', 'vade_bitis'],
+    **{tip: ['brut_faiz_usd', 'stopaj_tutari_usd', 'net_faiz_usd', 'donus_tutari_usd'] for tip in DOVIZ_TIPLERI}
+}
+_KUR_HESAPLAYICILARI = {
+    'TL Mevduat': kura_bagli_alanlar,
+    **{tip: doviz_tl_karsiliklari for tip in DOVIZ_TIPLERI}
+}
+
+_kilit = threading.Lock()
+
+
+def _kur_alanlarini_guncelle(depo, mevduat_tipi, kur, surum_sonrasi=None):
+    """Bir tipin kura bağlı alanlarını (isteğe bağlı olarak sadece yeni sürümlü kayıtlarda) yenile"""
+    alanlar = BAGIMLILIKLAR['kur'][mevduat_tipi]
+    df = depo.oku(
+        mevduat_tipi=mevduat_tipi,
+        surum_sonrasi=surum_sonrasi,
+        kolonlar=_KUR_GIRDILERI[mevduat_tipi] + alanlar
+    )
+    if df.empty:
+        return 0
+
+    yeni = _KUR_HESAPLAYICILARI[mevduat_tipi](df, kur)[alanlar]
+    eski = df[alanlar]
+    degisen = ((yeni != eski) & ~(yeni.isna() & eski.isna())).any(axis=1)
+    depo.alanlari_guncelle(yeni[degisen])
+    return int(degisen.sum())
+
+
+def _stopaj_alanlarini_guncelle(depo, mevduat_tipi, guncel_kur, bugun, kurlar):
+    """Bir tipin tüm kayıtlarında stopaja bağlı alanları geçerli kural tablosuyla yenile"""
+    alanlar = BAGIMLILIKLAR['stopaj'][mevduat_tipi]
+    df = depo.oku(mevduat_tipi=mevduat_tipi)
+    if df.empty:
+        return 0
+
+    yeni = hesapla_toplu(df, guncel_kur, bugun, kurlar)[alanlar]
+    eski = df[alanlar]
+    degisen = ((yeni != eski) & ~(yeni.isna() & eski.isna())).any(axis=1)
+    depo.alanlari_guncelle(yeni[degisen])
+    return int(degisen.sum())
+
+
+def yeniden_hesapla(depo, guncel_kur, bugun, kurlar=None):
+    """Bağımlılığı değişen türetilmiş alanları yenile, güncellenen kayıt sayılarını döndür
+
+    Bir para biriminin kuru değiştiyse ona bağlı alanlar o tipin tüm kayıtlarında,
+    değişmediyse yalnızca son hesaplamadan sonra eklenen veya düzenlenen kayıtlarda
+    yenilenir. Tarih değiştiyse kalan gün tek bir SQL ifadesiyle güncellenir. Stopaj
+    kural tablosu değiştiyse stopaja bağlı alanlar tüm kayıtlarda yeniden hesaplanır.
+    USD/TL kuru yokken kura ve stopaja bağlı alanlar son hesaplanan halleriyle kalır.
+    """
+    kurlar = {**(kurlar or {}), 'USD': guncel_kur}
+    with _kilit:
+        hesap_kurlari = {para: depo.meta_oku(f'hesap_kuru_{para}') for para in set(_KUR_PARA_BIRIMI.values())}
+        hesap_tarihi = depo.meta_oku('hesap_tarihi')
+        hesap_surumu = depo.meta_oku('hesap_surumu', 0)
+        stopaj_ozeti = depo.meta_oku('stopaj_ozeti')
+        if depo.durum().surum == hesap_surumu and hesap_tarihi == bugun.isoformat() \
+                and stopaj_ozeti == stopaj_tablosu_ozeti() \
+                and all(hesap_kurlari[para] == kurlar.get(para) for para in hesap_kurlari):
+            return {'kur': 0, 'bugun': 0, 'stopaj': 0}
+
+        sonuc = {'kur': 0, 'bugun': 0, 'stopaj': 0}
+        meta = {}
+        # hesapla_toplu USD/TL kurunu gerektirdiğinden kura bağlı grup tümüyle sonraki çalıştırmaya kalır
+        usd_kuru_var = (guncel_kur or 0) > 0
+        for mevduat_tipi, para in _KUR_PARA_BIRIMI.items():
+            kur = kurlar.get(para)
+            # Kuru alınamayan (veya 0 olan) para birimlerinin alanlarına dokunulmaz
+            if not usd_kuru_var or not kur or kur <= 0:
+                continue
+            kur_degisti = hesap_kurlari[para] is None or float(hesap_kurlari[para]) != kur
+            sonuc['kur'] += _kur_alanlarini_guncelle(
+                depo, mevduat_tipi, kur, surum_sonrasi=None if kur_degisti else hesap_surumu
+            )
+            meta[f'hesap_kuru_{para}'] = kur
+
+        # Kura bağlı alanlar yenilendikten sonra yalnızca stopajdan kaynaklanan farklar kalır
+        if usd_kuru_var and stopaj_ozeti != stopaj_tablosu_ozeti():
+            eksik = False
+            for mevduat_tipi in BAGIMLILIKLAR['stopaj']:
+                kur = kurlar.get(_KUR_PARA_BIRIMI[mevduat_tipi])
+                # Kuru alınamayan tipler bir sonraki çalıştırmada yenilenir
+                if not kur or kur <= 0:
+                    eksik = eksik or depo.adet(mevduat_tipi=mevduat_tipi) > 0
+                    continue
+                sonuc['stopaj'] += _stopaj_alanlarini_guncelle(depo, mevduat_tipi, guncel_kur, bugun, kurlar)
+            if not eksik:
+                meta['stopaj_ozeti'] = stopaj_tablosu_ozeti()
+
+        if hesap_tarihi != bugun.isoformat():
+            sonuc['bugun'] = depo.kalan_gunleri_guncelle(bugun)
+            meta['hesap_tarihi'] = bugun.isoformat()
+
+        # Kendi yazdığımız sürümler bir sonraki çalıştırmada kirli sayılmaz; kur yokken
+        # atlanan kayıtlar kirli kalır ve kur geldiğinde yenilenir
+        if usd_kuru_var:
+            meta['hesap_surumu'] = depo.durum().surum
+        if meta:
+            depo.meta_yaz(meta)
+        return sonuc
@@ -0,0 +1,143 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from constants import DOVIZ_TIPLERI
+from hesaplama import _gecerli_kur, _yuvarla, hesapla_stopaj_orani_toplu, tl_kurlari
+from tahakkuk import BLOK_BOYUTU, _gun_sayisi, _mevduat_dizileri
+
+YENILEME_KOLONLARI = [
+    'mevduat_tipi',
+    'tutar',
+    'faiz_orani',
+    'vade_baslangic',
+    'vade_bitis',
+    'net_faiz',
+    'net_faiz_usd'
+]
+
+# baslangic ve vade gün cinsinden (n,) dizilerdir; anapara (n, döngü + 1) her döngünün
+# başındaki anaparayı ve son dönüş tutarını, net_faiz (n, döngü) döngü net faizlerini tutar
+Donguler = namedtuple('Donguler', ['baslangic', 'vade', 'anapara', 'net_faiz'])
+
+
+def _yenileme_faizleri(mevduat_tipi, faiz_orani, dongu_baslangici, faiz_yolu):
+    """Her (mevduat, yenileme) için yenileme tarihinde geçerli faiz oranı"""
+    oranlar = np.repeat(faiz_orani[:, None], dongu_baslangici.shape[1], axis=1)
+
+    for tip, yol in (faiz_yolu or {}).items():
+        secim = mevduat_tipi == tip
+        if not yol or not secim.any():
+            continue
+        yol = sorted(yol)
+        tarihler = _gun_sayisi([tarih for tarih, _ in yol])
+        degerler = np.array([oran for _, oran in yol], dtype=float)
+
+        # Yolun ilk tarihinden önceki yenilemeler mevduatın kendi oranıyla yapılır
+        konum = np.searchsorted(tarihler, dongu_baslangici[secim], side='right') - 1
+        oranlar[secim] = np.where(konum >= 0, degerler[np.maximum(konum, 0)], oranlar[secim])
+
+    return _yuvarla(oranlar, 2)
+
+
+def donguleri_hesapla(df, dongu_sayisi, faiz_yolu=None):
+    """Her mevduatı vade sonunda aynı vadeyle dongu_sayisi kez yenileyerek döngü tutarlarını hesapla
+
+    İlk döngü kayıttaki net faizle, sonraki döngüler bir önceki dönüş tutarı anapara
+    olmak üzere yenileme tarihinde geçerli faiz ve stopaj oranıyla (hesapla ile aynı
+    yuvarlamalarla) hesaplanır. Tutarlar mevduatın kendi para birimindedir.
+    faiz_yolu: mevduat tipi -> [(yürürlük tarihi, faiz oranı)]; yolu verilmeyen
+    tiplerde mevduatın kendi faiz oranı korunur.
+    """
+    _, bas, bit, tutar, net_faiz = _mevduat_dizileri(df)
+    vade = np.maximum(bit - bas, 1)
+    n = len(df)
+
+    # k. yenilemenin başlangıç günü (satır: mevduat, kolon: yenileme)
+    yenileme = bit[:, None] + vade[:, None] * np.arange(dongu_sayisi)
+    tipler = pd.Categorical(df['mevduat_tipi'])
+
+    # Tüm (mevduat, yenileme) çiftlerinin stopaj oranları tek aramada bulunur
+    stopaj_orani = hesapla_stopaj_orani_toplu(
+        np.repeat(vade, dongu_sayisi),
+        pd.Categorical.from_codes(np.repeat(tipler.codes, dongu_sayisi), tipler.categories),
+        yenileme.ravel().astype('datetime64[D]')
+    ).reshape(n, dongu_sayisi)
+    faiz_orani = _yenileme_faizleri(
+        df['mevduat_tipi'].to_numpy(), df['faiz_orani'].to_numpy(dtype=float), yenileme, faiz_yolu
+    )
+
+    anapara = np.empty((n, dongu_sayisi + 2))
+    net = np.empty((n, dongu_sayisi + 1))
+    anapara[:, 0] = tutar
+    net[:, 0] = net_faiz
+    anapara[:, 1] = tutar + net_faiz
+
+    # Yuvarlamalar döngüye bağımlı olduğundan yalnızca döngüler sırayla ilerler
+    sure = vade / 365
+    for k in range(dongu_sayisi):
+        brut_faiz = _yuvarla(anapara[:, k + 1] * (faiz_orani[:, k] / 100) * sure)
+        net[:, k + 1] = brut_faiz - _yuvarla(brut_faiz * (stopaj_orani[:, k] / 100))
+        anapara[:, k + 2] = anapara[:, k + 1] + net[:, k + 1]
+
+    return Donguler(bas, vade, anapara, net)
+
+
+def _donemsel_degerler(donguler, secim, gunler):
+    """Gün x mevduat matrisinde döngü anaparası ile doğrusal tahakkuk eden net faizin toplamı"""
+    bas = donguler.baslangic[secim]
+    vade = donguler.vade[secim]
+    anapara = donguler.anapara[secim]
+    net = donguler.net_faiz[secim]
+
+    gecen = gunler[:, None] - bas
+    dongu = np.clip(gecen // vade, 0, net.shape[1] - 1)
+    oran = np.clip((gecen - dongu * vade) / vade, 0, 1)
+
+    kolon = np.arange(len(bas))
+    deger = anapara[kolon, dongu] + net[kolon, dongu] * oran
+
+    # Açılmamış mevduatlar 0, son döngüsü biten mevduatlar son dönüş tutarında
+    deger = np.where(gecen >= vade * net.shape[1], anapara[:, -1], deger)
+    return np.where(gecen < 0, 0.0, deger)
+
+
+def yenileme_projeksiyonu(df, bugun, dongu_sayisi, ay_sayisi, guncel_kur, kurlar=None, faiz_yolu=None,
+                          blok_boyutu=BLOK_BOYUTU):
+    """Vade sonunda yenilenen mevduatlarla portföyün ay sonu değerini TL ve USD cinsinden projekte et
+
+    Ay sonu değeri içinde bulunulan döngünün anaparası ile o güne kadar tahakkuk eden
+    net faizdir (portfoy_degerleme ile aynı). Döviz mevduatları güncel kurlarla
+    çevrilir; USD dışındaki kuru bilinmeyenler toplama katılmaz. USD/TL kuru
+    sıfırsa (henüz alınamadıysa) USD karşılığı ve USD mevduat varsa TL toplamı NaN olur.
+    """
+    usd_kur = _gecerli_kur(guncel_kur)
+    aylar = pd.date_range(pd.Timestamp(bugun), periods=ay_sayisi, freq='ME')
+    gunler = _gun_sayisi(aylar)
+    donguler = donguleri_hesapla(df, dongu_sayisi, faiz_yolu)
+
+    tip = df['mevduat_tipi'].to_numpy()
+    usd = tip == 'USD Mevduat'
+    diger = np.isin(tip, DOVIZ_TIPLERI) & ~usd
+    diger_kur = np.nan_to_num(tl_kurlari(tip, guncel_kur, kurlar))
+
+    tl_toplam = np.zeros(len(aylar))
+    usd_toplam = np.zeros(len(aylar))
+    diger_toplam = np.zeros(len(aylar))
+
+    # Ay x mevduat matrisi blok blok kurulup sütun yönünde toplanır
+    for bas in range(0, len(df), blok_boyutu):
+        secim = slice(bas, bas + blok_boyutu)
+        deger = _donemsel_degerler(donguler, secim, gunler)
+        tl_toplam += deger[:, ~(usd[secim] | diger[secim])].sum(axis=1)
+        usd_toplam += deger[:, usd[secim]].sum(axis=1)
+        diger_toplam += (deger[:, diger[secim]] * diger_kur[secim][diger[secim]]).sum(axis=1)
+
+    return pd.DataFrame({
+        'tl_mevduat': tl_toplam,
+        'usd_mevduat': usd_toplam,
+        'diger_doviz_tl': diger_toplam,
+        'toplam_tl': tl_toplam + diger_toplam + np.where(usd_toplam == 0, 0.0, usd_toplam * usd_kur),
+        'toplam_usd': (tl_toplam + diger_toplam) / usd_kur + usd_toplam
+    }, index=aylar.rename('ay'))